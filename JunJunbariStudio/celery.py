@@ -0,0 +1,11 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "JunJunbariStudio.settings")
+
+app = Celery("JunJunbariStudio")
+
+# settings.py의 CELERY_ 로 시작하는 설정을 사용
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -0,0 +1,138 @@
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder는 시각을 밀리초로 자르므로, 커서 위치가 밀리는 일이 없도록 마이크로초까지 유지"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    정렬 키 기반(keyset) 커서 페이지네이션.
+
+    ?cursor= 또는 ?pagination=cursor 로 요청하면 직전 페이지 마지막 행의 정렬 키 이후만 조회하므로
+    COUNT(*)와 OFFSET 스캔 없이 깊은 페이지도 첫 페이지와 같은 비용으로 조회됩니다.
+    그 외 요청(?page=)은 기존 PageNumberPagination 응답을 그대로 반환해 기존 클라이언트와 호환됩니다.
+    """
+
+    ordering = ("-pk",)  # 유일한 값으로 끝나야 커서 위치가 하나로 정해짐
+    # ?ordering= 값으로 고를 수 있는 정렬. 각 정렬도 유일한 값으로 끝나야 함
+    ordering_options = {}
+    ordering_query_param = "ordering"
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    invalid_cursor_message = "잘못된 커서입니다."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.current_ordering = self.get_ordering(request)
+        if not self.is_cursor_request(request):
+            if self.current_ordering is not self.ordering:
+                queryset = queryset.order_by(*self.current_ordering)
+            self.page_number_paginator = PageNumberPagination()
+            self.page_number_paginator.page_size = self.page_size
+            return self.page_number_paginator.paginate_queryset(queryset, request, view)
+
+        self.page_number_paginator = None
+        queryset = queryset.order_by(*self.current_ordering)
+        cursor = self.decode_cursor(request, queryset.model)
+        if cursor is not None:
+            queryset = queryset.filter(self.build_keyset_filter(cursor))
+
+        # 다음 페이지 존재 여부를 COUNT 없이 알기 위해 한 행을 더 읽음
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_ordering(self, request):
+        return self.ordering_options.get(
+            request.query_params.get(self.ordering_query_param), self.ordering
+        )
+
+    def is_cursor_request(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == "cursor"
+        )
+
+    def build_keyset_filter(self, values):
+        """
+        (a, b, ...) 정렬에서 커서 위치 이후의 행을 고르는 조건을 만듭니다.
+        a > x OR (a = x AND b > y) ... 형태이며, 첫 정렬 키의 범위 조건을 함께 걸어
+        복합 인덱스 탐색이 커서 위치에서 바로 시작되도록 합니다.
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.current_ordering, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+
+        first = self.current_ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{bound}": values[0]}) & condition
+
+    def decode_cursor(self, request, model):
+        """커서를 정렬 키 값 목록으로 바꿉니다. 개수나 형식이 정렬 필드와 맞지 않으면 NotFound"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.current_ordering):
+            raise NotFound(self.invalid_cursor_message)
+        decoded = []
+        for field, value in zip(self.current_ordering, values):
+            if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                decoded.append(self.get_cursor_field(model, field).to_python(value))
+            except (ValidationError, TypeError, ValueError, OverflowError):
+                raise NotFound(self.invalid_cursor_message)
+        return decoded
+
+    @staticmethod
+    def get_cursor_field(model, field):
+        name = field.lstrip("-")
+        field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        # 외래 키(order_id 등)는 참조하는 컬럼의 형식으로 변환
+        return field.target_field if field.is_relation else field
+
+    def encode_cursor(self, instance):
+        values = [getattr(instance, field.lstrip("-")) for field in self.current_ordering]
+        return base64.urlsafe_b64encode(
+            json.dumps(values, cls=CursorJSONEncoder).encode()
+        ).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
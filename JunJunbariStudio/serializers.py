@@ -0,0 +1,83 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_QUERY_PARAM = "fields"
+EXPAND_QUERY_PARAM = "expand"
+
+
+def parse_field_tree(value):
+    """
+    "id,name,images.image" 형태의 값을 {"id": {}, "name": {}, "images": {"image": {}}} 로 바꿉니다.
+    값이 비어 있으면 None을 반환합니다. (필드 선택 안 함)
+    """
+    if not value:
+        return None
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree or None
+
+
+def sparse_fieldset(request):
+    """요청의 ?fields=, ?expand= 값을 (fields 트리 또는 None, expand 트리) 로 반환합니다."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, {}
+    params = request.query_params
+    return (
+        parse_field_tree(params.get(FIELDS_QUERY_PARAM)),
+        parse_field_tree(params.get(EXPAND_QUERY_PARAM)) or {},
+    )
+
+
+class SparseFieldsetMixin:
+    """
+    ?fields=, ?expand= 로 응답 필드를 고르는 직렬화기 믹스인.
+
+    - fields: 요청한 필드만 남기고 나머지는 직렬화 전에 제거하므로
+      제거된 필드의 SerializerMethodField, 중첩 직렬화기, 연관 객체 조회는 실행되지 않습니다.
+      "images.image" 처럼 점으로 중첩 직렬화기의 필드도 고를 수 있습니다.
+    - expand: Meta.expandable_fields 에 등록된 필드를 중첩 직렬화기로 펼칩니다.
+      expandable_fields = {"이름": (직렬화기 클래스, 생성 인자)}
+
+    요청 파라미터는 최상위 직렬화기(context에 request가 있는 조회 요청)에서만 읽으며,
+    생성 인자 fields=, expand= 로 직접 넘길 수도 있습니다.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and expand is None:
+            fields, expand = sparse_fieldset(self.context.get("request"))
+        if expand:
+            self.expand_fields(expand)
+        if fields is not None:
+            self.select_fields(fields, expand or {})
+
+    def expand_fields(self, expand):
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        for name, subtree in expand.items():
+            if name not in expandable:
+                continue
+            serializer_class, options = expandable[name]
+            if issubclass(serializer_class, SparseFieldsetMixin):
+                options = {**options, "expand": subtree}
+            self.fields[name] = serializer_class(**options)
+
+    def select_fields(self, fields, expand):
+        for name in list(self.fields):
+            if name not in fields and name not in expand:
+                self.fields.pop(name)
+                continue
+            subtree = fields.get(name)
+            if not subtree:
+                continue
+            field = self.fields[name]
+            nested = getattr(field, "child", field)
+            if isinstance(nested, SparseFieldsetMixin):
+                nested.select_fields(subtree, expand.get(name, {}))
+            elif isinstance(nested, serializers.Serializer):
+                for nested_name in list(nested.fields):
+                    if nested_name not in subtree:
+                        nested.fields.pop(nested_name)
@@ -48,6 +48,24 @@ DATABASES = {
     }
 }
 
+# Redis 설정 (캐시)
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = os.getenv("REDIS_PORT", "6379")
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
+REDIS_URL = (
+    f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}"
+    if REDIS_PASSWORD
+    else f"redis://{REDIS_HOST}:{REDIS_PORT}"
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"{REDIS_URL}/0",
+        "KEY_PREFIX": "junjun",
+    }
+}
+
 # PortOne 설정
 PORTONE_SHOP_ID = os.getenv("PORTONE_SHOP_ID", "")
 PORTONE_API_KEY = os.getenv("PORTONE_API_KEY", "")
@@ -66,6 +84,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "users",
     "mall",
     "rest_framework",
@@ -162,6 +181,71 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
 }
 
+# Celery 설정
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", f"{REDIS_URL}/1")
+CELERY_TIMEZONE = TIME_ZONE
+# 이미지 리사이즈는 CPU를 많이 쓰므로 전용 큐로 분리해 별도 워커(prefork 프로세스 풀)에서 처리할 수 있음
+# 예) IMAGE_RENDITION_QUEUE=images, celery -A JunJunbariStudio worker -Q images --concurrency 4
+IMAGE_RENDITION_QUEUE = os.getenv("IMAGE_RENDITION_QUEUE", "celery")
+CELERY_TASK_ROUTES = {
+    "mall.tasks.generate_image_renditions": {"queue": IMAGE_RENDITION_QUEUE},
+}
+CELERY_BEAT_SCHEDULE = {
+    # Redis 판매량 순위표 -> Product.sales_count 반영
+    "sync-sales-counts": {
+        "task": "mall.tasks.sync_sales_counts",
+        "schedule": 60 * 10,
+    },
+    # Redis에 쌓인 조회수 -> Product.view_count 반영 (장애 시 최대 이 주기만큼 유실)
+    "flush-view-counts": {
+        "task": "mall.tasks.flush_view_counts",
+        "schedule": int(os.getenv("VIEW_COUNT_FLUSH_INTERVAL", "30")),
+    },
+    # 오래 멈춘 이미지 분할 업로드의 조각 파일 정리
+    "cleanup-image-uploads": {
+        "task": "mall.tasks.cleanup_image_uploads",
+        "schedule": 60 * 60,
+    },
+    # 저장 직후라 미뤘던 상품 이미지 파일 정리 (mall.image_store 임대 시간과 같은 주기)
+    "release-deferred-image-files": {
+        "task": "mall.tasks.release_deferred_image_files",
+        "schedule": 60 * 10,
+    },
+    # 결제 없이 만료된 재고 예약 해제
+    "release-expired-stock-reservations": {
+        "task": "mall.tasks.release_expired_stock_reservations",
+        "schedule": 60,
+    },
+    # 선착순 판매 대기열 -> 주문 생성. 초당 주문 생성 수 = FLASH_SALE_DRAIN_BATCH / 주기
+    "drain-flash-sale-queue": {
+        "task": "mall.tasks.drain_flash_sale_queue",
+        "schedule": int(os.getenv("FLASH_SALE_DRAIN_INTERVAL", "1")),
+    },
+    # Redis 장바구니 -> CartProduct 반영 (Redis 장애 시 최대 이 주기만큼 유실)
+    "flush-carts": {
+        "task": "mall.tasks.flush_carts",
+        "schedule": int(os.getenv("CART_FLUSH_INTERVAL", "5")),
+    },
+}
+
+# 주문 생성 시 잡은 재고를 결제 없이 유지하는 시간 (mall.inventory)
+STOCK_RESERVATION_TTL = int(os.getenv("STOCK_RESERVATION_TTL", str(60 * 15)))  # 초
+
+# 선착순 판매 (mall.flash_sale). 주기마다 대기열에서 주문을 만들 티켓 수, 티켓 상태를 조회할 수 있는 시간
+FLASH_SALE_DRAIN_BATCH = int(os.getenv("FLASH_SALE_DRAIN_BATCH", "100"))
+FLASH_SALE_TICKET_TTL = int(os.getenv("FLASH_SALE_TICKET_TTL", str(60 * 60 * 24)))  # 초
+
+# Redis 장바구니 (mall.cart_store) 만료 시간. 만료되면 다음 조회 때 CartProduct에서 다시 채움
+CART_CACHE_TTL = int(os.getenv("CART_CACHE_TTL", str(60 * 60 * 24 * 7)))  # 초
+
+# 상품 이미지 분할 업로드 (mall.uploads). 조각은 요청 본문으로 받으므로 DATA_UPLOAD_MAX_MEMORY_SIZE(2.5MB)보다 작게 유지
+IMAGE_UPLOAD_CHUNK_SIZE = int(os.getenv("IMAGE_UPLOAD_CHUNK_SIZE", str(2 * 1024 * 1024)))
+IMAGE_UPLOAD_MAX_SIZE = int(os.getenv("IMAGE_UPLOAD_MAX_SIZE", str(50 * 1024 * 1024)))
+IMAGE_UPLOAD_EXPIRY = int(os.getenv("IMAGE_UPLOAD_EXPIRY", str(60 * 60 * 24)))  # 초
+
+# 엔드포인트별 SQL 실행 횟수 상한 초과 시 예외 발생 여부 (mall.mixins.QueryBudgetMixin)
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "False") == "True"
+
 # CKEditor 설정
 CKEDITOR_UPLOAD_PATH = "uploads/"
 CKEDITOR_5_CONFIGS = {
@@ -9,6 +9,8 @@ from .models import (
     OrderedProduct,
     Comment,
     OrderPayment,
+    Stock,
+    FlashSale,
 )
 
 
@@ -18,6 +20,12 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ("name", "description")
     list_filter = ("status", "category")
 
+    def get_search_results(self, request, queryset, search_term):
+        # CKEditor HTML에 대한 ILIKE 대신 검색 벡터/trigram 인덱스를 사용
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.search(search_term), False
+
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
@@ -29,3 +37,17 @@ class OrderAdmin(admin.ModelAdmin):
 @admin.register(CartProduct)
 class CartProductAdmin(admin.ModelAdmin):
     list_display = ("user", "product", "quantity", "total_price")
+
+
+@admin.register(Stock)
+class StockAdmin(admin.ModelAdmin):
+    list_display = ("product", "option", "available", "updated_at")
+    search_fields = ("product__name",)
+    raw_id_fields = ("product", "option")
+
+
+@admin.register(FlashSale)
+class FlashSaleAdmin(admin.ModelAdmin):
+    list_display = ("product", "option", "quantity", "sold", "max_per_user", "starts_at", "ends_at")
+    readonly_fields = ("sold",)
+    raw_id_fields = ("product", "option")
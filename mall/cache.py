@@ -0,0 +1,70 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+# 상품이 바뀔 때마다 올라가는 버전 키. 캐시 키에 버전을 포함시켜 이전 항목을 한 번에 무효화합니다.
+PRODUCT_VERSION_KEY = "mall:products:version"
+
+
+def get_version(version_key):
+    version = cache.get(version_key)
+    if version is None:
+        # 버전 키가 유실되어도 이전 버전과 겹치지 않도록 현재 시각으로 시작
+        cache.add(version_key, int(time.time()))
+        version = cache.get(version_key)
+    return version
+
+
+def bump_version(version_key):
+    try:
+        return cache.incr(version_key)
+    except ValueError:
+        cache.add(version_key, int(time.time()))
+        return cache.get(version_key)
+
+
+def versioned_key(prefix, version_key, params=None):
+    """prefix + 현재 버전 + 파라미터 해시로 캐시 키를 만듭니다."""
+    digest = hashlib.md5(
+        json.dumps(params or {}, sort_keys=True).encode()
+    ).hexdigest()
+    return f"{prefix}:v{get_version(version_key)}:{digest}"
+
+
+def product_detail_version_key(product_id):
+    return f"mall:product-detail:{product_id}:version"
+
+
+def product_detail_key(product_id):
+    # 응답을 만드는 도중 무효화되어도 이전 버전 키에 저장되므로 오래된 응답이 읽히지 않음
+    return f"mall:product-detail:{product_id}:v{get_version(product_detail_version_key(product_id))}"
+
+
+def invalidate_product_detail(product_id):
+    transaction.on_commit(lambda: bump_version(product_detail_version_key(product_id)))
+
+
+def product_detail_etag(product):
+    """
+    상품 상세 응답의 강한 ETag.
+    상품 수정 시각, 이미지/옵션 행, 리뷰 집계로 만들며 조회수/판매량처럼 수시로 바뀌는 카운터는 제외합니다.
+    """
+    source = [
+        product.pk,
+        product.updated_at.isoformat(),
+        product.review_count,
+        product.rating_total,
+        [
+            (image.pk, image.image.name, image.renditions, image.placeholder)
+            for image in product.images.all()
+        ],
+        [
+            (option.pk, option.name, option.additional_price)
+            for option in product.options.all()
+        ],
+    ]
+    return f'"{hashlib.md5(json.dumps(source).encode()).hexdigest()}"'
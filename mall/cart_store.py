@@ -0,0 +1,411 @@
+"""
+Redis 장바구니 저장소.
+
+사용자별 장바구니를 Redis hash(field="상품 id:옵션 id", value=수량)로 두고 담기/수량 변경/삭제/조회를
+Redis 명령 한 번(Lua 스크립트)으로 처리합니다. CartProduct 테이블은 내구성을 위한 사본이며,
+변경된 사용자만 모아 두었다가 주기 작업(flush_dirty_carts)이 한 번에 반영합니다. (write-behind)
+
+- Redis에 장바구니가 없으면(재시작, 만료) CartProduct에서 읽어 채운 뒤 사용합니다. (read-through)
+- 주문할 항목은 스크립트 한 번으로 읽고 지우므로 주문 도중 장바구니가 바뀌어도 한 시점의 내용으로 주문합니다.
+- Redis에 연결할 수 없으면 CartProduct를 직접 읽고 씁니다.
+- CartProduct 쓰기는 사용자별 advisory lock(lock_carts)으로 직렬화하고, Redis 내용은 잠금을 잡은 뒤에 읽습니다.
+  (즉시 반영(sync)과 주기 반영이 겹쳐도 오래된 내용이 나중에 쓰이지 않음)
+"""
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from redis import RedisError
+
+from .models import CartProduct, Product, ProductOption
+from .redis_client import get_redis, get_script
+
+logger = logging.getLogger(__name__)
+
+CART_KEY = "mall:cart:{}"
+# DB에 아직 반영되지 않은 장바구니의 사용자 id (set)
+DIRTY_KEY = "mall:cart:dirty"
+FLUSH_LOCK_KEY = "mall:cart:flush-lock"
+# DB에서 채운 장바구니 표시. 이 필드가 없으면 비어 있는 장바구니가 아니라 아직 읽지 않은 장바구니
+LOADED_FIELD = "_loaded"
+NO_OPTION = "0"
+BATCH_SIZE = 500
+# 장바구니 표시와 주문 생성(판매자 주문 상품)에 필요한 상품 컬럼
+PRODUCT_FIELDS = ("id", "name", "price", "primary_image", "primary_image_renditions", "seller")
+
+OPERATIONS = ("add", "set", "remove")
+# 일괄 변경 요청 한 번에 받을 수 있는 최대 연산 수
+BULK_MAX_OPERATIONS = 100
+# 항목 하나의 최대 수량. 더해서 넘으면 이 값으로 맞춤 (합계 금액이 정수 컬럼 범위를 넘지 않도록)
+MAX_QUANTITY = 999
+
+# KEYS: 장바구니, ARGV: 만료(초), 필드/수량 쌍. 이미 채워져 있으면 덮어쓰지 않음 (동시에 들어온 변경 보존)
+LOAD_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[2]) == 0 then
+    redis.call('HSET', KEYS[1], ARGV[2], 1)
+    for i = 3, #ARGV, 2 do
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# KEYS: 장바구니, 변경 목록, ARGV: 만료(초), 채움 표시 필드, 사용자 id, 최대 수량, (연산, 필드, 수량) 반복
+# 채워지지 않은 장바구니면 nil을 반환해 호출 측이 채운 뒤 다시 실행
+MUTATE_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[2]) == 0 then
+    return false
+end
+local max_quantity = tonumber(ARGV[4])
+for i = 5, #ARGV, 3 do
+    local op, field, quantity = ARGV[i], ARGV[i + 1], tonumber(ARGV[i + 2])
+    if op == 'add' then
+        quantity = quantity + tonumber(redis.call('HGET', KEYS[1], field) or '0')
+    end
+    quantity = math.min(quantity, max_quantity)
+    if op == 'remove' or quantity <= 0 then
+        redis.call('HDEL', KEYS[1], field)
+    else
+        redis.call('HSET', KEYS[1], field, quantity)
+    end
+end
+redis.call('SADD', KEYS[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# KEYS: 장바구니, 변경 목록, ARGV: 채움 표시 필드, 사용자 id, 필드 목록
+# 주문할 항목을 읽고 지움. 원자적으로 실행되므로 그 사이에 들어온 변경과 섞이지 않음
+TAKE_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    return false
+end
+local taken = {}
+for i = 3, #ARGV do
+    local quantity = redis.call('HGET', KEYS[1], ARGV[i])
+    if quantity then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+        table.insert(taken, ARGV[i])
+        table.insert(taken, quantity)
+    end
+end
+redis.call('SADD', KEYS[2], ARGV[2])
+return taken
+"""
+
+
+def cart_key(user_id):
+    return CART_KEY.format(user_id)
+
+
+def line_key(product_id, option_id):
+    return f"{product_id}:{option_id or NO_OPTION}"
+
+
+def parse_line_key(key):
+    """ "12:0" -> (12, None), "12:3" -> (12, 3). 형식이 맞지 않으면 ValueError"""
+    product_id, option_id = key.split(":")
+    product_id, option_id = int(product_id), int(option_id)
+    return product_id, option_id or None
+
+
+def parse_cart(values):
+    """HGETALL 결과 -> {(상품 id, 옵션 id): 수량}"""
+    if isinstance(values, list):
+        values = dict(zip(values[::2], values[1::2]))
+    return {
+        parse_line_key(field): int(quantity)
+        for field, quantity in values.items()
+        if field != LOADED_FIELD
+    }
+
+
+def db_cart(user_id):
+    return {
+        (product_id, option_id): quantity
+        for product_id, option_id, quantity in CartProduct.objects.filter(user_id=user_id).values_list(
+            "product_id", "option_id", "quantity"
+        )
+    }
+
+
+def load(user_id):
+    """Redis에 장바구니가 없으면 CartProduct로 채우고 내용을 반환합니다."""
+    args = [settings.CART_CACHE_TTL, LOADED_FIELD]
+    for (product_id, option_id), quantity in db_cart(user_id).items():
+        args += [line_key(product_id, option_id), quantity]
+    return parse_cart(get_script(LOAD_SCRIPT)(keys=[cart_key(user_id)], args=args))
+
+
+def get_cart(user_id):
+    """장바구니 내용 {(상품 id, 옵션 id): 수량}"""
+    try:
+        client = get_redis()
+        values = client.hgetall(cart_key(user_id))
+        if LOADED_FIELD in values:
+            return parse_cart(values)
+        return load(user_id)
+    except RedisError as e:
+        logger.warning(f"Redis 장바구니 조회 실패, DB에서 읽음 (사용자 {user_id}): {e}")
+        return db_cart(user_id)
+
+
+def apply(user_id, operations):
+    """
+    장바구니 변경을 한 번에 적용하고 변경 후 내용을 반환합니다.
+    operations: [(연산, 상품 id, 옵션 id, 수량), ...]
+        add: 수량만큼 더함 (음수면 뺌), set: 수량으로 바꿈, remove: 항목 삭제. 수량이 0 이하가 되면 항목 삭제
+    """
+    changes = []
+    for operation, product_id, option_id, quantity in operations:
+        if operation not in OPERATIONS:
+            raise ValueError(f"알 수 없는 장바구니 연산입니다: {operation}")
+        changes += [operation, line_key(product_id, option_id), int(quantity or 0)]
+
+    try:
+        keys = [cart_key(user_id), DIRTY_KEY]
+        args = [settings.CART_CACHE_TTL, LOADED_FIELD, user_id, MAX_QUANTITY, *changes]
+        values = get_script(MUTATE_SCRIPT)(keys=keys, args=args)
+        if values is None:
+            load(user_id)
+            values = get_script(MUTATE_SCRIPT)(keys=keys, args=args)
+        return parse_cart(values)
+    except RedisError as e:
+        logger.warning(f"Redis 장바구니 변경 실패, DB에 바로 반영 (사용자 {user_id}): {e}")
+        return apply_db(user_id, operations)
+
+
+def apply_db(user_id, operations):
+    """Redis 없이 CartProduct에 바로 적용합니다."""
+    if all(operation == "add" and int(quantity or 0) > 0 for operation, _, _, quantity in operations):
+        # 담기만 있으면 잠금 없이 upsert 한 번 (동시에 담아도 수량이 합쳐짐)
+        increments = {}
+        for _, product_id, option_id, quantity in operations:
+            line = (int(product_id), int(option_id) if option_id else None)
+            increments[line] = increments.get(line, 0) + int(quantity)
+        add_quantities(user_id, increments)
+        return db_cart(user_id)
+
+    with transaction.atomic():
+        # 행 잠금보다 사용자 잠금을 먼저 잡아 write_carts()를 쓰는 다른 경로와 잠금 순서를 맞춤
+        lock_carts([user_id])
+        quantities = {
+            (product_id, option_id): quantity
+            for product_id, option_id, quantity in CartProduct.objects.select_for_update()
+            .filter(user_id=user_id)
+            .values_list("product_id", "option_id", "quantity")
+        }
+        for operation, product_id, option_id, quantity in operations:
+            line = (int(product_id), int(option_id) if option_id else None)
+            quantity = int(quantity or 0)
+            if operation == "add":
+                quantity += quantities.get(line, 0)
+            quantity = min(quantity, MAX_QUANTITY)
+            if operation == "remove" or quantity <= 0:
+                quantities.pop(line, None)
+            else:
+                quantities[line] = quantity
+        write_carts({user_id: quantities})
+    return quantities
+
+
+def take(user_id, lines):
+    """
+    주문할 항목을 장바구니에서 꺼냅니다. (읽기와 삭제가 한 번에 일어나는 한 시점의 내용)
+    lines: [(상품 id, 옵션 id), ...], 반환값: {(상품 id, 옵션 id): 수량}
+    """
+    fields = [line_key(product_id, option_id) for product_id, option_id in lines]
+    try:
+        keys = [cart_key(user_id), DIRTY_KEY]
+        args = [LOADED_FIELD, user_id, *fields]
+        values = get_script(TAKE_SCRIPT)(keys=keys, args=args)
+        if values is None:
+            load(user_id)
+            values = get_script(TAKE_SCRIPT)(keys=keys, args=args)
+        return parse_cart(values)
+    except RedisError as e:
+        logger.warning(f"Redis 장바구니 주문 처리 실패, DB에서 꺼냄 (사용자 {user_id}): {e}")
+        wanted = {(int(product_id), int(option_id) if option_id else None) for product_id, option_id in lines}
+        with transaction.atomic():
+            rows = [
+                row
+                for row in CartProduct.objects.select_for_update().filter(user_id=user_id)
+                if (row.product_id, row.option_id) in wanted
+            ]
+            CartProduct.objects.filter(pk__in=[row.pk for row in rows]).delete()
+        return {(row.product_id, row.option_id): row.quantity for row in rows}
+
+
+def restore(user_id, cart):
+    """take()로 꺼낸 항목을 되돌립니다. (주문 생성 실패 시)"""
+    if cart:
+        apply(user_id, [("add", product_id, option_id, quantity) for (product_id, option_id), quantity in cart.items()])
+
+
+def build_lines(user_id, cart):
+    """
+    {(상품 id, 옵션 id): 수량} -> 상품/옵션이 채워진 CartProduct 인스턴스 목록 (저장하지 않음)
+    상품이나 옵션이 삭제된 항목은 빠집니다.
+    """
+    products = Product.objects.only(*PRODUCT_FIELDS).in_bulk({product_id for product_id, _ in cart})
+    option_ids = {option_id for _, option_id in cart if option_id}
+    options = ProductOption.objects.in_bulk(option_ids) if option_ids else {}
+
+    lines = []
+    for (product_id, option_id), quantity in sorted(cart.items(), key=lambda item: (item[0][0], item[0][1] or 0)):
+        product = products.get(product_id)
+        option = options.get(option_id) if option_id else None
+        if product is None or (option_id and (option is None or option.product_id != product_id)):
+            continue
+        lines.append(CartProduct(user_id=user_id, product=product, option=option, quantity=quantity))
+    return lines
+
+
+def add_quantities(user_id, increments):
+    """
+    {(상품 id, 옵션 id): 더할 수량(양수)}를 INSERT ... ON CONFLICT 한 번으로 더합니다.
+    없는 항목은 만들고 있는 항목은 quantity = quantity + EXCLUDED.quantity (unique_user_product_option 사용)
+    더한 수량은 MAX_QUANTITY를 넘지 않습니다.
+    """
+    if not increments:
+        return
+    table = CartProduct._meta.db_table
+    values = ", ".join(["(%s, %s, %s, %s)"] * len(increments))
+    params = [
+        value
+        for (product_id, option_id), quantity in increments.items()
+        for value in (user_id, product_id, option_id, min(quantity, MAX_QUANTITY))
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        lock_carts([user_id])
+        cursor.execute(
+            f"INSERT INTO {table} (user_id, product_id, option_id, quantity) VALUES {values} "
+            f"ON CONFLICT (user_id, product_id, option_id) "
+            f"DO UPDATE SET quantity = LEAST({table}.quantity + EXCLUDED.quantity, %s)",
+            [*params, MAX_QUANTITY],
+        )
+
+
+def lock_carts(user_ids):
+    """
+    사용자별 CartProduct 쓰기를 트랜잭션이 끝날 때까지 직렬화합니다. (pg_advisory_xact_lock, 트랜잭션 안에서 호출)
+    여러 사용자를 잠그는 트랜잭션끼리 교착되지 않도록 id 순서대로 잡습니다.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(user_id) FROM unnest(%s::bigint[]) AS user_id ORDER BY user_id",
+            [sorted({int(user_id) for user_id in user_ids})],
+        )
+
+
+def write_carts(carts):
+    """
+    CartProduct를 {사용자 id: {(상품 id, 옵션 id): 수량}}과 같게 맞춥니다. (트랜잭션 안에서 호출)
+    사용자 수와 관계없이 DELETE 한 번과 INSERT ... ON CONFLICT DO UPDATE 한 번(배치당)으로 끝납니다.
+    삭제된 상품/옵션 항목은 쓰지 않습니다. (옵션은 외래 키 제약이 있음)
+    """
+    if not carts:
+        return
+    lock_carts(carts)
+    lines = {line for cart in carts.values() for line in cart}
+    products = set(Product.objects.filter(pk__in={product_id for product_id, _ in lines}).values_list("id", flat=True))
+    option_ids = {option_id for _, option_id in lines if option_id}
+    options = set(ProductOption.objects.filter(pk__in=option_ids).values_list("id", flat=True)) if option_ids else set()
+    rows = [
+        # 상한이 생기기 전에 Redis에 들어간 수량도 컬럼 범위 안으로 맞춤
+        CartProduct(user_id=user_id, product_id=product_id, option_id=option_id, quantity=min(quantity, MAX_QUANTITY))
+        for user_id, cart in carts.items()
+        for (product_id, option_id), quantity in cart.items()
+        if product_id in products and (option_id is None or option_id in options)
+    ]
+
+    table = CartProduct._meta.db_table
+    with connection.cursor() as cursor:
+        # 장바구니에 없는 항목 삭제 (옵션 없음은 0으로 비교)
+        cursor.execute(
+            f"DELETE FROM {table} WHERE user_id = ANY(%s) "
+            f"AND (user_id, product_id, COALESCE(option_id, 0)) NOT IN "
+            f"(SELECT * FROM unnest(%s::bigint[], %s::bigint[], %s::bigint[]))",
+            [
+                list(carts),
+                [row.user_id for row in rows],
+                [row.product_id for row in rows],
+                [row.option_id or 0 for row in rows],
+            ],
+        )
+    CartProduct.objects.bulk_create(
+        rows,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["user", "product", "option"],
+        update_fields=["quantity"],
+    )
+
+
+def write_from_redis(client, user_ids):
+    """
+    사용자들의 Redis 장바구니를 CartProduct에 반영합니다. 반영한 사용자 수를 반환합니다.
+    sync()와 flush_dirty_carts()가 같은 사용자를 동시에 반영해도 나중에 쓰는 쪽이 최신 내용을 쓰도록
+    사용자 잠금을 잡은 뒤에 장바구니를 읽습니다.
+    """
+    user_ids = sorted(int(user_id) for user_id in user_ids)
+    with transaction.atomic():
+        lock_carts(user_ids)
+        pipe = client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.hgetall(cart_key(user_id))
+        carts = {
+            user_id: parse_cart(values)
+            for user_id, values in zip(user_ids, pipe.execute())
+            if LOADED_FIELD in values  # 만료된 장바구니는 DB가 최신
+        }
+        write_carts(carts)
+    return len(carts)
+
+
+def sync(user_id):
+    """
+    사용자 한 명의 장바구니 변경분을 바로 CartProduct에 반영합니다.
+    금액/합계를 DB에서 계산(CartProduct.objects.with_totals)하기 전에 호출하며, 반영할 변경이 없으면 Redis 명령 한 번으로 끝납니다.
+    """
+    try:
+        client = get_redis()
+        if not client.srem(DIRTY_KEY, user_id):
+            return
+    except RedisError as e:
+        logger.warning(f"Redis 장바구니 반영 실패, DB 사본 사용 (사용자 {user_id}): {e}")
+        return
+    try:
+        write_from_redis(client, [user_id])
+    except RedisError as e:
+        logger.warning(f"Redis 장바구니 반영 실패, DB 사본 사용 (사용자 {user_id}): {e}")
+    except Exception:
+        client.sadd(DIRTY_KEY, user_id)
+        raise
+
+
+def flush_dirty_carts(lock_timeout=300):
+    """
+    변경된 장바구니를 CartProduct에 반영합니다. 반영한 사용자 수를 반환합니다.
+    반영 중 장바구니가 다시 바뀌면 변경 목록에 다시 올라가 다음 주기에 반영됩니다.
+    """
+    client = get_redis()
+    if not client.set(FLUSH_LOCK_KEY, 1, nx=True, ex=lock_timeout):
+        return 0  # 다른 작업이 반영 중
+
+    flushed = 0
+    try:
+        # 반영하는 동안 새로 쌓이는 변경은 다음 주기로 넘김
+        for _ in range(0, client.scard(DIRTY_KEY), BATCH_SIZE):
+            user_ids = client.spop(DIRTY_KEY, BATCH_SIZE)
+            if not user_ids:
+                break
+            try:
+                flushed += write_from_redis(client, user_ids)
+            except Exception:
+                client.sadd(DIRTY_KEY, *user_ids)
+                raise
+    finally:
+        client.delete(FLUSH_LOCK_KEY)
+    return flushed
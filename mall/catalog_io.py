@@ -0,0 +1,389 @@
+"""
+상품 일괄 가져오기/내보내기 (CSV, JSONL).
+
+파일 전체를 메모리에 올리지 않도록 행을 이터레이터로 읽고 쓰며,
+가져오기는 batch_size 행씩 bulk_create/bulk_update 하고 내보내기는 서버 사이드 커서로 읽습니다.
+
+행 형식 (CSV는 JSON 값 컬럼을 JSON 문자열로 씀):
+    id                      있으면 기존 상품 수정, 없으면 새 상품
+    name, description, price, shipping_info, status
+    category, subcategory, sub_detail_category   분류 이름
+    specifications          {"material": "cotton"}
+    keywords                ["여름", "린넨"]
+    options                 [{"name": "L", "additional_price": 1000}]
+    images                  ["mall/product/images/2024/01/01/a.jpg"]  (저장소에 이미 올라간 파일 경로)
+
+API로 올린 파일은 CatalogImport로 저장해 두고 Celery 작업(run_import)이 가져옵니다.
+"""
+import csv
+import io
+import json
+import logging
+from itertools import islice
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from .cache import PRODUCT_VERSION_KEY, bump_version, invalidate_product_detail
+from .category_tree import rebuild_category_counts
+from .image_store import BLOB_ROOT, LEGACY_ROOT, is_product_image_path
+from .models import (
+    CatalogImport,
+    Category,
+    Product,
+    ProductImage,
+    ProductOption,
+    SubCategory,
+    SubDetailCategory,
+)
+from .tasks import generate_image_renditions
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+ROW_ERROR_KEY = "__error__"
+NAME_MAX_LENGTH = Product._meta.get_field("name").max_length
+MAX_PRICE = 2**31 - 1  # PositiveIntegerField 상한. 넘으면 배치 전체가 DB 오류로 실패
+
+PRODUCT_FIELDS = ("name", "description", "price", "shipping_info", "status", "specifications", "keywords")
+JSON_COLUMNS = ("specifications", "keywords", "options", "images")
+COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "shipping_info",
+    "status",
+    "category",
+    "subcategory",
+    "sub_detail_category",
+    "specifications",
+    "keywords",
+    "options",
+    "images",
+)
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+class CategoryLookup:
+    """분류 이름 <-> id 변환표. 분류 테이블 전체를 세 번의 쿼리로 읽어 둡니다."""
+
+    def __init__(self):
+        self.categories = dict(Category.objects.values_list("name", "id"))
+        self.subcategories = {
+            (category_id, name): pk
+            for pk, category_id, name in SubCategory.objects.values_list("id", "category_id", "name")
+        }
+        self.sub_detail_categories = {
+            (subcategory_id, name): pk
+            for pk, subcategory_id, name in SubDetailCategory.objects.values_list("id", "subcategory_id", "name")
+        }
+        self.names = {
+            "category": {pk: name for name, pk in self.categories.items()},
+            "subcategory": {pk: name for (_, name), pk in self.subcategories.items()},
+            "sub_detail_category": {pk: name for (_, name), pk in self.sub_detail_categories.items()},
+        }
+
+    def resolve(self, category, subcategory, sub_detail_category):
+        """(분류, 서브분류, 세부분류) 이름을 상위 분류 안에서 찾아 id 경로로 바꿉니다."""
+        category_id = self.categories.get(category)
+        subcategory_id = self.subcategories.get((category_id, subcategory))
+        sub_detail_category_id = self.sub_detail_categories.get((subcategory_id, sub_detail_category))
+        if sub_detail_category_id is None:
+            raise ImportRowError(f"분류를 찾을 수 없습니다: {category} > {subcategory} > {sub_detail_category}")
+        return category_id, subcategory_id, sub_detail_category_id
+
+    def name_of(self, level, pk):
+        return self.names[level].get(pk)
+
+
+def read_rows(stream, fmt):
+    """텍스트 스트림에서 행(dict)을 하나씩 읽습니다."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "jsonl":
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                # 깨진 줄 하나 때문에 전체 가져오기가 멈추지 않도록 오류 행으로 넘김
+                yield {ROW_ERROR_KEY: f"JSON 형식이 아닙니다: {e}"}
+    else:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+
+
+def json_value(row, column, default):
+    """JSONL은 이미 변환된 값, CSV는 JSON 문자열"""
+    value = row.get(column)
+    if not value:
+        return default
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            raise ImportRowError(f"{column} 값이 JSON 형식이 아닙니다: {value}")
+    return value
+
+
+def parse_row(row, lookup):
+    """읽은 행을 (id, 상품 필드, 옵션 목록, 이미지 목록) 으로 검증/변환합니다."""
+    if ROW_ERROR_KEY in row:
+        raise ImportRowError(row[ROW_ERROR_KEY])
+    pk = row.get("id") or None
+    if pk is not None and not str(pk).isdigit():
+        raise ImportRowError(f"id가 올바르지 않습니다: {pk}")
+    try:
+        price = int(row.get("price"))
+    except (TypeError, ValueError):
+        raise ImportRowError(f"가격이 올바르지 않습니다: {row.get('price')}")
+    if not 0 <= price <= MAX_PRICE:
+        raise ImportRowError(f"가격은 0 ~ {MAX_PRICE} 사이여야 합니다: {price}")
+    name = row.get("name")
+    if not name:
+        raise ImportRowError("상품명이 비어 있습니다.")
+    if not isinstance(name, str) or len(name) > NAME_MAX_LENGTH:
+        raise ImportRowError(f"상품명은 {NAME_MAX_LENGTH}자 이하의 문자열이어야 합니다.")
+    status = row.get("status") or Product.Status.ACTIVE
+    if status not in Product.Status.values:
+        raise ImportRowError(f"상태 값이 올바르지 않습니다: {status}")
+
+    category_id, subcategory_id, sub_detail_category_id = lookup.resolve(
+        row.get("category"), row.get("subcategory"), row.get("sub_detail_category")
+    )
+    specifications = json_value(row, "specifications", {})
+    if not isinstance(specifications, dict):
+        raise ImportRowError("specifications는 JSON 객체여야 합니다.")
+    fields = {
+        "name": name,
+        "description": row.get("description") or "",
+        "price": price,
+        "shipping_info": row.get("shipping_info") or None,
+        "status": status,
+        "specifications": specifications,
+        "keywords": json_value(row, "keywords", []),
+        "category_id": category_id,
+        "subcategory_id": subcategory_id,
+        "sub_detail_category_id": sub_detail_category_id,
+    }
+    options = [
+        (option["name"], int(option.get("additional_price") or 0))
+        for option in json_value(row, "options", [])
+    ]
+    images = json_value(row, "images", [])
+    if not isinstance(images, list):
+        raise ImportRowError("images는 JSON 배열이어야 합니다.")
+    for image in images:
+        if not is_product_image_path(image):
+            raise ImportRowError(f"상품 이미지 저장 경로({BLOB_ROOT}/, {LEGACY_ROOT}/) 밖의 이미지입니다: {image}")
+    return pk, fields, options, images
+
+
+def import_batch(parsed, seller=None):
+    """
+    한 배치를 하나의 트랜잭션으로 저장합니다. 새 상품의 판매자는 seller로 지정합니다.
+    seller가 관리자가 아니면 seller의 상품만 수정하고, 다른 판매자의 상품 행은 오류로 보고합니다.
+    새 상품은 bulk_create, 기존 상품은 bulk_update 하고, 옵션은 이름 기준으로 추가/가격 수정,
+    이미지는 없는 경로만 추가합니다. (주문/장바구니가 참조하므로 기존 옵션은 지우지 않음)
+    """
+    new_rows = [row for row in parsed if row[1] is None]
+    update_rows = [row for row in parsed if row[1] is not None]
+
+    with transaction.atomic():
+        created = Product.objects.bulk_create([Product(**fields, seller=seller) for _, _, fields, _, _ in new_rows])
+        products = [(product, options, images) for product, (_, _, _, options, images) in zip(created, new_rows)]
+
+        existing = Product.objects.only("id", "seller_id").in_bulk([int(pk) for _, pk, _, _, _ in update_rows])
+        restricted = seller is not None and not seller.is_staff
+        updated, missing = [], []
+        for line_number, pk, fields, options, images in update_rows:
+            product = existing.get(int(pk))
+            if product is None:
+                missing.append((line_number, f"상품을 찾을 수 없습니다: id={pk}"))
+                continue
+            if restricted and product.seller_id != seller.pk:
+                missing.append((line_number, f"다른 판매자의 상품은 수정할 수 없습니다: id={pk}"))
+                continue
+            for name, value in fields.items():
+                setattr(product, name, value)
+            updated.append(product)
+            products.append((product, options, images))
+        Product.objects.bulk_update(
+            updated,
+            [*PRODUCT_FIELDS, "category_id", "subcategory_id", "sub_detail_category_id"],
+        )
+
+        product_ids = [product.pk for product, _, _ in products]
+        current_options = {
+            (product_id, name): pk
+            for pk, product_id, name in ProductOption.objects.filter(product_id__in=product_ids)
+            .values_list("id", "product_id", "name")
+        }
+        current_images = set(
+            ProductImage.objects.filter(product_id__in=product_ids).values_list("product_id", "image")
+        )
+        new_options, changed_options, new_images = [], [], []
+        for product, options, images in products:
+            for name, additional_price in options:
+                option = ProductOption(product_id=product.pk, name=name, additional_price=additional_price)
+                option_id = current_options.get((product.pk, name))
+                if option_id is None:
+                    new_options.append(option)
+                else:
+                    option.pk = option_id
+                    changed_options.append(option)
+            for position, image in enumerate(images):
+                if (product.pk, image) not in current_images:
+                    new_images.append(ProductImage(product_id=product.pk, image=image, position=position))
+        ProductOption.objects.bulk_create(new_options)
+        ProductOption.objects.bulk_update(changed_options, ["additional_price"])
+        ProductImage.objects.bulk_create(new_images)
+        # bulk_create는 저장 시그널을 보내지 않으므로 리사이즈본 생성 작업을 직접 예약
+        image_ids = [image.pk for image in new_images]
+        transaction.on_commit(lambda: [generate_image_renditions.delay(pk) for pk in image_ids])
+
+        # 검색 벡터와 상세 캐시도 직접 갱신
+        Product.objects.filter(pk__in=product_ids).update_search_vector()
+        Product.objects.filter(pk__in=product_ids).refresh_primary_image()
+        for product in updated:
+            invalidate_product_detail(product.pk)
+    return len(created), len(updated), missing
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_products(rows, batch_size=BATCH_SIZE, progress=None, seller=None):
+    """
+    행 이터레이터를 batch_size 단위로 저장합니다. 잘못된 행은 건너뛰고 오류로 보고합니다.
+    반환값: {"created", "updated", "error_count", "errors": [(행 번호, 메시지), ...]}
+    """
+    lookup = CategoryLookup()
+    result = {"created": 0, "updated": 0, "error_count": 0, "errors": []}
+    for batch in batched(enumerate(rows, start=1), batch_size):
+        parsed, errors = [], []
+        for line_number, row in batch:
+            try:
+                parsed.append((line_number, *parse_row(row, lookup)))
+            except (ImportRowError, KeyError, TypeError, ValueError) as e:
+                errors.append((line_number, str(e)))
+        if parsed:
+            created, updated, missing = import_batch(parsed, seller)
+            result["created"] += created
+            result["updated"] += updated
+            errors.extend(missing)
+            errors.sort()
+        result["error_count"] += len(errors)
+        result["errors"].extend(errors[: MAX_REPORTED_ERRORS - len(result["errors"])])
+        if progress:
+            progress(result)
+
+    if result["created"] or result["updated"]:
+        # 분류별 상품 수, 분류 트리, 목록/패싯 캐시를 한 번에 갱신
+        rebuild_category_counts()
+        transaction.on_commit(lambda: bump_version(PRODUCT_VERSION_KEY))
+    return result
+
+
+def run_import(import_id):
+    """
+    대기 중인 가져오기 작업을 실행합니다. 배치마다 중간 결과를 기록하고, 끝나면 업로드 파일을 지웁니다.
+    이미 다른 작업이 시작했거나 없는 작업이면 None
+    """
+    # 같은 작업이 두 번 예약되어도 한 번만 실행되도록 상태를 조건부로 변경
+    started = CatalogImport.objects.filter(pk=import_id, status=CatalogImport.Status.PENDING).update(
+        status=CatalogImport.Status.RUNNING, updated_at=timezone.now()
+    )
+    if not started:
+        return None
+    job = CatalogImport.objects.select_related("user").get(pk=import_id)
+
+    def progress(result):
+        CatalogImport.objects.filter(pk=job.pk).update(result=result, updated_at=timezone.now())
+
+    try:
+        with job.file.open("rb") as file:
+            stream = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+            job.result = import_products(read_rows(stream, job.format), progress=progress, seller=job.user)
+        job.status = CatalogImport.Status.COMPLETED
+    except Exception as e:
+        # 이미 저장된 배치는 그대로 두고, 몇 행까지 반영됐는지는 중간 결과(result)로 확인
+        logger.error(f"상품 가져오기 {job.pk} 실패: {e}", exc_info=e)
+        job.result = CatalogImport.objects.values_list("result", flat=True).get(pk=job.pk)
+        job.status = CatalogImport.Status.FAILED
+        job.error = str(e)
+    finally:
+        job.file.delete(save=False)
+    job.save(update_fields=["status", "result", "error", "file", "updated_at"])
+    return job
+
+
+def export_rows(queryset, chunk_size=BATCH_SIZE):
+    """
+    상품을 가져오기 형식의 행(dict)으로 하나씩 반환합니다.
+    서버 사이드 커서로 chunk_size 행씩 읽고, 옵션/이미지는 청크마다 한 번씩 prefetch 합니다.
+    """
+    lookup = CategoryLookup()
+    products = (
+        queryset.order_by("pk")
+        .defer("search_vector")
+        .prefetch_related(
+            models.Prefetch("options", queryset=ProductOption.objects.order_by("pk")),
+            models.Prefetch("images", queryset=ProductImage.objects.only("id", "product_id", "image", "position")),
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    for product in products:
+        yield {
+            "id": product.pk,
+            "name": product.name,
+            "description": product.description,
+            "price": product.price,
+            "shipping_info": product.shipping_info,
+            "status": product.status,
+            "category": lookup.name_of("category", product.category_id),
+            "subcategory": lookup.name_of("subcategory", product.subcategory_id),
+            "sub_detail_category": lookup.name_of("sub_detail_category", product.sub_detail_category_id),
+            "specifications": product.specifications,
+            "keywords": product.keywords,
+            "options": [
+                {"name": option.name, "additional_price": option.additional_price}
+                for option in product.options.all()
+            ],
+            "images": [image.image.name for image in product.images.all()],
+        }
+
+
+class Echo:
+    """csv.writer가 쓴 한 줄을 그대로 돌려주는 버퍼 (스트리밍 응답용)"""
+
+    def write(self, value):
+        return value
+
+
+def iter_lines(rows, fmt):
+    """행을 CSV/JSONL 텍스트 줄로 하나씩 만들어 반환합니다."""
+    if fmt == "csv":
+        writer = csv.writer(Echo())
+        yield writer.writerow(COLUMNS)
+        for row in rows:
+            yield writer.writerow(
+                [
+                    json.dumps(row[column], ensure_ascii=False) if column in JSON_COLUMNS else row[column]
+                    for column in COLUMNS
+                ]
+            )
+    elif fmt == "jsonl":
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+    else:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
@@ -0,0 +1,98 @@
+import hashlib
+import json
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .cache import bump_version, get_version
+from .models import Category, Product, SubCategory, SubDetailCategory
+
+
+CATEGORY_TREE_VERSION_KEY = "mall:category-tree:version"
+CATEGORY_TREE_TIMEOUT = 60 * 60 * 24
+
+# 분류 단계별 (모델, Product의 FK 필드명)
+CATEGORY_LEVELS = (
+    (Category, "category"),
+    (SubCategory, "subcategory"),
+    (SubDetailCategory, "sub_detail_category"),
+)
+
+
+def build_category_tree():
+    """
+    분류 3단계를 하나의 JSON 문서로 만듭니다.
+    상품 수는 각 분류 행의 product_count 컬럼을 사용하므로 상품 테이블을 읽지 않습니다.
+    """
+    sub_details = defaultdict(list)
+    for row in SubDetailCategory.objects.order_by("id").values(
+        "id", "name", "product_count", "subcategory_id"
+    ):
+        sub_details[row.pop("subcategory_id")].append(row)
+
+    subcategories = defaultdict(list)
+    for row in SubCategory.objects.order_by("id").values(
+        "id", "name", "product_count", "category_id"
+    ):
+        row["sub_detail_categories"] = sub_details[row["id"]]
+        subcategories[row.pop("category_id")].append(row)
+
+    tree = []
+    for row in Category.objects.order_by("id").values("id", "name", "product_count"):
+        row["subcategories"] = subcategories[row["id"]]
+        tree.append(row)
+
+    body = json.dumps(tree, ensure_ascii=False, separators=(",", ":"))
+    etag = f'"{hashlib.md5(body.encode()).hexdigest()}"'
+    return {"etag": etag, "tree": tree}
+
+
+def get_category_tree():
+    """캐시된 분류 트리 문서를 반환합니다. 없으면 새로 만들어 저장합니다."""
+    # 문서를 만드는 도중 무효화되어도 이전 버전 키에 저장되므로 오래된 문서가 읽히지 않음
+    cache_key = f"mall:category-tree:v{get_version(CATEGORY_TREE_VERSION_KEY)}"
+    document = cache.get(cache_key)
+    if document is None:
+        document = build_category_tree()
+        cache.set(cache_key, document, CATEGORY_TREE_TIMEOUT)
+    return document
+
+
+def invalidate_category_tree():
+    transaction.on_commit(lambda: bump_version(CATEGORY_TREE_VERSION_KEY))
+
+
+def move_product_counts(old_path, new_path):
+    """
+    상품의 분류가 old_path에서 new_path로 바뀐 만큼 단계별 product_count를 F()로 증감합니다.
+    경로 값이 None인 단계는 증감하지 않습니다.
+    """
+    changed = False
+    for (model, _), old_id, new_id in zip(CATEGORY_LEVELS, old_path, new_path):
+        if old_id == new_id:
+            continue
+        if old_id is not None:
+            model.objects.filter(pk=old_id, product_count__gt=0).update(
+                product_count=F("product_count") - 1
+            )
+        if new_id is not None:
+            model.objects.filter(pk=new_id).update(product_count=F("product_count") + 1)
+        changed = True
+    return changed
+
+
+def rebuild_category_counts():
+    """모든 분류의 product_count를 상품 테이블 기준으로 다시 계산합니다. (보정용)"""
+    for model, field in CATEGORY_LEVELS:
+        counts = (
+            Product.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        model.objects.update(product_count=Coalesce(Subquery(counts), Value(0)))
+    invalidate_category_tree()
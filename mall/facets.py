@@ -0,0 +1,84 @@
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+
+from .models import Product
+
+
+# 가격대 구간 (하한 이상, 상한 미만). 마지막 구간은 상한 없음
+PRICE_BANDS = (
+    (0, 10000),
+    (10000, 30000),
+    (30000, 50000),
+    (50000, 100000),
+    (100000, None),
+)
+
+FACET_DIMENSIONS = (
+    "category_id",
+    "subcategory_id",
+    "sub_detail_category_id",
+    "status",
+    "price_band",
+)
+
+
+def price_band_expression():
+    """가격을 PRICE_BANDS 구간 번호로 바꾸는 CASE 식"""
+    whens = [
+        When(price__gte=low, price__lt=high, then=Value(index))
+        for index, (low, high) in enumerate(PRICE_BANDS)
+        if high is not None
+    ]
+    return Case(*whens, default=Value(len(PRICE_BANDS) - 1), output_field=IntegerField())
+
+
+def product_facets(queryset):
+    """
+    필터링된 상품 쿼리셋에 대해 카테고리/서브카테고리/세부 카테고리/상태/가격대별 상품 수를 계산합니다.
+    차원마다 COUNT 쿼리를 날리지 않고 GROUPING SETS로 한 번의 집계 쿼리에서 모두 구합니다.
+    """
+    filtered = (
+        queryset.order_by()
+        .annotate(price_band=price_band_expression())
+        .values(*FACET_DIMENSIONS)
+    )
+    sql, params = filtered.query.sql_with_params()
+    columns = ", ".join(FACET_DIMENSIONS)
+    grouping_sets = ", ".join(f"({dimension})" for dimension in FACET_DIMENSIONS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {columns}, GROUPING({columns}), COUNT(*) "
+            f"FROM ({sql}) AS filtered GROUP BY GROUPING SETS ({grouping_sets})",
+            params,
+        )
+        rows = cursor.fetchall()
+
+    counts = {dimension: {} for dimension in FACET_DIMENSIONS}
+    size = len(FACET_DIMENSIONS)
+    for row in rows:
+        grouping, count = row[size], row[size + 1]
+        # GROUPING 비트가 0인 컬럼이 해당 행의 그룹 기준 차원
+        for position, dimension in enumerate(FACET_DIMENSIONS):
+            if not grouping & (1 << (size - 1 - position)):
+                counts[dimension][row[position]] = count
+                break
+
+    status_labels = dict(Product.Status.choices)
+    return {
+        "categories": _id_counts(counts["category_id"]),
+        "subcategories": _id_counts(counts["subcategory_id"]),
+        "sub_detail_categories": _id_counts(counts["sub_detail_category_id"]),
+        "statuses": [
+            {"value": value, "label": status_labels.get(value, value), "count": count}
+            for value, count in sorted(counts["status"].items())
+        ],
+        "price_bands": [
+            {"min": low, "max": high, "count": counts["price_band"].get(index, 0)}
+            for index, (low, high) in enumerate(PRICE_BANDS)
+        ],
+    }
+
+
+def _id_counts(counts):
+    return [{"id": pk, "count": count} for pk, count in sorted(counts.items())]
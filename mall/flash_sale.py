@@ -0,0 +1,331 @@
+"""
+선착순 판매 (FlashSale).
+
+구매 요청이 한꺼번에 몰려도 DB 쓰기 양이 일정하도록 구매 여부와 주문 생성을 나눕니다.
+
+1. 입장: Lua 스크립트 한 번으로 남은 수량(Redis 카운터)을 줄이고 구매자를 기록한 뒤 티켓을 대기열에 넣습니다.
+   수량이 모자라면 바로 거절하며, 같은 구매자가 다시 요청하면 이전 티켓을 돌려줍니다. DB에는 쓰지 않습니다.
+2. 주문 생성: 주기 작업(drain_queue)이 대기열에서 한 번에 FLASH_SALE_DRAIN_BATCH개씩 꺼내
+   Order/OrderedProduct를 만들고 재고를 예약합니다. (mall.inventory) 초당 주문 생성 수는 배치 크기/주기로 정해집니다.
+3. 조회: 클라이언트는 티켓 상태(queued -> created/failed)를 폴링합니다. Redis만 읽습니다.
+
+- 카운터는 판매 시작 후 첫 입장 때 (판매 수량 - 주문 수량)으로 채워집니다. 판매 시작 후 바꾼 판매 수량은 반영되지 않습니다.
+- 주문을 만들던 작업이 죽으면 꺼낸 티켓이 처리 중 목록에 남아 다음 주기에 다시 처리합니다.
+  주문의 uid가 티켓 id이므로 이미 만든 주문은 다시 만들지 않습니다.
+- 주문을 만들지 못한 티켓(재고 부족 등)과 결제 없이 재고 예약이 만료된 주문은 수량을 카운터에 돌려주고
+  구매자 기록을 지워 다시 입장할 수 있게 합니다. (return_units)
+"""
+import logging
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import F
+
+from .inventory import OutOfStock, reserve as reserve_stock
+from .models import CartProduct, FlashSale, Order, OrderedProduct
+from .redis_client import get_redis, get_script
+from .seller_orders import record_lines
+
+logger = logging.getLogger(__name__)
+
+STOCK_KEY = "mall:flash-sale:{}:stock"
+# 구매자별 티켓 id (hash, field=사용자 id)
+BUYERS_KEY = "mall:flash-sale:{}:buyers"
+TICKET_KEY = "mall:flash-sale:ticket:{}"
+QUEUE_KEY = "mall:flash-sale:queue"
+# 주문 생성 중인 티켓 id. 작업이 끝나기 전에 죽으면 다음 주기에 이어서 처리
+PROCESSING_KEY = "mall:flash-sale:processing"
+DRAIN_LOCK_KEY = "mall:flash-sale:drain-lock"
+SALE_CACHE_KEY = "mall:flash-sale:{}"
+SALE_CACHE_TIMEOUT = 30
+
+QUEUED, CREATED, FAILED, EXPIRED = "queued", "created", "failed", "expired"
+
+# KEYS: 남은 수량, 구매자, 대기열, 티켓, ARGV: 사용자 id, 티켓 id, 수량, 판매 id, 티켓 만료(초), 구매자 목록 만료 시각
+# 카운터가 없으면 nil을 반환해 호출 측이 채운 뒤 다시 실행. 수량이 모자라면 0, 입장하면 티켓 id
+ADMIT_SCRIPT = """
+local existing = redis.call('HGET', KEYS[2], ARGV[1])
+if existing then
+    return existing
+end
+local remaining = redis.call('GET', KEYS[1])
+if not remaining then
+    return false
+end
+local quantity = tonumber(ARGV[3])
+if tonumber(remaining) < quantity then
+    return 0
+end
+redis.call('DECRBY', KEYS[1], quantity)
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('EXPIREAT', KEYS[2], ARGV[6])
+redis.call('HSET', KEYS[4], 'status', 'queued', 'sale', ARGV[4], 'user', ARGV[1], 'quantity', quantity)
+redis.call('EXPIRE', KEYS[4], ARGV[5])
+redis.call('RPUSH', KEYS[3], ARGV[2])
+return ARGV[2]
+"""
+
+# KEYS: 티켓, 남은 수량, 구매자, ARGV: 티켓 id, 현재 상태, 바꿀 상태, 오류
+# 티켓이 현재 상태일 때만 상태를 바꾸고 수량을 카운터에 돌려줌 (같은 티켓을 두 번 돌려주지 않음)
+# 카운터가 만료되었으면 다시 만들지 않고, 구매자 기록은 이 티켓일 때만 지움
+RETURN_SCRIPT = """
+local ticket = redis.call('HMGET', KEYS[1], 'status', 'user', 'quantity')
+if ticket[1] ~= ARGV[2] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'status', ARGV[3], 'error', ARGV[4])
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('INCRBY', KEYS[2], ticket[3])
+end
+if redis.call('HGET', KEYS[3], ticket[2]) == ARGV[1] then
+    redis.call('HDEL', KEYS[3], ticket[2])
+end
+return 1
+"""
+
+# KEYS: 대기열, 처리 중 목록, ARGV: 꺼낼 개수. 앞에서부터 꺼내 처리 중 목록으로 옮김
+CLAIM_SCRIPT = """
+local ticket_ids = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #ticket_ids > 0 then
+    redis.call('LTRIM', KEYS[1], #ticket_ids, -1)
+    redis.call('RPUSH', KEYS[2], unpack(ticket_ids))
+end
+return ticket_ids
+"""
+
+
+class FlashSaleError(ValueError):
+    pass
+
+
+class SoldOut(FlashSaleError):
+    pass
+
+
+def stock_key(sale_id):
+    return STOCK_KEY.format(sale_id)
+
+
+def buyers_key(sale_id):
+    return BUYERS_KEY.format(sale_id)
+
+
+def ticket_key(ticket_id):
+    return TICKET_KEY.format(ticket_id)
+
+
+def get_sale(sale_id):
+    """입장 요청마다 DB를 읽지 않도록 판매 정보를 잠깐 캐시합니다. 없으면 None"""
+    return cache.get_or_set(
+        SALE_CACHE_KEY.format(sale_id),
+        lambda: FlashSale.objects.filter(pk=sale_id).first(),
+        SALE_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_sale(sale_id):
+    transaction.on_commit(lambda: cache.delete(SALE_CACHE_KEY.format(sale_id)))
+
+
+def expire_at(sale):
+    # 판매가 끝나고 티켓 만료 시간이 지나면 카운터와 구매자 목록을 지움
+    return int(sale.ends_at.timestamp()) + settings.FLASH_SALE_TICKET_TTL
+
+
+def open_sale(sale):
+    """남은 수량 카운터를 채웁니다. 이미 있으면 그대로 둠 (동시에 채워도 한 번만)"""
+    remaining = max(sale.quantity - FlashSale.objects.filter(pk=sale.pk).values_list("sold", flat=True).get(), 0)
+    get_redis().set(stock_key(sale.pk), remaining, nx=True, exat=expire_at(sale))
+
+
+def remaining(sales):
+    """{판매 id: 남은 수량}. 아직 입장이 없었던 판매는 (판매 수량 - 주문 수량)"""
+    if not sales:
+        return {}
+    values = get_redis().mget([stock_key(sale.pk) for sale in sales])
+    return {
+        sale.pk: int(value) if value is not None else max(sale.quantity - sale.sold, 0)
+        for sale, value in zip(sales, values)
+    }
+
+
+def enter(sale, user_id, quantity=1):
+    """
+    선착순 구매에 입장합니다. 입장하면 티켓 id를 반환합니다.
+    판매 기간이 아니거나 수량이 맞지 않으면 FlashSaleError, 남은 수량이 모자라면 SoldOut
+    """
+    if not sale.is_open():
+        raise FlashSaleError("판매 기간이 아닙니다.")
+    if not 1 <= quantity <= sale.max_per_user:
+        raise FlashSaleError(f"1인당 1 ~ {sale.max_per_user}개까지 구매할 수 있습니다.")
+
+    ticket_id = str(uuid4())
+    keys = [stock_key(sale.pk), buyers_key(sale.pk), QUEUE_KEY, ticket_key(ticket_id)]
+    args = [user_id, ticket_id, quantity, sale.pk, settings.FLASH_SALE_TICKET_TTL, expire_at(sale)]
+    result = get_script(ADMIT_SCRIPT)(keys=keys, args=args)
+    if result is None:
+        open_sale(sale)
+        result = get_script(ADMIT_SCRIPT)(keys=keys, args=args)
+    if not result:
+        raise SoldOut("준비된 수량이 모두 판매되었습니다.")
+    return result
+
+
+def get_ticket(ticket_id):
+    """티켓 상태 {"ticket", "status", "sale", "user", "quantity", "order", "error"}. 없거나 만료되면 None"""
+    values = get_redis().hgetall(ticket_key(ticket_id))
+    if not values:
+        return None
+    return {
+        "ticket": ticket_id,
+        "status": values["status"],
+        "sale": int(values["sale"]),
+        "user": int(values["user"]),
+        "quantity": int(values["quantity"]),
+        "order": int(values["order"]) if values.get("order") else None,
+        "error": values.get("error", ""),
+    }
+
+
+def return_units(ticket_id, sale_id, from_status, to_status, error=""):
+    """티켓의 수량을 남은 수량에 돌려주고 구매자 기록을 지웁니다. 돌려줬으면 True"""
+    keys = [ticket_key(ticket_id), stock_key(sale_id), buyers_key(sale_id)]
+    return bool(get_script(RETURN_SCRIPT)(keys=keys, args=[ticket_id, from_status, to_status, error]))
+
+
+def release_expired_orders(order_ids):
+    """
+    결제 없이 재고 예약이 만료된 주문 중 선착순 주문의 수량을 판매에 돌려줍니다. (mall.inventory.release_expired)
+    주문의 uid로 티켓을 찾으며, 돌려준 수량만큼 FlashSale.sold도 줄입니다.
+    """
+    orders = dict(Order.objects.filter(pk__in=order_ids).values_list("pk", "uid"))
+    if not orders:
+        return 0
+    client = get_redis()
+    pipe = client.pipeline(transaction=False)
+    for uid in orders.values():
+        pipe.hmget(ticket_key(uid), "sale", "order", "quantity")
+    returned = {}
+    for (order_id, uid), (sale_id, ticket_order, quantity) in zip(orders.items(), pipe.execute()):
+        if ticket_order != str(order_id):
+            continue  # 선착순 주문이 아니거나 티켓이 만료됨
+        if return_units(str(uid), sale_id, CREATED, EXPIRED, "결제 시간이 지났습니다."):
+            returned[int(sale_id)] = returned.get(int(sale_id), 0) + int(quantity)
+    for sale_id, quantity in returned.items():
+        FlashSale.objects.filter(pk=sale_id).update(sold=F("sold") - quantity)
+    return sum(returned.values())
+
+
+def create_orders(tickets):
+    """
+    티켓들의 주문을 한 트랜잭션으로 만듭니다. (티켓마다 savepoint)
+    한 티켓의 주문 생성이 DB 오류로 실패하면 그 티켓만 실패로 처리해 대기열이 막히지 않게 합니다.
+    반환값: {티켓 id: (상태, 주문 id, 오류)}
+    """
+    sales = FlashSale.objects.select_related("product", "option").in_bulk({ticket["sale"] for ticket in tickets})
+    # 이전 작업이 주문을 만든 뒤 티켓 상태를 기록하지 못하고 죽은 경우
+    created = dict(Order.objects.filter(uid__in=[ticket["ticket"] for ticket in tickets]).values_list("uid", "pk"))
+    created = {str(uid): pk for uid, pk in created.items()}
+    emails = dict(
+        get_user_model().objects.filter(pk__in={ticket["user"] for ticket in tickets}).values_list("pk", "email")
+    )
+
+    results = {}
+    sold = {}
+    with transaction.atomic():
+        for ticket in tickets:
+            ticket_id, sale = ticket["ticket"], sales.get(ticket["sale"])
+            if ticket_id in created:
+                results[ticket_id] = (CREATED, created[ticket_id], "")
+                continue
+            if sale is None:
+                results[ticket_id] = (FAILED, None, "판매가 종료되었습니다.")
+                continue
+            if ticket["user"] not in emails:
+                results[ticket_id] = (FAILED, None, "탈퇴한 사용자입니다.")
+                continue
+
+            line = CartProduct(product=sale.product, option=sale.option, quantity=ticket["quantity"])
+            try:
+                with transaction.atomic():
+                    order = Order.objects.create(
+                        uid=ticket_id,
+                        user_id=ticket["user"],
+                        total_amount=line.total_price,
+                        **Order.summary_fields([sale.product]),
+                    )
+                    ordered_product = OrderedProduct.objects.create(
+                        order=order,
+                        product=sale.product,
+                        option=sale.option,
+                        name=sale.product.name,
+                        price=line.unit_price,
+                        quantity=line.quantity,
+                    )
+                    record_lines(order, [ordered_product], emails.get(ticket["user"]))
+                    reserve_stock(order, [ordered_product])
+            except OutOfStock as e:
+                results[ticket_id] = (FAILED, None, str(e))
+                continue
+            except DatabaseError:
+                logger.exception(f"선착순 주문 생성 중 DB 오류 (티켓 {ticket_id})")
+                results[ticket_id] = (FAILED, None, "주문을 만들지 못했습니다.")
+                continue
+            results[ticket_id] = (CREATED, order.pk, "")
+            sold[sale.pk] = sold.get(sale.pk, 0) + line.quantity
+
+        for sale_id, quantity in sold.items():
+            FlashSale.objects.filter(pk=sale_id).update(sold=F("sold") + quantity)
+    return results
+
+
+def drain_queue(limit=None, lock_timeout=300):
+    """
+    대기열에서 티켓을 꺼내 주문을 만들고 티켓 상태를 기록합니다. 처리한 티켓 수를 반환합니다.
+    티켓 하나의 DB 오류는 그 티켓만 실패로 처리하고(create_orders), 트랜잭션 전체가 실패하면
+    꺼낸 티켓은 처리 중 목록에 남아 다음 주기에 다시 처리됩니다.
+    """
+    client = get_redis()
+    if not client.set(DRAIN_LOCK_KEY, 1, nx=True, ex=lock_timeout):
+        return 0  # 다른 작업이 처리 중
+
+    try:
+        ticket_ids = client.lrange(PROCESSING_KEY, 0, -1)
+        if not ticket_ids:
+            ticket_ids = get_script(CLAIM_SCRIPT)(
+                keys=[QUEUE_KEY, PROCESSING_KEY], args=[limit or settings.FLASH_SALE_DRAIN_BATCH]
+            )
+        if not ticket_ids:
+            return 0
+
+        pipe = client.pipeline(transaction=False)
+        for ticket_id in ticket_ids:
+            pipe.hgetall(ticket_key(ticket_id))
+        tickets = [
+            {
+                "ticket": ticket_id,
+                "sale": int(values["sale"]),
+                "user": int(values["user"]),
+                "quantity": int(values["quantity"]),
+            }
+            for ticket_id, values in zip(ticket_ids, pipe.execute())
+            if values.get("status") == QUEUED  # 만료된 티켓은 건너뜀
+        ]
+        results = create_orders(tickets) if tickets else {}
+
+        sales = {ticket["ticket"]: ticket["sale"] for ticket in tickets}
+        pipe = client.pipeline(transaction=False)
+        for ticket_id, (ticket_status, order_id, error) in results.items():
+            if ticket_status == FAILED:
+                logger.warning(f"선착순 주문 생성 실패 (티켓 {ticket_id}): {error}")
+                return_units(ticket_id, sales[ticket_id], QUEUED, FAILED, error)
+                continue
+            pipe.hset(ticket_key(ticket_id), mapping={"status": ticket_status, "order": order_id or "", "error": error})
+        pipe.delete(PROCESSING_KEY)
+        pipe.execute()
+        return len(results)
+    finally:
+        client.delete(DRAIN_LOCK_KEY)
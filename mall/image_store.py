@@ -0,0 +1,175 @@
+"""
+내용 주소(content-addressed) 기반 상품 이미지 저장.
+
+이미지 파일은 내용의 SHA-256 값으로 이름을 정해 저장하므로 같은 사진을 여러 번 올려도 파일은 하나만 남고,
+여러 ProductImage 행이 같은 파일을 가리킵니다. 리사이즈본도 원본 파일 이름 기준이라 함께 공유됩니다.
+파일을 가리키는 행 수(상품 이미지와 주문 목록 썸네일 Order.first_product_image)가 참조 수이며,
+마지막 행이 지워질 때 원본과 리사이즈본을 지웁니다.
+
+저장(store_blob)과 정리(release_file)는 내용 해시별 Redis 잠금으로 순서를 정합니다.
+저장하면 잠시 임대(lease) 표시를 남겨, 파일을 가리킬 행이 커밋되기 전에 정리 작업이 지우지 않도록 합니다.
+임대 중이라 미룬 정리는 주기 작업(release_deferred)이 임대가 끝난 뒤 다시 확인합니다.
+"""
+import hashlib
+import posixpath
+import time
+
+from django.core.files.storage import default_storage
+from django.db import models
+from django.db.models.fields.files import ImageFieldFile
+
+from .redis_client import get_redis
+
+BLOB_ROOT = "mall/product/blobs"
+# 내용 주소 저장 이전에 upload_to 경로로 올라온 상품 이미지 (dedupe_product_images 명령으로 옮김)
+LEGACY_ROOT = "mall/product/images"
+HASH_CHUNK_SIZE = 1024 * 1024
+EXTENSION_ALIASES = {"jpeg": "jpg"}
+
+BLOB_LOCK_KEY = "mall:image-store:{}:lock"
+BLOB_LEASE_KEY = "mall:image-store:{}:lease"
+BLOB_LOCK_TIMEOUT = 60
+# 저장한 파일을 가리킬 행이 커밋될 때까지 정리를 미루는 시간
+BLOB_LEASE_TIMEOUT = 10 * 60
+# 임대 때문에 미룬 정리 (sorted set, member=파일 이름, score=다시 확인할 시각)
+DEFERRED_KEY = "mall:image-store:deferred"
+DEFERRED_BATCH_SIZE = 1000
+
+
+def content_hash(stream):
+    """파일 내용의 SHA-256 (조각 단위로 읽어 메모리 사용량 일정)"""
+    digest = hashlib.sha256()
+    while chunk := stream.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_name(digest, filename):
+    """abcd...ef + photo.JPEG -> mall/product/blobs/ab/abcd...ef.jpg"""
+    extension = posixpath.splitext(filename)[1].lstrip(".").lower()
+    extension = EXTENSION_ALIASES.get(extension, extension)
+    return posixpath.join(BLOB_ROOT, digest[:2], f"{digest}.{extension}" if extension else digest)
+
+
+def is_blob(name):
+    return name.startswith(f"{BLOB_ROOT}/")
+
+
+def is_product_image_path(name):
+    """상품 이미지 저장 경로(내용 주소 또는 이전 upload_to 경로) 안의 파일 이름인지 ('..' 등으로 벗어나면 False)"""
+    return (
+        isinstance(name, str)
+        and posixpath.normpath(name) == name
+        and (is_blob(name) or name.startswith(f"{LEGACY_ROOT}/"))
+    )
+
+
+def blob_lock(name):
+    digest = posixpath.splitext(posixpath.basename(name))[0]
+    return get_redis().lock(
+        BLOB_LOCK_KEY.format(digest), timeout=BLOB_LOCK_TIMEOUT, blocking_timeout=BLOB_LOCK_TIMEOUT
+    )
+
+
+def lease_key(name):
+    return BLOB_LEASE_KEY.format(name)
+
+
+def store_blob(name, content, storage=default_storage):
+    """
+    내용 주소 이름으로 저장합니다. 같은 내용의 파일이 이미 있으면 저장하지 않습니다.
+    동시에 같은 파일이 올라와 저장소가 다른 이름을 붙였다면 그 사본은 지웁니다.
+    """
+    # 정리 작업이 참조를 확인한 뒤 지우기 전에 끼어들지 않도록 잠금 안에서 임대 표시
+    with blob_lock(name):
+        get_redis().set(lease_key(name), 1, ex=BLOB_LEASE_TIMEOUT)
+    if storage.exists(name):
+        return name
+    saved = storage.save(name, content)
+    if saved != name:
+        storage.delete(saved)
+    return name
+
+
+def store_file(file, storage=default_storage, filename=None):
+    """업로드된 파일을 내용 주소 이름으로 저장하고 그 이름을 반환합니다."""
+    file.seek(0)
+    name = blob_name(content_hash(file), filename or file.name)
+    file.seek(0)
+    return store_blob(name, file, storage)
+
+
+def release_file(name, storage=default_storage):
+    """
+    더 이상 어떤 상품 이미지/주문도 가리키지 않는 내용 주소 파일이면 원본과 리사이즈본을 지웁니다.
+    내용 주소 이름이 아니면 지우지 않고, 방금 저장된 파일이면 임대가 끝난 뒤 다시 확인하도록 미룹니다.
+    반환값: 지웠으면 True
+    """
+    if not name or not is_blob(name):
+        return False
+    client = get_redis()
+    with blob_lock(name):
+        ttl = client.ttl(lease_key(name))
+        if ttl > 0:
+            client.zadd(DEFERRED_KEY, {name: time.time() + ttl})
+            return False
+        return delete_unreferenced(name, storage)
+
+
+def release_deferred(storage=default_storage):
+    """임대가 끝난 미룬 정리를 다시 실행합니다. 지운 파일 수를 반환합니다."""
+    client = get_redis()
+    names = client.zrangebyscore(DEFERRED_KEY, "-inf", time.time(), start=0, num=DEFERRED_BATCH_SIZE)
+    deleted = 0
+    for name in names:
+        # 그사이 다시 저장되어 임대 중이면 release_file이 다시 미룸
+        client.zrem(DEFERRED_KEY, name)
+        deleted += release_file(name, storage)
+    return deleted
+
+
+def delete_unreferenced(name, storage=default_storage):
+    """상품 이미지도 주문 목록 썸네일도 가리키지 않는 파일이면 원본과 리사이즈본을 지웁니다. 반환값: 지웠으면 True"""
+    from .models import Order, ProductImage
+    from .renditions import RENDITION_FORMATS, RENDITION_SIZES, delete_files, rendition_name
+
+    if (
+        ProductImage.objects.filter(image=name).exists()
+        or Order.objects.filter(first_product_image=name).exists()
+    ):
+        return False
+    delete_files(
+        storage,
+        [
+            name,
+            *(
+                rendition_name(name, size, extension)
+                for size in RENDITION_SIZES
+                for extension in RENDITION_FORMATS
+            ),
+        ],
+    )
+    return True
+
+
+class ContentAddressedFieldFile(ImageFieldFile):
+    def save(self, name, content, save=True):
+        # image.save(name, content)로 저장해도 upload_to 경로 대신 내용 주소 이름 사용
+        self.name = store_file(content, self.storage, filename=name)
+        setattr(self.instance, self.field.attname, self.name)
+        self._committed = True
+        if save:
+            self.instance.save()
+
+
+class ContentAddressedImageField(models.ImageField):
+    """새로 올라온 파일을 upload_to 경로 대신 내용 주소 이름으로 저장하는 ImageField"""
+
+    attr_class = ContentAddressedFieldFile
+
+    def pre_save(self, model_instance, add):
+        file = getattr(model_instance, self.attname)
+        if file and not file._committed:
+            file.name = store_file(file.file, file.storage)
+            file._committed = True
+        return file
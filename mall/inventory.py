@@ -0,0 +1,231 @@
+"""
+재고 예약 (Stock, StockReservation).
+
+- 예약: 주문 생성 트랜잭션 안에서 재고 행마다 UPDATE ... SET available = available - n WHERE available >= n 한 번.
+  재고가 모자라면 0행이 바뀌므로 주문 전체를 되돌립니다. 행 잠금은 주문 생성 트랜잭션 동안만 잡히며
+  결제를 기다리는 동안에는 잡지 않습니다. 여러 재고 행은 id 순서로 줄여 주문끼리 교착되지 않습니다.
+- 확정: 결제 완료(OrderPayment.portone_check) 시 HELD -> COMMITTED.
+  결제 전에 만료된 예약을 다시 잡지 못하면 결제를 취소합니다. (cancel_payment)
+- 해제: 주문/상품 취소 시 RELEASED, 결제 없이 만료되면 EXPIRED로 바꾸고 재고를 돌려줍니다.
+- 재고를 관리하는 상품은 모든 재고가 0이 되면 품절, 다시 생기면 판매 중으로 바뀝니다.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+from redis import RedisError
+
+from .cache import PRODUCT_VERSION_KEY, bump_version, invalidate_product_detail
+from .models import OrderPayment, Product, Stock, StockReservation
+from .tasks import cancel_payment
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+class OutOfStock(ValueError):
+    def __init__(self, shortages):
+        # [{"product", "option", "requested", "available"}, ...]
+        self.shortages = shortages
+        names = ", ".join(
+            f"{line['product']} ({line['option']})" if line["option"] else line["product"] for line in shortages
+        )
+        super().__init__(f"재고가 부족합니다: {names}")
+
+
+def find_stocks(lines):
+    """
+    [(상품 id, 옵션 id), ...] -> {(상품 id, 옵션 id): Stock}
+    옵션 재고가 있으면 옵션 재고, 없으면 상품 전체 재고를 씁니다. 둘 다 없으면 재고를 관리하지 않는 상품이라 빠집니다.
+    """
+    stocks = {
+        (stock.product_id, stock.option_id): stock
+        for stock in Stock.objects.filter(product_id__in={product_id for product_id, _ in lines})
+    }
+    found = {}
+    for product_id, option_id in lines:
+        stock = stocks.get((product_id, option_id)) or stocks.get((product_id, None))
+        if stock is not None:
+            found[(product_id, option_id)] = stock
+    return found
+
+
+def reserve(order, ordered_products):
+    """
+    저장된 주문 상품들의 재고를 예약합니다. 하나라도 모자라면 OutOfStock (줄인 재고는 모두 되돌림)
+    """
+    stocks = find_stocks([(line.product_id, line.option_id) for line in ordered_products])
+    requested = {}
+    for line in ordered_products:
+        stock = stocks.get((line.product_id, line.option_id))
+        if stock is not None:
+            requested[stock.pk] = requested.get(stock.pk, 0) + line.quantity
+    if not requested:
+        return []
+
+    with transaction.atomic():
+        short = [
+            stock_id
+            for stock_id, quantity in sorted(requested.items())
+            if not Stock.objects.filter(pk=stock_id, available__gte=quantity).update(
+                available=F("available") - quantity
+            )
+        ]
+        if short:
+            shortages = [
+                {
+                    "product": stock.product.name,
+                    "option": stock.option.name if stock.option else None,
+                    "requested": requested[stock.pk],
+                    "available": stock.available,
+                }
+                for stock in Stock.objects.filter(pk__in=short).select_related("product", "option")
+            ]
+            raise OutOfStock(shortages)
+
+        expires_at = timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+        reservations = StockReservation.objects.bulk_create([
+            StockReservation(
+                order=order,
+                ordered_product=line,
+                stock=stocks[(line.product_id, line.option_id)],
+                quantity=line.quantity,
+                expires_at=expires_at,
+            )
+            for line in ordered_products
+            if (line.product_id, line.option_id) in stocks
+        ])
+        # 마지막 재고를 가져간 주문만 품절 처리 확인
+        if Stock.objects.filter(pk__in=requested, available=0).exists():
+            refresh_sold_out({stock.product_id for stock in stocks.values()})
+    return reservations
+
+
+def restock(quantities):
+    """{재고 id: 돌려줄 수량}을 재고에 더합니다. (id 순서로 갱신해 교착 방지)"""
+    for stock_id, quantity in sorted(quantities.items()):
+        Stock.objects.filter(pk=stock_id).update(available=F("available") + quantity)
+    product_ids = set(Stock.objects.filter(pk__in=quantities).values_list("product_id", flat=True))
+    refresh_sold_out(product_ids)
+
+
+def _release(reservations, status, skip_locked=False):
+    """예약을 status로 바꾸고 재고를 돌려줍니다. 해제한 예약의 주문 id 목록을 반환합니다. (예약마다 하나)"""
+    with transaction.atomic():
+        rows = list(
+            reservations.select_for_update(skip_locked=skip_locked).values_list(
+                "id", "order_id", "stock_id", "quantity"
+            )
+        )
+        if not rows:
+            return []
+        StockReservation.objects.filter(pk__in=[row[0] for row in rows]).update(
+            status=status, updated_at=timezone.now()
+        )
+        quantities = {}
+        for _, _, stock_id, quantity in rows:
+            quantities[stock_id] = quantities.get(stock_id, 0) + quantity
+        restock(quantities)
+    return [order_id for _, order_id, _, _ in rows]
+
+
+def release(order_id=None, ordered_product_ids=None):
+    """취소된 주문(또는 주문 상품)의 예약을 해제하고 재고를 돌려줍니다. 이미 해제된 예약은 건너뜁니다."""
+    reservations = StockReservation.objects.filter(
+        status__in=[StockReservation.Status.HELD, StockReservation.Status.COMMITTED]
+    )
+    if order_id is not None:
+        reservations = reservations.filter(order_id=order_id)
+    if ordered_product_ids is not None:
+        reservations = reservations.filter(ordered_product_id__in=ordered_product_ids)
+    return len(_release(reservations, StockReservation.Status.RELEASED))
+
+
+def release_expired(limit=BATCH_SIZE):
+    """
+    결제 없이 만료된 예약의 재고를 돌려줍니다. 선착순 주문이면 판매 수량도 돌려줍니다.
+    (주기 작업, 여러 워커가 동시에 실행해도 같은 예약을 두 번 풀지 않음)
+    """
+    held = StockReservation.objects.filter(status=StockReservation.Status.HELD)
+    expired_ids = list(
+        held.filter(expires_at__lt=timezone.now()).order_by("expires_at").values_list("pk", flat=True)[:limit]
+    )
+    # 잠금을 기다리지 않고(결제 확정 중인 예약은 건너뜀) 잠근 뒤에도 아직 예약 중인 행만 해제
+    order_ids = _release(held.filter(pk__in=expired_ids), StockReservation.Status.EXPIRED, skip_locked=True)
+    if order_ids:
+        from .flash_sale import release_expired_orders  # 순환 import 방지
+
+        try:
+            release_expired_orders(set(order_ids))
+        except RedisError as e:
+            logger.warning(f"만료된 선착순 주문 수량 반환 실패 (주문 {sorted(set(order_ids))}): {e}")
+    return len(order_ids)
+
+
+def commit(order_id):
+    """
+    결제 완료된 주문의 예약을 확정합니다.
+    결제 전에 만료되어 재고를 돌려준 줄은 다시 예약하고, 그 사이 재고가 없어졌으면 주문의 결제를 취소합니다.
+    반환값: 다시 잡지 못한 예약 id 목록
+    """
+    short = []
+    with transaction.atomic():
+        StockReservation.objects.filter(order_id=order_id, status=StockReservation.Status.HELD).update(
+            status=StockReservation.Status.COMMITTED, updated_at=timezone.now()
+        )
+        expired = list(
+            StockReservation.objects.select_for_update()
+            .filter(order_id=order_id, status=StockReservation.Status.EXPIRED)
+            .order_by("stock_id")
+        )
+        for reservation in expired:
+            taken = Stock.objects.filter(pk=reservation.stock_id, available__gte=reservation.quantity).update(
+                available=F("available") - reservation.quantity
+            )
+            if taken:
+                reservation.status = StockReservation.Status.COMMITTED
+                reservation.save(update_fields=["status", "updated_at"])
+            else:
+                short.append(reservation.pk)
+        if expired:
+            refresh_sold_out(set(Stock.objects.filter(
+                pk__in=[reservation.stock_id for reservation in expired]
+            ).values_list("product_id", flat=True)))
+
+    if short:
+        # 보낼 수 없는 주문이므로 결제를 취소 (취소되면 주문이 CANCELLED로 바뀌고 확정한 예약도 돌려줌)
+        reason = "결제 완료 전에 재고 예약이 만료되어 재고가 부족합니다."
+        logger.error(f"주문 {order_id} {reason} 결제를 취소합니다. (예약 {short})")
+        payment_ids = list(
+            OrderPayment.objects.filter(order_id=order_id, pay_status=OrderPayment.PayStatus.PAID)
+            .values_list("pk", flat=True)
+        )
+        transaction.on_commit(lambda: [cancel_payment.delay(payment_id, reason) for payment_id in payment_ids])
+    return short
+
+
+def refresh_sold_out(product_ids):
+    """재고를 관리하는 상품 중 남은 재고가 없는 판매 중 상품은 품절로, 재고가 생긴 품절 상품은 판매 중으로 바꿉니다."""
+    if not product_ids:
+        return
+    in_stock = Exists(Stock.objects.filter(product_id=OuterRef("pk"), available__gt=0))
+    products = Product.objects.filter(Exists(Stock.objects.filter(product_id=OuterRef("pk"))), pk__in=product_ids)
+    sold_out = list(
+        products.filter(status=Product.Status.ACTIVE).exclude(in_stock).values_list("pk", flat=True)
+    )
+    restocked = list(
+        products.filter(status=Product.Status.SOLD_OUT).filter(in_stock).values_list("pk", flat=True)
+    )
+    if sold_out:
+        Product.objects.filter(pk__in=sold_out).update(status=Product.Status.SOLD_OUT, updated_at=timezone.now())
+    if restocked:
+        Product.objects.filter(pk__in=restocked).update(status=Product.Status.ACTIVE, updated_at=timezone.now())
+    if sold_out or restocked:
+        # 매장 목록(판매 중 상품)과 상세 캐시 무효화
+        transaction.on_commit(lambda: bump_version(PRODUCT_VERSION_KEY))
+        for product_id in sold_out + restocked:
+            invalidate_product_detail(product_id)
@@ -0,0 +1,145 @@
+import logging
+from uuid import uuid4
+
+from redis import RedisError
+
+from .models import OrderedProduct, Product
+from .redis_client import get_redis, get_script
+
+
+logger = logging.getLogger(__name__)
+
+# 판매량 순위표 (sorted set, member=상품 id, score=판매 수량)
+SALES_KEY = "mall:leaderboard:sales"
+CATEGORY_SALES_KEY = "mall:leaderboard:sales:category:{}"
+# 순위표를 DB 판매량으로 채웠는지 표시. Redis가 재시작되면 사라져 다시 채움
+SEEDED_KEY = "mall:leaderboard:sales:seeded"
+SEED_LOCK_KEY = "mall:leaderboard:sales:seeding"
+# 채우는 중인 임시 순위표. 채우다 죽으면 만료되어 사라짐
+SEED_TMP_KEY = "mall:leaderboard:seed:{}:{}"
+SEED_TMP_TIMEOUT = 60 * 60
+BATCH_SIZE = 1000
+
+# KEYS: 채움 표시, 순위표1, 임시1, 순위표2, 임시2, ...
+# 아직 채운 적이 없을 때만 임시 순위표를 순위표에 더하고 표시를 남김. 이미 채워졌으면 임시 순위표만 지움
+MERGE_SEED_SCRIPT = """
+local merge = redis.call('EXISTS', KEYS[1]) == 0
+for i = 2, #KEYS, 2 do
+    if merge then
+        redis.call('ZUNIONSTORE', KEYS[i], 2, KEYS[i], KEYS[i + 1])
+    end
+    redis.call('DEL', KEYS[i + 1])
+end
+if merge then
+    redis.call('SET', KEYS[1], 1)
+end
+return merge and 1 or 0
+"""
+
+
+def category_key(category_id):
+    return CATEGORY_SALES_KEY.format(category_id)
+
+
+def ensure_seeded(client):
+    """
+    순위표가 비어 있으면 Product.sales_count로 채웁니다.
+    임시 순위표에 먼저 모은 뒤 스크립트 한 번으로 더하므로, 채우는 도중 들어온 판매량이 유실되지 않고
+    잠금이 만료되어 두 프로세스가 함께 채워도 한 번만 더해집니다.
+    """
+    if client.exists(SEEDED_KEY):
+        return
+    if not client.set(SEED_LOCK_KEY, 1, nx=True, ex=60):
+        return  # 다른 프로세스가 채우는 중
+
+    run_id = uuid4().hex
+    tmp_keys = {}  # 순위표 -> 임시 순위표
+    try:
+        rows = (
+            Product.objects.filter(sales_count__gt=0)
+            .values_list("id", "category_id", "sales_count")
+            .iterator(chunk_size=BATCH_SIZE)
+        )
+        pipe = client.pipeline(transaction=False)
+        for index, (product_id, category_id, sales_count) in enumerate(rows, 1):
+            for key in (SALES_KEY, category_key(category_id)):
+                is_new = key not in tmp_keys
+                if is_new:
+                    tmp_keys[key] = SEED_TMP_KEY.format(run_id, len(tmp_keys))
+                pipe.zadd(tmp_keys[key], {product_id: sales_count})
+                if is_new:
+                    pipe.expire(tmp_keys[key], SEED_TMP_TIMEOUT)
+            if index % BATCH_SIZE == 0:
+                pipe.execute()
+        pipe.execute()
+
+        keys = [SEEDED_KEY]
+        for key, tmp in tmp_keys.items():
+            keys += [key, tmp]
+        get_script(MERGE_SEED_SCRIPT)(keys=keys)
+    finally:
+        client.delete(SEED_LOCK_KEY)
+
+
+def record_order_sales(order_id):
+    """결제 완료된 주문의 상품별 수량을 전체/카테고리 순위표에 더합니다."""
+    lines = (
+        OrderedProduct.objects.filter(order_id=order_id)
+        .exclude(status=OrderedProduct.Status.CANCELLED)
+        .values_list("product_id", "product__category_id", "quantity")
+    )
+    try:
+        client = get_redis()
+        ensure_seeded(client)
+        pipe = client.pipeline(transaction=False)
+        for product_id, category_id, quantity in lines:
+            pipe.zincrby(SALES_KEY, quantity, product_id)
+            pipe.zincrby(category_key(category_id), quantity, product_id)
+        pipe.execute()
+    except RedisError as e:
+        # 순위표 갱신 실패가 결제 처리를 막지 않도록 기록만 남김
+        logger.error(f"주문 {order_id} 판매량 집계 실패: {e}", exc_info=e)
+
+
+def remove_product(product_id, category_id):
+    """삭제된 상품을 순위표에서 뺍니다."""
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.zrem(SALES_KEY, product_id)
+        pipe.zrem(category_key(category_id), product_id)
+        pipe.execute()
+    except RedisError as e:
+        logger.error(f"상품 {product_id} 순위표 제거 실패: {e}", exc_info=e)
+
+
+def top_product_ids(limit, category_id=None):
+    """판매량 상위 상품 id 목록 (판매량 내림차순)"""
+    client = get_redis()
+    ensure_seeded(client)
+    key = category_key(category_id) if category_id else SALES_KEY
+    return [int(product_id) for product_id in client.zrevrange(key, 0, limit - 1)]
+
+
+def sync_sales_counts():
+    """순위표의 판매량을 Product.sales_count에 반영합니다. 바뀐 상품 수를 반환합니다."""
+    client = get_redis()
+    updated = 0
+    batch = {}
+    for product_id, score in client.zscan_iter(SALES_KEY, count=BATCH_SIZE):
+        batch[int(product_id)] = int(score)
+        if len(batch) >= BATCH_SIZE:
+            updated += _write_sales_counts(batch)
+            batch = {}
+    if batch:
+        updated += _write_sales_counts(batch)
+    return updated
+
+
+def _write_sales_counts(counts):
+    changed = []
+    for product in Product.objects.filter(pk__in=counts).only("id", "sales_count"):
+        if product.sales_count != counts[product.pk]:
+            product.sales_count = counts[product.pk]
+            changed.append(product)
+    Product.objects.bulk_update(changed, ["sales_count"])
+    return len(changed)
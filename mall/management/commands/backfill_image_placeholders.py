@@ -0,0 +1,39 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from mall.cache import invalidate_product_detail
+from mall.models import ProductImage
+from mall.renditions import describe
+
+
+class Command(BaseCommand):
+    help = (
+        "원본 크기와 미리보기(placeholder)가 없는 상품 이미지를 채웁니다. "
+        "같은 파일을 가리키는 행은 한 번만 읽어 함께 채웁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="이미 채워진 이미지도 다시 계산")
+
+    def handle(self, *args, **options):
+        queryset = ProductImage.objects.exclude(image="")
+        if not options["all"]:
+            queryset = queryset.filter(placeholder="")
+
+        filled = failed = 0
+        product_ids = set()
+        for name in queryset.order_by("image").values_list("image", flat=True).distinct().iterator():
+            try:
+                with default_storage.open(name, "rb") as source:
+                    metadata = describe(source.read())
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"미리보기 생성 실패 ({name}): {e}")
+                continue
+            images = ProductImage.objects.filter(image=name)
+            product_ids.update(images.values_list("product_id", flat=True))
+            filled += images.update(**metadata)
+
+        for product_id in product_ids:
+            invalidate_product_detail(product_id)
+        self.stdout.write(self.style.SUCCESS(f"미리보기 채우기 완료: {filled}개 이미지 (실패 {failed}개 파일)"))
@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from mall.models import Product
+from mall.pagination import ProductPagination
+
+
+class Command(BaseCommand):
+    help = (
+        "매장 상품 목록 쿼리(판매 중 + 분류/가격 필터 + 정렬)의 실행 계획과 실행 시간을 출력합니다. "
+        "각 쿼리가 판매 중 부분 인덱스를 사용하는지 확인하는 용도입니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=5, help="쿼리별 실행 횟수 (평균 시간 계산)")
+        parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE로 실제 실행 통계 출력")
+        parser.add_argument(
+            "--no-seqscan",
+            action="store_true",
+            help="순차 스캔을 끈 상태로 계획을 세움 (데이터가 적은 개발 DB에서 인덱스 사용 가능 여부 확인용)",
+        )
+
+    def get_cases(self):
+        first = Product.objects.active().values("category_id", "subcategory_id", "price").first() or {}
+        category_id = first.get("category_id", 1)
+        subcategory_id = first.get("subcategory_id", 1)
+        price = first.get("price", 0)
+        orderings = ProductPagination.ordering_options
+        # 이미지 prefetch를 빼고 목록 본 쿼리만 측정
+        active = Product.objects.active().for_list().prefetch_related(None)
+        return [
+            ("판매량 순", active.order_by(*orderings["-sales_count"])),
+            ("분류 + 판매량 순", active.filter(category_id=category_id).order_by(*orderings["-sales_count"])),
+            (
+                "서브분류 + 판매량 순",
+                active.filter(subcategory_id=subcategory_id).order_by(*orderings["-sales_count"]),
+            ),
+            ("낮은 가격 순", active.order_by(*orderings["price"])),
+            (
+                "분류 + 가격 범위 + 낮은 가격 순",
+                active.filter(category_id=category_id).price_between(price // 2, price * 2).order_by(*orderings["price"]),
+            ),
+            ("높은 가격 순", active.order_by(*orderings["-price"])),
+            ("최신 순", active.order_by(*orderings["-created_at"])),
+            ("리뷰 점수 순", active.order_by(*orderings["-review_score"])),
+        ]
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        with transaction.atomic():
+            if options["no_seqscan"]:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for name, queryset in self.get_cases():
+                page = queryset[:page_size]
+                plan = page.explain(analyze=options["analyze"])
+
+                elapsed = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    list(page.all())  # 결과 캐시를 쓰지 않도록 복제해서 실행
+                    elapsed.append(time.perf_counter() - started)
+                average_ms = sum(elapsed) / len(elapsed) * 1000 if elapsed else 0
+
+                uses_index = "Index" in plan and "Seq Scan" not in plan
+                style = self.style.SUCCESS if uses_index else self.style.WARNING
+                self.stdout.write(style(f"== {name}: {'인덱스 스캔' if uses_index else '순차 스캔 포함'}, 평균 {average_ms:.2f}ms"))
+                self.stdout.write(plan)
+                self.stdout.write("")
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from mall.cache import product_detail_key
+from mall.mixins import QueryBudgetExceeded
+from mall.models import Order, Product
+from mall.views import OrderViewSet, ProductViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "상품 목록/상세/인기 상품/검색, 주문 목록 엔드포인트가 SQL 실행 횟수 상한을 지키는지 검사합니다. "
+        "상품 엔드포인트는 비로그인과 로그인 사용자 요청을 모두 검사합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=100, help="목록 조회 시 사용할 페이지 크기"
+        )
+
+    def handle(self, *args, **options):
+        product = Product.objects.first()
+        if product is None:
+            raise CommandError("검사할 상품이 없습니다. 상품을 먼저 등록해 주세요.")
+        user = get_user_model().objects.filter(is_active=True).first()
+
+        # (ViewSet, 액션, URL 경로, 쿼리 파라미터, URL 인자, 로그인 사용자)
+        product_endpoints = [
+            (ProductViewSet, "list", "/mall/products/", {"limit": options["limit"]}, {}),
+            (ProductViewSet, "popular_products", "/mall/products/popular_products/", {}, {}),
+            (ProductViewSet, "search", "/mall/products/search/", {"q": product.name}, {}),
+            (ProductViewSet, "retrieve", f"/mall/products/{product.pk}/", {}, {"pk": product.pk}),
+        ]
+        endpoints = [endpoint + (None,) for endpoint in product_endpoints]
+        if user is not None:
+            # 로그인 요청은 인증 사용자 조회가 더해지므로 따로 검사
+            endpoints += [endpoint + (user,) for endpoint in product_endpoints]
+        order = Order.objects.select_related("user").first()
+        if order is not None:
+            endpoints.append((OrderViewSet, "list", "/mall/orders/", {}, {}, order.user))
+
+        factory = APIRequestFactory()
+        failures = []
+        with override_settings(QUERY_BUDGET_STRICT=True):
+            for viewset, action, path, params, kwargs, user in endpoints:
+                if action == "retrieve":
+                    # 캐시된 응답은 쿼리를 실행하지 않으므로 DB에서 다시 만들도록 비움
+                    cache.delete(product_detail_key(product.pk))
+                view = viewset.as_view({"get": action})
+                headers = {}
+                if user is not None:
+                    # 실제 요청처럼 토큰 인증을 거쳐 사용자 조회 쿼리까지 센다
+                    headers["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(user)}"
+                request = factory.get(path, params, **headers)
+                try:
+                    view(request, **kwargs)
+                except QueryBudgetExceeded as e:
+                    failures.append(str(e))
+                    continue
+                self.stdout.write(f"{path} {'로그인' if user else '비로그인'} OK")
+
+        if failures:
+            raise CommandError("\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("모든 엔드포인트가 쿼리 상한 이내입니다."))
@@ -0,0 +1,75 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mall.cache import invalidate_product_detail
+from mall.image_store import BLOB_ROOT, LEGACY_ROOT, blob_name, content_hash, delete_unreferenced, store_blob
+from mall.models import Product, ProductImage
+from mall.renditions import rendered_fields
+from mall.tasks import generate_image_renditions
+
+
+class Command(BaseCommand):
+    help = (
+        "내용 주소 저장 이전에 올라온 상품 이미지 파일을 내용 해시 이름으로 옮깁니다. "
+        "같은 내용의 파일은 하나로 합쳐지고, 옮긴 뒤 참조가 없는 이전 upload_to 경로의 파일과 리사이즈본은 지웁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="옮기지 않고 합쳐질 파일 수와 절약되는 용량만 출력")
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        names = (
+            ProductImage.objects.exclude(image="")
+            .exclude(image__startswith=f"{BLOB_ROOT}/")
+            .order_by("image")
+            .values_list("image", flat=True)
+            .distinct()
+        )
+
+        moved = missing = saved_bytes = 0
+        seen = set()
+        for name in names.iterator():
+            if not storage.exists(name):
+                missing += 1
+                self.stderr.write(f"파일 없음: {name}")
+                continue
+            with storage.open(name, "rb") as source:
+                target = blob_name(content_hash(source), name)
+            if target in seen or storage.exists(target):
+                # 이미 같은 내용의 파일이 있으면 이전 파일만큼 공간이 줄어듦
+                saved_bytes += storage.size(name)
+            seen.add(target)
+            moved += 1
+            if not options["dry_run"]:
+                self.move(storage, name, target)
+
+        action = "합칠 예정" if options["dry_run"] else "완료"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"내용 주소 이동 {action}: {moved}개 파일, 중복 제거로 {saved_bytes:,}바이트 절약 (파일 없음 {missing}개)"
+            )
+        )
+
+    def move(self, storage, name, target):
+        if not storage.exists(target):
+            with storage.open(name, "rb") as source:
+                store_blob(target, source, storage)
+
+        with transaction.atomic():
+            images = ProductImage.objects.filter(image=name)
+            product_ids = list(images.values_list("product_id", flat=True).distinct())
+            rendered = rendered_fields(target)
+            if rendered is not None:
+                images.update(image=target, **rendered)
+            else:
+                first_id = images.order_by("pk").values_list("pk", flat=True).first()
+                images.update(image=target, renditions={})
+                transaction.on_commit(lambda: generate_image_renditions.delay(first_id))
+            Product.objects.filter(pk__in=product_ids).refresh_primary_image()
+            for product_id in product_ids:
+                invalidate_product_detail(product_id)
+        if name.startswith(f"{LEGACY_ROOT}/"):
+            # 이전 upload_to 경로의 파일만 지움 (가져오기로 지정한 다른 경로는 남김)
+            delete_unreferenced(name, storage)
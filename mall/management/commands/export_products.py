@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mall.catalog_io import BATCH_SIZE, FORMATS, export_rows, iter_lines
+from mall.models import Product
+
+
+class Command(BaseCommand):
+    help = "상품을 CSV/JSONL로 내보냅니다. 서버 사이드 커서로 읽어 상품 수와 관계없이 메모리 사용량이 일정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="'-'이면 표준 출력")
+        parser.add_argument("--format", choices=FORMATS, help="생략하면 파일 확장자로 판단")
+        parser.add_argument("--status", choices=Product.Status.values)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or Path(path).suffix.lstrip(".").lower()
+        if fmt not in FORMATS:
+            raise CommandError(f"형식을 알 수 없습니다. --format {'/'.join(FORMATS)} 중 하나를 지정하세요.")
+
+        queryset = Product.objects.all()
+        if options["status"]:
+            queryset = queryset.filter(status=options["status"])
+
+        lines = iter_lines(export_rows(queryset, options["batch_size"]), fmt)
+        if path == "-":
+            sys.stdout.writelines(lines)
+            return
+        count = -1 if fmt == "csv" else 0  # CSV 헤더 줄 제외
+        with open(path, "w", encoding="utf-8", newline="") as stream:
+            for line in lines:
+                stream.write(line)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"내보내기 완료: {count}개 상품 -> {path}"))
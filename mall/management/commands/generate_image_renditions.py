@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.db.models.fields.json import KT
+
+from mall.models import ProductImage
+from mall.renditions import generate_renditions
+from mall.tasks import generate_image_renditions
+
+
+class Command(BaseCommand):
+    help = "리사이즈본이 없거나 원본과 맞지 않는 상품 이미지의 리사이즈본 생성 작업을 예약합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="이미 만들어진 이미지도 다시 생성")
+        parser.add_argument("--sync", action="store_true", help="Celery에 보내지 않고 이 프로세스에서 바로 생성")
+
+    def handle(self, *args, **options):
+        queryset = ProductImage.objects.order_by("pk")
+        if not options["all"]:
+            queryset = queryset.annotate(rendered_source=KT("renditions__source")).filter(
+                Q(rendered_source__isnull=True) | ~Q(rendered_source=F("image"))
+            )
+
+        count = 0
+        for image_id in queryset.values_list("pk", flat=True).iterator():
+            if options["sync"]:
+                generate_renditions(image_id)
+            else:
+                generate_image_renditions.delay(image_id)
+            count += 1
+
+        action = "생성" if options["sync"] else "예약"
+        self.stdout.write(self.style.SUCCESS(f"리사이즈본 {action} 완료: {count}개 이미지"))
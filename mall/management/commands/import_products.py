@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mall.catalog_io import BATCH_SIZE, FORMATS, import_products, read_rows
+
+
+class Command(BaseCommand):
+    help = "CSV/JSONL 파일에서 상품을 배치 단위로 가져옵니다. (id가 있는 행은 기존 상품 수정)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, help="생략하면 파일 확장자로 판단")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        fmt = options["format"] or path.suffix.lstrip(".").lower()
+        if fmt not in FORMATS:
+            raise CommandError(f"형식을 알 수 없습니다. --format {'/'.join(FORMATS)} 중 하나를 지정하세요.")
+
+        def progress(result):
+            self.stdout.write(
+                f"생성 {result['created']}개, 수정 {result['updated']}개, 오류 {result['error_count']}개"
+            )
+
+        with path.open(encoding="utf-8-sig", newline="") as stream:
+            result = import_products(read_rows(stream, fmt), options["batch_size"], progress)
+
+        for line_number, message in result["errors"]:
+            self.stderr.write(f"{line_number}행: {message}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"가져오기 완료: 생성 {result['created']}개, 수정 {result['updated']}개, 오류 {result['error_count']}개"
+            )
+        )
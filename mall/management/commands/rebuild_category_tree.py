@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from mall.category_tree import get_category_tree, rebuild_category_counts
+
+
+class Command(BaseCommand):
+    help = "분류별 상품 수를 상품 테이블 기준으로 다시 계산하고 분류 트리 문서를 새로 만듭니다."
+
+    def handle(self, *args, **options):
+        rebuild_category_counts()
+        document = get_category_tree()
+        self.stdout.write(
+            self.style.SUCCESS(f"분류 트리를 다시 만들었습니다. (ETag: {document['etag']})")
+        )
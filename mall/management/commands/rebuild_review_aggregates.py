@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from mall.models import Product
+from mall.reviews import rebuild_review_aggregates
+
+
+class Command(BaseCommand):
+    help = "모든 상품의 리뷰 수/평균 별점/별점별 리뷰 수를 리뷰 테이블 기준으로 배치 단위로 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        total = 0
+        while True:
+            # id 범위로 끊어 읽어 상품 수와 무관하게 배치당 비용을 일정하게 유지
+            product_ids = list(
+                Product.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not product_ids:
+                break
+            total += rebuild_review_aggregates(product_ids)
+            last_id = product_ids[-1]
+            self.stdout.write(f"{total}개 상품 처리 (마지막 id: {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"리뷰 집계 재계산 완료: {total}개 상품"))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from mall.models import Order
+from mall.seller_orders import rebuild_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "판매자 주문 상품 목록(SellerOrderLine)을 주문 상품 기준으로 배치 단위로 다시 만듭니다. "
+        "기존 상품에 판매자를 지정한 뒤 이전 주문을 판매자 주문 목록에 포함할 때 사용합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        orders = lines = 0
+        while True:
+            # id 범위로 끊어 읽어 주문 수와 무관하게 배치당 비용을 일정하게 유지
+            order_ids = list(
+                Order.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:batch_size]
+            )
+            if not order_ids:
+                break
+            lines += rebuild_lines(order_ids)
+            orders += len(order_ids)
+            last_id = order_ids[-1]
+            self.stdout.write(f"{orders}개 주문 처리 (마지막 id: {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"판매자 주문 상품 재생성 완료: 주문 {orders}개, 판매자 주문 상품 {lines}개"))
@@ -0,0 +1,46 @@
+# Generated by Django 5.1 on 2026-10-18 16:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from mall.search import product_search_vector
+
+
+def fill_search_vector(apps, schema_editor):
+    Product = apps.get_model("mall", "Product")
+    Product.objects.update(search_vector=product_search_vector())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0004_product_shipping_info"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(fill_search_vector, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="product_search_vector_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="product_name_trgm_gin",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
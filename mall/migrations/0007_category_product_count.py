@@ -0,0 +1,56 @@
+# Generated by Django 5.1 on 2026-10-18 17:32
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_product_count(apps, schema_editor):
+    Product = apps.get_model("mall", "Product")
+    for model_name, field in (
+        ("Category", "category"),
+        ("SubCategory", "subcategory"),
+        ("SubDetailCategory", "sub_detail_category"),
+    ):
+        counts = (
+            Product.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        apps.get_model("mall", model_name).objects.update(
+            product_count=Coalesce(Subquery(counts), Value(0))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0006_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="product_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="상품 수"
+            ),
+        ),
+        migrations.AddField(
+            model_name="subcategory",
+            name="product_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="상품 수"
+            ),
+        ),
+        migrations.AddField(
+            model_name="subdetailcategory",
+            name="product_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="상품 수"
+            ),
+        ),
+        migrations.RunPython(fill_product_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.1 on 2026-10-18 18:20
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+RATINGS = range(1, 6)
+
+
+def fill_review_aggregates(apps, schema_editor):
+    # mall.reviews.rebuild_review_aggregates와 같은 계산 (기존 리뷰는 모두 별점 5로 채워짐)
+    Comment = apps.get_model("mall", "Comment")
+    Product = apps.get_model("mall", "Product")
+    rows = (
+        Comment.objects.order_by()
+        .values("product_id")
+        .annotate(
+            count=Count("id"),
+            total=Sum("rating"),
+            **{f"rating_{rating}_count": Count("id", filter=Q(rating=rating)) for rating in RATINGS},
+        )
+    )
+    products = []
+    for row in rows:
+        product = Product(pk=row.pop("product_id"), review_count=row.pop("count"), rating_total=row.pop("total") or 0)
+        product.review_score = product.rating_total / product.review_count
+        for field, value in row.items():
+            setattr(product, field, value)
+        products.append(product)
+    Product.objects.bulk_update(
+        products,
+        ["review_count", "rating_total", "review_score"] + [f"rating_{rating}_count" for rating in RATINGS],
+        batch_size=1000,
+    )
+    Product.objects.exclude(comments__isnull=False).exclude(review_count=0, review_score=0).update(
+        review_count=0, review_score=0
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0007_category_product_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="rating",
+            field=models.PositiveSmallIntegerField(
+                default=5,
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(5),
+                ],
+                verbose_name="별점",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_1_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_2_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_3_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_4_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_5_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_total",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_review_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-18 19:05
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0008_review_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["specifications"],
+                name="product_specs_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["keywords"],
+                name="product_keywords_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0009_product_json_gin_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("status", "a")),
+                fields=["-sales_count", "id"],
+                name="product_act_sales_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("status", "a")),
+                fields=["category", "-sales_count", "id"],
+                name="product_act_cat_sales_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("status", "a")),
+                fields=["subcategory", "-sales_count", "id"],
+                name="product_act_subcat_sales_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("status", "a")),
+                fields=["sub_detail_category", "-sales_count", "id"],
+                name="product_act_detail_sales_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("status", "a")),
+                fields=["price", "id"],
+                name="product_act_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("status", "a")),
+                fields=["category", "price", "id"],
+                name="product_act_cat_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("status", "a")),
+                fields=["-created_at", "-id"],
+                name="product_act_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("status", "a")),
+                fields=["-review_score", "id"],
+                name="product_act_score_idx",
+            ),
+        ),
+    ]
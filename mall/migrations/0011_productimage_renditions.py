@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0010_product_storefront_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productimage",
+            name="renditions",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="리사이즈 이미지 목록",
+            ),
+        ),
+    ]
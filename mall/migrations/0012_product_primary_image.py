@@ -0,0 +1,59 @@
+# Generated by Django 5.1 on 2026-10-18 20:45
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_primary_image(apps, schema_editor):
+    Product = apps.get_model("mall", "Product")
+    ProductImage = apps.get_model("mall", "ProductImage")
+    first_image = ProductImage.objects.filter(product_id=models.OuterRef("pk")).order_by("position", "id")
+    Product.objects.update(
+        primary_image=Coalesce(models.Subquery(first_image.values("image")[:1]), models.Value("")),
+        primary_image_renditions=Coalesce(
+            models.Subquery(first_image.values("renditions")[:1]),
+            models.Value({}, output_field=models.JSONField()),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0011_productimage_renditions"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="productimage",
+            options={
+                "ordering": ["position", "id"],
+                "verbose_name": "상품 이미지",
+                "verbose_name_plural": "상품 이미지",
+            },
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="primary_image",
+            field=models.ImageField(
+                blank=True, editable=False, upload_to="mall/product/images/%Y/%m/%d"
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="primary_image_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="productimage",
+            name="position",
+            field=models.PositiveIntegerField(default=0, verbose_name="정렬 순서"),
+        ),
+        migrations.AddIndex(
+            model_name="productimage",
+            index=models.Index(
+                fields=["product", "position", "id"], name="productimage_position_idx"
+            ),
+        ),
+        migrations.RunPython(fill_primary_image, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.1 on 2026-10-18 21:20
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0012_product_primary_image"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageUpload",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(max_length=100, verbose_name="원본 파일 이름"),
+                ),
+                (
+                    "total_size",
+                    models.PositiveBigIntegerField(verbose_name="전체 크기"),
+                ),
+                ("chunk_size", models.PositiveIntegerField(verbose_name="조각 크기")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("uploading", "업로드 중"),
+                            ("assembling", "합치는 중"),
+                            ("completed", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="uploading",
+                        max_length=10,
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "image",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="mall.productimage",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="image_uploads",
+                        to="mall.product",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="image_uploads",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "이미지 분할 업로드",
+                "verbose_name_plural": "이미지 분할 업로드",
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1 on 2026-10-18 21:50
+
+import mall.image_store
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0013_imageupload"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="productimage",
+            name="image",
+            field=mall.image_store.ContentAddressedImageField(
+                db_index=True, upload_to="mall/product/images/%Y/%m/%d"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-18 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0014_productimage_content_addressed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productimage",
+            name="height",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="원본 높이"
+            ),
+        ),
+        migrations.AddField(
+            model_name="productimage",
+            name="placeholder",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="미리보기 (data URI)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="productimage",
+            name="width",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="원본 너비"
+            ),
+        ),
+    ]
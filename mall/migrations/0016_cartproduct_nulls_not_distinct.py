@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-18 23:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def require_nulls_not_distinct(apps, schema_editor):
+    # PostgreSQL 14 이하에서는 Django가 nulls_distinct=False 제약을 만들지 않고 넘어가 ON CONFLICT 담기가 실패함
+    if not schema_editor.connection.features.supports_nulls_distinct_unique_constraints:
+        raise RuntimeError(
+            "장바구니/재고 고유 제약(NULLS NOT DISTINCT)에 PostgreSQL 15 이상이 필요합니다."
+        )
+
+
+def merge_duplicate_lines(apps, schema_editor):
+    # 옵션 없는 항목은 기존 제약으로 중복을 막지 못했으므로 수량을 합쳐 한 행으로 만듦
+    CartProduct = apps.get_model("mall", "CartProduct")
+    duplicates = (
+        CartProduct.objects.values("user_id", "product_id", "option_id")
+        .annotate(rows=models.Count("id"), total=models.Sum("quantity"), first_id=models.Min("id"))
+        .filter(rows__gt=1)
+    )
+    for line in duplicates:
+        CartProduct.objects.filter(pk=line["first_id"]).update(quantity=line["total"])
+        CartProduct.objects.filter(
+            user_id=line["user_id"], product_id=line["product_id"], option_id=line["option_id"]
+        ).exclude(pk=line["first_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0015_productimage_placeholder"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(require_nulls_not_distinct, migrations.RunPython.noop),
+        migrations.RunPython(merge_duplicate_lines, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name="cartproduct",
+            name="unique_user_product_option",
+        ),
+        migrations.AddConstraint(
+            model_name="cartproduct",
+            constraint=models.UniqueConstraint(
+                fields=("user", "product", "option"),
+                name="unique_user_product_option",
+                nulls_distinct=False,
+            ),
+        ),
+    ]
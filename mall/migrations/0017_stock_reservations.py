@@ -0,0 +1,132 @@
+# Generated by Django 5.1 on 2026-10-18 23:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0016_cartproduct_nulls_not_distinct"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Stock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "available",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="주문 가능 수량"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "option",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stocks",
+                        to="mall.productoption",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stocks",
+                        to="mall.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "재고",
+                "verbose_name_plural": "재고",
+            },
+        ),
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(verbose_name="수량")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("held", "예약"),
+                            ("committed", "확정"),
+                            ("released", "해제"),
+                            ("expired", "만료"),
+                        ],
+                        default="held",
+                        max_length=10,
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="예약 만료 시각")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_reservations",
+                        to="mall.order",
+                    ),
+                ),
+                (
+                    "ordered_product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_reservation",
+                        to="mall.orderedproduct",
+                    ),
+                ),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="mall.stock",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "재고 예약",
+                "verbose_name_plural": "재고 예약",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="stock",
+            constraint=models.UniqueConstraint(
+                fields=("product", "option"),
+                name="unique_stock_product_option",
+                nulls_distinct=False,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stockreservation",
+            index=models.Index(
+                condition=models.Q(("status", "held")),
+                fields=["expires_at"],
+                name="reservation_held_expiry_idx",
+            ),
+        ),
+    ]
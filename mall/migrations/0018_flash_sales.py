@@ -0,0 +1,67 @@
+# Generated by Django 5.1 on 2026-10-18 23:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0017_stock_reservations"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlashSale",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(verbose_name="판매 수량")),
+                (
+                    "max_per_user",
+                    models.PositiveSmallIntegerField(
+                        default=1, verbose_name="1인당 최대 수량"
+                    ),
+                ),
+                (
+                    "sold",
+                    models.PositiveIntegerField(
+                        default=0, editable=False, verbose_name="주문 수량"
+                    ),
+                ),
+                ("starts_at", models.DateTimeField(verbose_name="시작 시각")),
+                ("ends_at", models.DateTimeField(verbose_name="종료 시각")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "option",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="flash_sales",
+                        to="mall.productoption",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="flash_sales",
+                        to="mall.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "선착순 판매",
+                "verbose_name_plural": "선착순 판매",
+                "ordering": ["-starts_at"],
+            },
+        ),
+    ]
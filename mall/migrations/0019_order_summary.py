@@ -0,0 +1,66 @@
+# Generated by Django 5.1 on 2026-10-18 23:59
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, NullIf
+
+
+def fill_order_summary(apps, schema_editor):
+    # Order.objects.refresh_summary()와 같은 식 (마이그레이션에서는 사용자 정의 QuerySet을 쓸 수 없음)
+    Order = apps.get_model("mall", "Order")
+    OrderedProduct = apps.get_model("mall", "OrderedProduct")
+    lines = OrderedProduct.objects.filter(order_id=models.OuterRef("pk"))
+    first_line = lines.annotate(cancelled=models.Q(status="CANCELLED")).order_by("cancelled", "pk")
+
+    def line_count(queryset):
+        return models.Subquery(queryset.values("order_id").annotate(count=models.Count("pk")).values("count")[:1])
+
+    Order.objects.update(
+        item_count=Coalesce(
+            NullIf(line_count(lines.exclude(status="CANCELLED")), models.Value(0)),
+            line_count(lines),
+            models.Value(0),
+        ),
+        first_product_name=Coalesce(models.Subquery(first_line.values("name")[:1]), models.Value("")),
+        first_product_image=Coalesce(models.Subquery(first_line.values("product__primary_image")[:1]), models.Value("")),
+        first_product_image_renditions=Coalesce(
+            models.Subquery(first_line.values("product__primary_image_renditions")[:1]),
+            models.Value({}, output_field=models.JSONField()),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0018_flash_sales"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="first_product_image",
+            field=models.ImageField(
+                blank=True, editable=False, upload_to="mall/product/images/%Y/%m/%d"
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="first_product_image_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="first_product_name",
+            field=models.CharField(
+                blank=True, editable=False, max_length=100, verbose_name="첫 상품 이름"
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="item_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="주문 상품 수"
+            ),
+        ),
+        migrations.RunPython(fill_order_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,152 @@
+# Generated by Django 5.1 on 2026-10-18 23:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0019_order_summary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="seller",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="products",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.CreateModel(
+            name="SellerOrderLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "buyer_email",
+                    models.EmailField(
+                        blank=True, max_length=254, verbose_name="구매자 이메일"
+                    ),
+                ),
+                ("product_name", models.CharField(max_length=100)),
+                ("option_name", models.CharField(blank=True, max_length=100)),
+                (
+                    "order_status",
+                    models.CharField(
+                        choices=[
+                            ("REQUSETED", "주문 요청"),
+                            ("PAID", "결제 완료"),
+                            ("PREPARED_PRODUCT", "상품 준비 중"),
+                            ("SHIPPED", "배송 중"),
+                            ("DELIVERED", "배송 완료"),
+                            ("PARTIAL_REFUNDED", "일부 환불 완료"),
+                            ("FULL_REFUNDED", "전체 환불 완료"),
+                            ("CANCELLED", "주문 취소"),
+                            ("CANCEL_REQUESTED", "취소 요청됨"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ORDERED", "주문됨"),
+                            ("SHIPPED", "배송 중"),
+                            ("DELIVERED", "배송 완료"),
+                            ("RETURN_REQUESTED", "반품 요청됨"),
+                            ("RETURNED", "반품 완료"),
+                            ("REFUNDED", "환불 완료"),
+                            ("CANCEL_REQUESTED", "취소 요청됨"),
+                            ("CANCELLED", "취소됨"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("price", models.PositiveIntegerField()),
+                ("quantity", models.PositiveIntegerField()),
+                ("amount", models.PositiveIntegerField()),
+                ("created_at", models.DateTimeField()),
+                (
+                    "buyer",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seller_lines",
+                        to="mall.order",
+                    ),
+                ),
+                (
+                    "ordered_product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seller_line",
+                        to="mall.orderedproduct",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="mall.product",
+                    ),
+                ),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seller_order_lines",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "판매자 주문 상품",
+                "verbose_name_plural": "판매자 주문 상품",
+                "ordering": ["-order_id", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["seller", "-order", "id"], name="seller_line_order_idx"
+                    ),
+                    models.Index(
+                        fields=["seller", "order_status", "-order", "id"],
+                        name="seller_line_status_idx",
+                    ),
+                    models.Index(
+                        fields=["seller", "buyer", "-order"],
+                        name="seller_line_buyer_idx",
+                    ),
+                    models.Index(
+                        fields=["seller", "buyer_email", "-order"],
+                        name="seller_line_buyer_email_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-18 23:59
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0021_catalog_import"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="uid",
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1 on 2026-10-18 23:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0022_order_uid_unique"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["first_product_image"], name="order_first_image_idx"
+            ),
+        ),
+    ]
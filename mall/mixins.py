@@ -0,0 +1,48 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """엔드포인트가 허용된 SQL 실행 횟수를 넘었을 때 발생합니다."""
+
+
+class QueryBudgetMixin:
+    """
+    액션별 SQL 실행 횟수 상한(query_budgets)을 검사하는 ViewSet 믹스인.
+    상한을 넘으면 경고 로그를 남기고, QUERY_BUDGET_STRICT 설정이 켜져 있으면 예외를 발생시킵니다.
+    """
+
+    query_budgets = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        executed = []
+
+        def count_query(execute, sql, params, many, context):
+            executed.append(sql)
+            return execute(sql, params, many, context)
+
+        # 연결 생성 시 실행되는 초기화 쿼리는 엔드포인트 비용이 아니므로 미리 연결해 둠
+        connection.ensure_connection()
+        with connection.execute_wrapper(count_query):
+            response = super().dispatch(request, *args, **kwargs)
+
+        self.check_query_budget(len(executed))
+        return response
+
+    def check_query_budget(self, query_count):
+        action = getattr(self, "action", None)
+        budget = self.query_budgets.get(action)
+        if budget is None or query_count <= budget:
+            return
+
+        message = (
+            f"{self.__class__.__name__}.{action}: SQL {query_count}회 실행 (허용 {budget}회)"
+        )
+        if getattr(settings, "QUERY_BUDGET_STRICT", False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -4,14 +4,20 @@ from typing import List
 
 import requests
 from PIL import Image
-from django.core.validators import MinValueValidator
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramSimilarity
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
 from django.db.models import UniqueConstraint
+from django.db.models.functions import Coalesce, NullIf
 from django.http import Http404
+from django.utils import timezone
 from django_ckeditor_5.fields import CKEditor5Field
 from django.db.models import QuerySet
 from iamport import Iamport
 from rest_framework.reverse import reverse
+from mall.image_store import ContentAddressedImageField
+from mall.search import SEARCH_CONFIG, product_search_vector
 from mall.tasks import cancel_payment
 
 from JunJunbariStudio import settings
@@ -20,7 +26,28 @@ from JunJunbariStudio import settings
 logger = logging.getLogger(__name__)
 
 
-class Category(models.Model):
+class ProductCountedModel(models.Model):
+    """
+    상품 수(product_count)를 가진 분류 모델의 공통 부모.
+    상품 수는 상품 저장/삭제 시그널에서 F()로만 증감합니다.
+    """
+    product_count = models.PositiveIntegerField("상품 수", default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        # 기존 행을 저장할 때 읽어 둔 product_count로 동시에 증감된 값을 덮어쓰지 않도록 제외
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "product_count"
+            ]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+class Category(ProductCountedModel):
     name = models.CharField(max_length=100)
 
     def __str__(self):
@@ -29,14 +56,14 @@ class Category(models.Model):
     class Meta:
         verbose_name = verbose_name_plural = "상품 분류"
 
-class SubCategory(models.Model):
+class SubCategory(ProductCountedModel):
     name = models.CharField(max_length=100)
     category = models.ForeignKey('Category', related_name='subcategories', on_delete=models.CASCADE)
 
     def __str__(self):
         return self.name
 
-class SubDetailCategory(models.Model):
+class SubDetailCategory(ProductCountedModel):
     name = models.CharField(max_length=100)
     subcategory = models.ForeignKey('SubCategory', related_name='sub_detail_categories', on_delete=models.CASCADE)
 
@@ -44,6 +71,112 @@ class SubDetailCategory(models.Model):
         return self.name
 
 
+class ProductQuerySet(models.QuerySet):
+    # 직렬화와 정렬에 실제로 쓰이는 컬럼만 읽도록 용도별 컬럼 목록을 둡니다.
+    LIST_FIELDS = ("id", "name", "price", "review_count", "review_score", "sales_count")
+    BANNER_FIELDS = ("id", "name", "price", "keywords", "description", "sales_count")
+    # 요청하지 않으면 읽지 않아도 되는 큰 컬럼
+    DEFERRABLE_FIELDS = ("description", "specifications")
+    EXPANDABLE_RELATIONS = ("category", "subcategory", "sub_detail_category")
+
+    def with_images(self):
+        """상품 이미지를 상품 수와 관계없이 한 번의 쿼리로 가져옵니다."""
+        return self.prefetch_related(
+            models.Prefetch(
+                "images",
+                queryset=ProductImage.objects.only(
+                    "id", "product_id", "image", "position", "renditions", "width", "height", "placeholder"
+                ),
+            )
+        )
+
+    def for_list(self):
+        """상품 목록(ProductListSerializer)용 쿼리셋"""
+        return self.only(*self.LIST_FIELDS).with_images()
+
+    def for_banner(self):
+        """메인 배너(ProductBannerSerializer)용 쿼리셋"""
+        return self.only(*self.BANNER_FIELDS).with_images()
+
+    def for_detail(self):
+        """상품 상세(ProductSerializer)용 쿼리셋. 이미지와 옵션을 함께 가져옵니다."""
+        return self.defer("search_vector").prefetch_related("images", "options")
+
+    def for_fields(self, fields, expand):
+        """
+        ?fields=, ?expand= 요청에 맞춰 응답에 쓰이지 않는 prefetch와 큰 컬럼을 빼고,
+        펼친(expand) 연관 객체는 함께 가져옵니다.
+        """
+        queryset = self
+        if fields is not None:
+            lookups = [
+                lookup
+                for lookup in self._prefetch_related_lookups
+                if getattr(lookup, "prefetch_to", lookup).split("__")[0] in fields
+            ]
+            queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+            unused = [name for name in self.DEFERRABLE_FIELDS if name not in fields]
+            if unused:
+                queryset = queryset.defer(*unused)
+        if "options" in expand:
+            queryset = queryset.prefetch_related("options")
+        related = [name for name in self.EXPANDABLE_RELATIONS if name in expand]
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset
+
+    def active(self):
+        """판매 중인 상품 (판매 중 부분 인덱스 사용)"""
+        return self.filter(status=Product.Status.ACTIVE)
+
+    def price_between(self, min_price=None, max_price=None):
+        queryset = self
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+        return queryset
+
+    def with_specifications(self, specifications):
+        """사양에 주어진 키/값을 모두 포함하는 상품 (specifications @> '{...}', GIN 인덱스 사용)"""
+        return self.filter(specifications__contains=specifications)
+
+    def with_keywords(self, keywords):
+        """주어진 키워드를 모두 가진 상품 (keywords @> '[...]', GIN 인덱스 사용)"""
+        return self.filter(keywords__contains=list(keywords))
+
+    def search(self, keyword):
+        """
+        검색어로 상품을 찾습니다.
+        전문 검색(search_vector)과 상품명 trigram 유사도 중 하나라도 일치하면 결과에 포함되며,
+        두 조건 모두 GIN 인덱스를 사용합니다. 결과는 검색 순위, 유사도 순으로 정렬됩니다.
+        """
+        query = SearchQuery(keyword, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            self.annotate(
+                rank=SearchRank(models.F("search_vector"), query),
+                similarity=TrigramSimilarity("name", keyword),
+            )
+            .filter(models.Q(search_vector=query) | models.Q(name__trigram_similar=keyword))
+            .order_by("-rank", "-similarity", "id")
+        )
+
+    def update_search_vector(self):
+        """검색 벡터를 DB 안에서 다시 계산합니다. (저장 시그널, 일괄 갱신용)"""
+        return self.update(search_vector=product_search_vector())
+
+    def refresh_primary_image(self):
+        """대표 이미지(정렬 순서상 첫 이미지)와 리사이즈본 목록을 DB 안에서 다시 채웁니다."""
+        first_image = ProductImage.objects.filter(product_id=models.OuterRef("pk")).order_by("position", "id")
+        return self.update(
+            primary_image=Coalesce(models.Subquery(first_image.values("image")[:1]), models.Value("")),
+            primary_image_renditions=Coalesce(
+                models.Subquery(first_image.values("renditions")[:1]),
+                models.Value({}, output_field=models.JSONField()),
+            ),
+        )
+
+
 class Product(models.Model):
     class Status(models.TextChoices):
         ACTIVE = ("a", "판매 중")
@@ -60,6 +193,15 @@ class Product(models.Model):
     sub_detail_category = models.ForeignKey(
         SubDetailCategory, on_delete=models.CASCADE, db_constraint=False, related_name="products", default=1
     )
+    # 판매자. 상품 등록 시 요청한 사용자로 지정 (판매자 주문 목록, 권한 확인에 사용)
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_constraint=False,
+        related_name="products",
+    )
     name = models.CharField(max_length=100, db_index=True)
     description = CKEditor5Field("설명", config_name="extends")
     price = models.PositiveIntegerField()
@@ -78,13 +220,42 @@ class Product(models.Model):
     sales_count = models.PositiveIntegerField(default=0)  # 판매량
     view_count = models.PositiveIntegerField(default=0)  # 조회수
     review_count = models.PositiveIntegerField(default=0)  # 작성된 리뷰 수
-    review_score = models.FloatField(default=0)  # 리뷰 점수
+    review_score = models.FloatField(default=0)  # 리뷰 점수 (별점 평균)
+    # 리뷰 별점 합계와 별점별 리뷰 수. 리뷰 저장/삭제 시 F()로 증감 (mall.reviews)
+    rating_total = models.PositiveIntegerField(default=0, editable=False)
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)  # 상품명/키워드/설명 검색용
+    # 대표 이미지(ProductImage 정렬 순서상 첫 이미지)와 리사이즈본 목록. 이미지 저장/삭제/순서 변경 시 갱신
+    primary_image = models.ImageField(upload_to="mall/product/images/%Y/%m/%d", blank=True, editable=False)
+    primary_image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
     def __str__(self):
         return f"<{self.pk}> {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 분류 변경 시 이전 분류의 상품 수를 줄일 수 있도록 로드 시점의 분류를 기억
+        instance._loaded_category_path = instance.category_path
+        return instance
+
+    @property
+    def category_path(self):
+        """(category_id, subcategory_id, sub_detail_category_id). 로드되지 않은(defer) 값은 None"""
+        return (
+            self.__dict__.get("category_id"),
+            self.__dict__.get("subcategory_id"),
+            self.__dict__.get("sub_detail_category_id"),
+        )
+
     @property
     def main_image_url(self):
         """Returns the URL of the main presentation image if available."""
@@ -93,6 +264,29 @@ class Product(models.Model):
     class Meta:
         verbose_name = verbose_name_plural = "상품"
         ordering = ['-sales_count']  # default 판매량 순으로 정렬
+        indexes = [
+            # 판매량 순 목록 + 커서 페이지네이션(-sales_count, id)
+            models.Index(fields=["-sales_count", "id"], name="product_sales_id_idx"),
+            GinIndex(fields=["search_vector"], name="product_search_vector_gin"),
+            GinIndex(fields=["name"], opclasses=["gin_trgm_ops"], name="product_name_trgm_gin"),
+            # 사양/키워드 포함(@>) 필터
+            GinIndex(fields=["specifications"], opclasses=["jsonb_path_ops"], name="product_specs_gin"),
+            GinIndex(fields=["keywords"], opclasses=["jsonb_path_ops"], name="product_keywords_gin"),
+            # 판매 중 상품 목록용 부분 인덱스 (분류 필터 + 정렬, mall.pagination.ProductPagination)
+            *[
+                models.Index(fields=fields, name=name, condition=models.Q(status="a"))
+                for name, fields in (
+                    ("product_act_sales_idx", ["-sales_count", "id"]),
+                    ("product_act_cat_sales_idx", ["category", "-sales_count", "id"]),
+                    ("product_act_subcat_sales_idx", ["subcategory", "-sales_count", "id"]),
+                    ("product_act_detail_sales_idx", ["sub_detail_category", "-sales_count", "id"]),
+                    ("product_act_price_idx", ["price", "id"]),
+                    ("product_act_cat_price_idx", ["category", "price", "id"]),
+                    ("product_act_created_idx", ["-created_at", "-id"]),
+                    ("product_act_score_idx", ["-review_score", "id"]),
+                )
+            ],
+        ]
 
 
 class ProductOption(models.Model):
@@ -110,14 +304,110 @@ class ProductImage(models.Model):
     product = models.ForeignKey(
         Product, related_name="images", on_delete=models.CASCADE
     )
-    image = models.ImageField(upload_to="mall/product/images/%Y/%m/%d")
+    # 내용(SHA-256) 기준 이름으로 저장되어 같은 사진은 파일 하나를 공유 (mall.image_store)
+    image = ContentAddressedImageField(upload_to="mall/product/images/%Y/%m/%d", db_index=True)
+    position = models.PositiveIntegerField("정렬 순서", default=0)
+    # 크기별 WebP/JPEG 리사이즈본 목록 (mall.renditions). 원본이 바뀌면 작업이 다시 채움
+    renditions = models.JSONField("리사이즈 이미지 목록", default=dict, blank=True, editable=False)
+    # 원본 크기와 저화질 미리보기(LQIP). 이미지가 오기 전에 자리를 잡고 흐린 미리보기를 그리는 용도
+    width = models.PositiveIntegerField("원본 너비", null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField("원본 높이", null=True, blank=True, editable=False)
+    placeholder = models.TextField("미리보기 (data URI)", blank=True, editable=False)
 
     def __str__(self):
         return f"Image for {self.product.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 원본 교체 여부를 저장 시그널에서 알 수 있도록 로드 시점의 파일 이름을 기억
+        instance._loaded_image_name = instance.__dict__.get("image")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # 새 이미지는 기존 이미지 뒤에 붙임
+        if self._state.adding and not self.position:
+            last = ProductImage.objects.filter(product_id=self.product_id).aggregate(last=models.Max("position"))["last"]
+            self.position = 0 if last is None else last + 1
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "상품 이미지"
         verbose_name_plural = "상품 이미지"
+        ordering = ["position", "id"]
+        indexes = [
+            models.Index(fields=["product", "position", "id"], name="productimage_position_idx"),
+        ]
+
+
+class ImageUpload(models.Model):
+    """
+    조각(chunk) 단위로 나눠 올리는 상품 이미지 업로드 (mall.uploads).
+    조각 파일은 저장소의 parts_dir 아래에 있으며, 받은 조각 목록은 저장소를 기준으로 판단합니다.
+    """
+
+    class Status(models.TextChoices):
+        UPLOADING = "uploading", "업로드 중"
+        ASSEMBLING = "assembling", "합치는 중"
+        COMPLETED = "completed", "완료"
+        FAILED = "failed", "실패"
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="image_uploads")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="image_uploads")
+    filename = models.CharField("원본 파일 이름", max_length=100)
+    total_size = models.PositiveBigIntegerField("전체 크기")
+    chunk_size = models.PositiveIntegerField("조각 크기")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.UPLOADING)
+    error = models.TextField(blank=True)
+    image = models.ForeignKey(
+        ProductImage, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    @property
+    def parts_dir(self):
+        return f"uploads/parts/{self.pk}"
+
+    def part_name(self, index):
+        return f"{self.parts_dir}/{index:05d}.part"
+
+    def expected_chunk_size(self, index):
+        return min(self.chunk_size, self.total_size - index * self.chunk_size)
+
+    class Meta:
+        verbose_name = verbose_name_plural = "이미지 분할 업로드"
+
+
+class CatalogImport(models.Model):
+    """
+    상품 일괄 가져오기 작업 (mall.catalog_io.run_import).
+    업로드한 파일을 저장소에 두고 Celery 작업이 읽으며, 배치마다 중간 결과를 result에 기록합니다.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "대기"
+        RUNNING = "running", "처리 중"
+        COMPLETED = "completed", "완료"
+        FAILED = "failed", "실패"
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="catalog_imports")
+    format = models.CharField("파일 형식", max_length=5)
+    file = models.FileField(upload_to="imports/catalog/%Y/%m/%d", blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    result = models.JSONField(default=dict, blank=True)  # {"created", "updated", "error_count", "errors"}
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = verbose_name_plural = "상품 일괄 가져오기"
 
 
 class Comment(models.Model):
@@ -126,17 +416,74 @@ class Comment(models.Model):
     )
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     content = models.TextField("리뷰 내용")
+    rating = models.PositiveSmallIntegerField(
+        "별점", validators=[MinValueValidator(1), MaxValueValidator(5)]
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.name}의 리뷰: {self.content}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 리뷰 수정 시 이전 별점을 집계에서 빼기 위해 로드 시점 값을 기억
+        instance._loaded_review = (
+            instance.__dict__.get("product_id"),
+            instance.__dict__.get("rating"),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        # 리뷰 저장과 상품 리뷰 집계 갱신(post_save 시그널)을 한 트랜잭션으로 묶음
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def can_create_review(self):
         """
         사용자가 해당 상품을 구매했는지 확인하는 메서드.
         """
         return OrderedProduct.objects.filter(order__user=self.user, product=self.product).exists()
 
+    class Meta:
+        indexes = [
+            # 상품별 리뷰 목록 + 커서 페이지네이션(-pk)
+            models.Index(fields=["product", "-id"], name="comment_product_id_idx"),
+        ]
+
+
+class CartProductQuerySet(models.QuerySet):
+    # 장바구니 표시에 필요한 컬럼 (상품 본문 등 큰 컬럼은 읽지 않음)
+    LIST_FIELDS = (
+        "id", "user_id", "product_id", "option_id", "quantity",
+        "product__id", "product__name", "product__price", "product__primary_image", "product__primary_image_renditions",
+        "option__id", "option__product_id", "option__name", "option__additional_price",
+    )
+
+    def with_totals(self):
+        """
+        상품/옵션을 조인한 한 번의 쿼리로 줄별 단가/금액과 사용자별 장바구니 합계를 계산합니다.
+        합계는 윈도 함수라 페이지로 잘라도 장바구니 전체 기준이며, 금액은 주문 생성(create_from_cart)과 같은 식입니다.
+        """
+        per_user = {"partition_by": [models.F("user_id")]}
+        return (
+            self.select_related("product", "option")
+            .only(*self.LIST_FIELDS)
+            .annotate(
+                line_unit_price=models.ExpressionWrapper(
+                    models.F("product__price") + Coalesce(models.F("option__additional_price"), 0),
+                    output_field=models.PositiveIntegerField(),
+                ),
+                line_total=models.ExpressionWrapper(
+                    models.F("line_unit_price") * models.F("quantity"), output_field=models.PositiveIntegerField()
+                ),
+                cart_total=models.Window(models.Sum("line_total"), **per_user),
+                cart_quantity=models.Window(models.Sum("quantity"), **per_user),
+                cart_item_count=models.Window(models.Count("id"), **per_user),
+            )
+            .order_by("user_id", "product_id", "option_id")
+        )
+
 
 class CartProduct(models.Model):
     user = models.ForeignKey(
@@ -151,10 +498,22 @@ class CartProduct(models.Model):
     )
     quantity = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
 
+    objects = CartProductQuerySet.as_manager()
+
     @property
-    def total_price(self):
+    def unit_price(self):
+        # with_totals()의 line_unit_price와 같은 식 (상품 가격 + 옵션 추가 금액)
+        if "line_unit_price" in self.__dict__:
+            return self.line_unit_price
         option_price = self.option.additional_price if self.option else 0
-        return (self.product.price + option_price) * self.quantity
+        return self.product.price + option_price
+
+    @property
+    def total_price(self):
+        # with_totals()로 읽었으면 DB에서 계산한 값을 그대로 사용
+        if "line_total" in self.__dict__:
+            return self.line_total
+        return self.unit_price * self.quantity
 
     def __str__(self):
         return f"<{self.pk}> {self.product.name} - {self.option.name if self.option else '기본 옵션'} ({self.quantity}개)"
@@ -162,12 +521,48 @@ class CartProduct(models.Model):
     class Meta:
         verbose_name = verbose_name_plural = "장바구니 상품"
         constraints = [
+            # 옵션이 없는 항목(NULL)끼리도 중복으로 보아 INSERT ... ON CONFLICT 대상이 되도록 함
             UniqueConstraint(
-                fields=["user", "product", "option"], name="unique_user_product_option"
+                fields=["user", "product", "option"], name="unique_user_product_option", nulls_distinct=False
             )
         ]
 
 
+class OrderQuerySet(models.QuerySet):
+    def refresh_summary(self):
+        """
+        목록 표시용 요약(상품 수, 첫 상품 이름/이미지)을 DB 안에서 다시 채웁니다. (상품 취소 시)
+        취소되지 않은 주문 상품 기준이며, 모두 취소되었으면 전체 주문 상품 기준입니다.
+        """
+        lines = OrderedProduct.objects.filter(order_id=models.OuterRef("pk"))
+        first_line = lines.annotate(
+            cancelled=models.Q(status=OrderedProduct.Status.CANCELLED)
+        ).order_by("cancelled", "pk")
+
+        def line_count(queryset):
+            return models.Subquery(
+                queryset.values("order_id").annotate(count=models.Count("pk")).values("count")[:1]
+            )
+
+        return self.update(
+            item_count=Coalesce(
+                NullIf(
+                    line_count(lines.exclude(status=OrderedProduct.Status.CANCELLED)), models.Value(0)
+                ),
+                line_count(lines),
+                models.Value(0),
+            ),
+            first_product_name=Coalesce(models.Subquery(first_line.values("name")[:1]), models.Value("")),
+            first_product_image=Coalesce(
+                models.Subquery(first_line.values("product__primary_image")[:1]), models.Value("")
+            ),
+            first_product_image_renditions=Coalesce(
+                models.Subquery(first_line.values("product__primary_image_renditions")[:1]),
+                models.Value({}, output_field=models.JSONField()),
+            ),
+        )
+
+
 class Order(models.Model):
     class Status(models.TextChoices):
         REQUSETED = ("REQUSETED", "주문 요청")
@@ -181,7 +576,8 @@ class Order(models.Model):
         CANCEL_REQUESTED = ("CANCEL_REQUESTED", "취소 요청됨")
 
 
-    uid = models.UUIDField(default=uuid4, editable=False)
+    # 선착순 주문은 티켓 id를 uid로 씀 (mall.flash_sale, 같은 티켓으로 주문을 두 번 만들지 않음)
+    uid = models.UUIDField(default=uuid4, editable=False, unique=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -193,9 +589,16 @@ class Order(models.Model):
         choices=Status.choices, default=Status.REQUSETED, max_length=16
     )
     product_set = models.ManyToManyField(Product, through="OrderedProduct", blank=False)
+    # 주문 목록 표시용 요약. 주문 생성 시 채우고 상품 취소 시 refresh_summary()로 갱신
+    item_count = models.PositiveIntegerField("주문 상품 수", default=0, editable=False)
+    first_product_name = models.CharField("첫 상품 이름", max_length=100, blank=True, editable=False)
+    first_product_image = models.ImageField(upload_to="mall/product/images/%Y/%m/%d", blank=True, editable=False)
+    first_product_image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     def __str__(self):
         return f"Order {self.pk} by {self.user.name}"
 
@@ -204,38 +607,70 @@ class Order(models.Model):
 
     @property
     def name(self):
-        first_product = self.product_set.first()
-        if first_product is None:
+        if not self.item_count:
             return "주문 상품 없음"
-        size = self.product_set.all().count()
-        if size < 2:
-            return first_product.name
-        return f"{first_product.name} 외 {size - 1}건"
+        if self.item_count < 2:
+            return self.first_product_name
+        return f"{self.first_product_name} 외 {self.item_count - 1}건"
+
+    @staticmethod
+    def summary_fields(products):
+        """주문할 상품 목록(순서대로)으로 요약 컬럼 값을 만듭니다. (주문 생성 시)"""
+        first = products[0]
+        return {
+            "item_count": len(products),
+            "first_product_name": first.name,
+            "first_product_image": first.primary_image.name or "",
+            "first_product_image_renditions": first.primary_image_renditions,
+        }
 
     @classmethod
-    def create_from_cart(cls, user, cart_products):
-        """주문 생성 및 장바구니 항목 삭제 로직"""
-        total_amount = sum([cart_product.total_price for cart_product in cart_products])
-
-        # 주문 생성
-        order = cls.objects.create(user=user, total_amount=total_amount)
-
-        # 주문된 상품 추가
-        ordered_product_list = []
-        for cart_product in cart_products:
-            ordered_product = OrderedProduct(
-                order=order,
-                product=cart_product.product,
-                option=cart_product.option,
-                name=cart_product.product.name,
-                price=cart_product.product.price
-                      + (cart_product.option.additional_price if cart_product.option else 0),
-                quantity=cart_product.quantity,
-            )
-            ordered_product_list.append(ordered_product)
+    def create_from_cart(cls, user, lines):
+        """
+        장바구니에서 주문 생성. lines: 주문할 [(상품 id, 옵션 id), ...]
+        주문할 항목은 장바구니에서 한 번에 꺼내(mall.cart_store.take) 그 시점의 수량으로 주문하고 재고를 예약합니다.
+        재고가 모자라거나(mall.inventory.OutOfStock) 주문 생성에 실패하면 장바구니로 되돌립니다. 주문할 항목이 없으면 None
+        """
+        from .cart_store import build_lines, restore, take
+        from .inventory import reserve as reserve_stock
+        from .seller_orders import record_lines
+
+        cart = take(user.pk, lines)
+        try:
+            cart_products = build_lines(user.pk, cart)
+            if not cart_products:
+                restore(user.pk, cart)
+                return None
+
+            total_amount = sum([cart_product.total_price for cart_product in cart_products])
+            with transaction.atomic():
+                # 주문 생성
+                order = cls.objects.create(
+                    user=user,
+                    total_amount=total_amount,
+                    **cls.summary_fields([cart_product.product for cart_product in cart_products]),
+                )
 
-        OrderedProduct.objects.bulk_create(ordered_product_list)
-        cart_products.delete()
+                # 주문된 상품 추가
+                ordered_product_list = []
+                for cart_product in cart_products:
+                    ordered_product = OrderedProduct(
+                        order=order,
+                        product=cart_product.product,
+                        option=cart_product.option,
+                        name=cart_product.product.name,
+                        price=cart_product.unit_price,
+                        quantity=cart_product.quantity,
+                    )
+                    ordered_product_list.append(ordered_product)
+
+                OrderedProduct.objects.bulk_create(ordered_product_list)
+                record_lines(order, ordered_product_list, user.email)
+                # 재고가 모자라면 OutOfStock으로 주문 전체를 되돌림
+                reserve_stock(order, ordered_product_list)
+        except Exception:
+            restore(user.pk, cart)
+            raise
 
         return order
 
@@ -310,6 +745,12 @@ class Order(models.Model):
     class Meta:
         ordering = ["-pk"]
         verbose_name = verbose_name_plural = "주문"
+        indexes = [
+            # 사용자별 주문 목록 + 커서 페이지네이션(-pk)
+            models.Index(fields=["user", "-id"], name="order_user_id_idx"),
+            # 상품 이미지 파일 정리 시 주문 목록 썸네일 참조 확인 (mall.image_store)
+            models.Index(fields=["first_product_image"], name="order_first_image_idx"),
+        ]
 
 class OrderedProduct(models.Model):
     class Status(models.TextChoices):
@@ -350,6 +791,11 @@ class OrderedProduct(models.Model):
         self.status = self.Status.CANCELLED
         self.save()
 
+        from .inventory import release as release_stock
+
+        release_stock(ordered_product_ids=[self.pk])
+        Order.objects.filter(pk=self.order_id).refresh_summary()
+
         # 주문 상태 업데이트
         self.order.check_and_update_order_status()
 
@@ -383,6 +829,128 @@ class OrderedProduct(models.Model):
         ]
 
 
+class SellerOrderLine(models.Model):
+    """
+    판매자별 주문 상품 목록 (조회용 사본). 판매자가 있는 상품의 주문 상품마다 한 행이며
+    주문 생성 시 함께 만들고(mall.seller_orders) 주문/주문 상품 상태가 바뀌면 시그널로 갱신합니다.
+    판매자 주문 목록/구매자 검색/상태 필터를 조인과 DISTINCT 없이 이 테이블의 인덱스로 처리합니다.
+    """
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_constraint=False, related_name="seller_order_lines"
+    )
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="seller_lines")
+    ordered_product = models.OneToOneField(
+        OrderedProduct, on_delete=models.CASCADE, related_name="seller_line"
+    )
+    buyer = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_constraint=False, related_name="+"
+    )
+    buyer_email = models.EmailField("구매자 이메일", blank=True)  # 주문 시점
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, db_constraint=False, related_name="+")
+    product_name = models.CharField(max_length=100)
+    option_name = models.CharField(max_length=100, blank=True)
+    order_status = models.CharField(max_length=16, choices=Order.Status.choices)
+    status = models.CharField(max_length=16, choices=OrderedProduct.Status.choices)
+    price = models.PositiveIntegerField()
+    quantity = models.PositiveIntegerField()
+    amount = models.PositiveIntegerField()  # price * quantity
+    created_at = models.DateTimeField()  # 주문 시각
+
+    class Meta:
+        verbose_name = verbose_name_plural = "판매자 주문 상품"
+        ordering = ["-order_id", "id"]
+        indexes = [
+            # 판매자 주문 목록 + 커서 페이지네이션(-order_id, id)
+            models.Index(fields=["seller", "-order", "id"], name="seller_line_order_idx"),
+            models.Index(fields=["seller", "order_status", "-order", "id"], name="seller_line_status_idx"),
+            models.Index(fields=["seller", "buyer", "-order"], name="seller_line_buyer_idx"),
+            models.Index(fields=["seller", "buyer_email", "-order"], name="seller_line_buyer_email_idx"),
+        ]
+
+
+class Stock(models.Model):
+    """
+    상품(옵션) 재고. option이 없으면 상품 전체 재고이며, 재고 행이 없는 상품은 재고를 관리하지 않습니다.
+    available은 주문 가능한 수량으로, 주문 생성 시 예약한 만큼 바로 줄고 취소/예약 만료 시 돌아옵니다. (mall.inventory)
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stocks")
+    option = models.ForeignKey(
+        ProductOption, on_delete=models.CASCADE, null=True, blank=True, related_name="stocks"
+    )
+    available = models.PositiveIntegerField("주문 가능 수량", default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product.name} - {self.option.name if self.option else '전체'} ({self.available}개)"
+
+    class Meta:
+        verbose_name = verbose_name_plural = "재고"
+        constraints = [
+            UniqueConstraint(fields=["product", "option"], name="unique_stock_product_option", nulls_distinct=False)
+        ]
+
+
+class StockReservation(models.Model):
+    """
+    주문 상품 한 줄이 잡아 둔 재고. 결제 전까지 HELD(만료 시각 있음), 결제되면 COMMITTED,
+    취소되면 RELEASED, 결제 없이 만료되면 EXPIRED로 바뀌며 재고를 돌려줍니다.
+    """
+    class Status(models.TextChoices):
+        HELD = "held", "예약"
+        COMMITTED = "committed", "확정"
+        RELEASED = "released", "해제"
+        EXPIRED = "expired", "만료"
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="stock_reservations")
+    ordered_product = models.OneToOneField(
+        OrderedProduct, on_delete=models.CASCADE, related_name="stock_reservation"
+    )
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name="reservations")
+    quantity = models.PositiveIntegerField("수량")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.HELD)
+    expires_at = models.DateTimeField("예약 만료 시각")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = verbose_name_plural = "재고 예약"
+        indexes = [
+            # 만료된 예약 정리 작업용 (예약 중인 행만)
+            models.Index(
+                fields=["expires_at"], name="reservation_held_expiry_idx", condition=models.Q(status="held")
+            ),
+        ]
+
+
+class FlashSale(models.Model):
+    """
+    한정 수량 선착순 판매. 판매 기간에는 Redis 카운터로 구매 여부를 정하고(mall.flash_sale)
+    주문은 대기열에서 주기 작업이 정해진 속도로 만듭니다.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="flash_sales")
+    option = models.ForeignKey(
+        ProductOption, on_delete=models.CASCADE, null=True, blank=True, related_name="flash_sales"
+    )
+    quantity = models.PositiveIntegerField("판매 수량")
+    max_per_user = models.PositiveSmallIntegerField("1인당 최대 수량", default=1)
+    # 주문까지 만들어진 수량. Redis 카운터가 없어졌을 때 남은 수량을 다시 채우는 기준
+    sold = models.PositiveIntegerField("주문 수량", default=0, editable=False)
+    starts_at = models.DateTimeField("시작 시각")
+    ends_at = models.DateTimeField("종료 시각")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = verbose_name_plural = "선착순 판매"
+        ordering = ["-starts_at"]
+
+    def __str__(self):
+        return f"{self.product} 선착순 {self.quantity}개"
+
+    def is_open(self, now=None):
+        now = now or timezone.now()
+        return self.starts_at <= now < self.ends_at
+
+
 
 class AbstarctPortOnePayment(models.Model):
     class PayMethod(models.TextChoices):
@@ -537,9 +1105,10 @@ class OrderPayment(AbstarctPortOnePayment):
         """
         PortOne API를 호출하여 결제 상태를 확인하는 메서드.
         결제 성공 시 주문 상태를 PAID로 업데이트.
+        결제 결과 저장, 재고 확정, (재고 부족 시) 결제 취소 예약은 한 트랜잭션으로 반영됩니다.
         """
         try:
-            # PortOne API를 호출해 결제 상태 확인
+            # PortOne API를 호출해 결제 상태 확인 (트랜잭션 밖에서 호출)
             response = requests.get(
                 f"https://api.portone.io/payments/{self.merchant_uid}",
                 headers={"Authorization": f"PortOne {settings.PORTONE_API_SECRET}"},
@@ -550,15 +1119,30 @@ class OrderPayment(AbstarctPortOnePayment):
                     self.pay_status == "PAID"
                     and self.meta["amount"]["total"] == self.desired_amount
             )
-            self.save()
 
-            # 결제 성공 시 주문 상태를 업데이트
-            if self.is_paid_ok:
-                self.order.status = Order.Status.PAID
-                self.order.save()
+            with transaction.atomic():
+                self.save()
 
-                # 다른 결제 내역 삭제 (중복 방지)
-                self.order.payments.exclude(pk=self.pk).delete()
+                # 결제 성공 시 주문 상태를 업데이트
+                if self.is_paid_ok:
+                    # 웹훅이 중복으로 들어와도 처음 결제 완료로 바뀔 때만 재고 확정/판매량 집계
+                    newly_paid = Order.objects.filter(pk=self.order_id).exclude(
+                        status=Order.Status.PAID
+                    ).update(status=Order.Status.PAID)
+                    self.order.status = Order.Status.PAID
+                    self.order.save()
+
+                    # 다른 결제 내역 삭제 (중복 방지)
+                    self.order.payments.exclude(pk=self.pk).delete()
+
+                    if newly_paid:
+                        from mall.inventory import commit as commit_stock
+                        from mall.leaderboard import record_order_sales  # 순환 import 방지
+
+                        # 재고가 부족해 결제를 취소하는 주문은 판매량에 넣지 않음
+                        if not commit_stock(self.order_id):
+                            order_id = self.order_id
+                            transaction.on_commit(lambda: record_order_sales(order_id))
 
         except (Iamport.ResponseError, Iamport.HttpError) as e:
             logger.error(str(e), exc_info=e)
@@ -596,7 +1180,10 @@ class OrderPayment(AbstarctPortOnePayment):
 
     def update_related_statuses_to_cancelled(self):
         """
-        결제가 취소되었을 때 주문 상태를 CANCELLED로 변경.
+        결제가 취소되었을 때 주문 상태를 CANCELLED로 변경하고 예약한 재고를 돌려줌.
         """
+        from mall.inventory import release as release_stock
+
         self.order.status = Order.Status.CANCELLED
         self.order.save()
+        release_stock(order_id=self.order_id)
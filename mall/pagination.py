@@ -0,0 +1,27 @@
+from JunJunbariStudio.pagination import KeysetPagination
+
+
+class ProductPagination(KeysetPagination):
+    # Product 기본 정렬(판매량 순) + 동률 구분용 id
+    ordering = ("-sales_count", "id")
+    # 각 정렬은 판매 중 상품 부분 인덱스와 같은 컬럼 순서/방향 (Product.Meta.indexes)
+    ordering_options = {
+        "-sales_count": ordering,
+        "price": ("price", "id"),
+        "-price": ("-price", "-id"),
+        "-created_at": ("-created_at", "-id"),
+        "-review_score": ("-review_score", "id"),
+    }
+
+
+class OrderPagination(KeysetPagination):
+    ordering = ("-pk",)
+
+
+class SellerOrderLinePagination(KeysetPagination):
+    # 판매자별 주문 상품 인덱스(seller, -order, id)와 같은 순서
+    ordering = ("-order_id", "id")
+
+
+class CommentPagination(KeysetPagination):
+    ordering = ("-pk",)
@@ -32,3 +32,10 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         # 요청 사용자가 해당 객체의 소유자인 경우 True 반환
         return obj.user == request.user
 
+
+
+class IsSeller(permissions.BasePermission):
+    """판매자 또는 관리자만 허용 (조회 포함)"""
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_staff or user.is_seller))
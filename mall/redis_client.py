@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis():
+    """순위표, 카운터 등 캐시 API로 다룰 수 없는 Redis 자료구조용 클라이언트 (프로세스당 커넥션 풀 1개)"""
+    return redis.Redis.from_url(f"{settings.REDIS_URL}/0", decode_responses=True)
+
+
+@lru_cache(maxsize=None)
+def get_script(source):
+    """EVALSHA로 실행되는 Lua 스크립트 (처음 한 번만 스크립트 본문을 보냄)"""
+    return get_redis().register_script(source)
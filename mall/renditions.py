@@ -0,0 +1,176 @@
+"""
+상품 이미지 리사이즈본(rendition) 생성.
+
+원본은 그대로 두고 크기별(thumbnail/card/detail/zoom) WebP, JPEG 파일을 만들어
+ProductImage.renditions 에 목록(manifest)으로 기록하고, 원본 크기와 저화질 미리보기(placeholder)도 함께 기록합니다.
+파일은 이미지 필드의 storage(open/save/delete)로만 다루므로 로컬 파일 시스템이 아닌
+django-storages 백엔드(S3 등)에서도 동작합니다. 생성은 Celery 작업(mall.tasks)에서 실행됩니다.
+
+manifest 형식:
+    {
+        "source": "원본 파일 이름",
+        "sizes": {
+            "card": {"width": 400, "height": 300, "webp": "파일 이름", "jpeg": "파일 이름"},
+            ...
+        },
+    }
+"""
+import base64
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import ExifTags, Image, ImageOps
+
+from .cache import invalidate_product_detail
+from .image_store import release_file
+from .models import Product, ProductImage
+
+# 긴 변 기준 최대 크기. 큰 것부터 만들어 다음 크기는 직전 결과에서 줄임
+RENDITION_SIZES = {
+    "zoom": 1600,
+    "detail": 800,
+    "card": 400,
+    "thumbnail": 150,
+}
+RENDITION_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+# 미리보기는 긴 변 16px WebP를 data URI로 저장 (수백 바이트). 클라이언트가 늘려 흐리게 그림
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+# EXIF 방향 값 중 가로/세로가 바뀌는 값
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def rendition_name(source_name, size, extension):
+    """mall/product/images/2024/01/01/a.png -> mall/product/images/2024/01/01/renditions/a_card.webp"""
+    directory, filename = posixpath.split(source_name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, "renditions", f"{stem}_{size}.{extension}")
+
+
+def to_jpeg_mode(image):
+    # JPEG는 투명도를 지원하지 않으므로 흰 배경에 합성
+    if image.mode != "RGBA":
+        return image
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def open_source(source, max_size):
+    """
+    원본을 열어 화면 방향(EXIF)을 적용한 RGB/RGBA 이미지와 원본 크기(방향 적용 후)를 반환합니다.
+    JPEG는 디코딩 단계에서 max_size 가까이 축소해 큰 원본의 디코딩 비용을 줄입니다.
+    """
+    width, height = source.size
+    if source.getexif().get(ExifTags.Base.Orientation) in TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+    if source.format == "JPEG":
+        source.draft("RGB", (max_size, max_size))
+    image = ImageOps.exif_transpose(source)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return image, width, height
+
+
+def placeholder_uri(image):
+    """작게 줄인 이미지의 WebP data URI"""
+    image = image.copy()
+    image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.BILINEAR)
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", quality=PLACEHOLDER_QUALITY)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def describe(data):
+    """원본 크기와 미리보기만 구합니다. (리사이즈본이 이미 있는 이미지의 채우기용)"""
+    with Image.open(io.BytesIO(data)) as source:
+        image, width, height = open_source(source, PLACEHOLDER_SIZE)
+        return {"width": width, "height": height, "placeholder": placeholder_uri(image)}
+
+
+def render(data):
+    """
+    원본 바이트로 크기별/형식별 인코딩 결과와 원본 크기/미리보기를 만듭니다.
+    반환값: ({크기 이름: (width, height, {확장자: bytes})}, {"width", "height", "placeholder"})
+    """
+    results = {}
+    with Image.open(io.BytesIO(data)) as source:
+        image, width, height = open_source(source, max(RENDITION_SIZES.values()))
+        for size_name, max_size in RENDITION_SIZES.items():
+            image.thumbnail((max_size, max_size), Image.LANCZOS)  # 원본보다 크게 늘리지는 않음
+            encoded = {}
+            for extension, (image_format, save_options) in RENDITION_FORMATS.items():
+                buffer = io.BytesIO()
+                target = to_jpeg_mode(image) if image_format == "JPEG" else image
+                target.save(buffer, image_format, **save_options)
+                encoded[extension] = buffer.getvalue()
+            results[size_name] = (image.width, image.height, encoded)
+        # 가장 작은 리사이즈본에서 줄여 추가 디코딩 없이 미리보기 생성
+        return results, {"width": width, "height": height, "placeholder": placeholder_uri(image)}
+
+
+def delete_files(storage, names):
+    for name in names:
+        if storage.exists(name):
+            storage.delete(name)
+
+
+# 같은 원본 파일을 가리키는 행끼리 함께 쓰는 생성 결과 컬럼
+RENDERED_FIELDS = ("renditions", "width", "height", "placeholder")
+
+
+def rendered_fields(source_name):
+    """
+    같은 원본 파일을 가리키는 다른 행에 이미 만들어진 manifest/크기/미리보기 (내용 주소 저장으로 공유되는 경우)
+    반환값: {"renditions", "width", "height", "placeholder"} 또는 None
+    """
+    return (
+        ProductImage.objects.filter(image=source_name, renditions__source=source_name)
+        .exclude(placeholder="")
+        .values(*RENDERED_FIELDS)
+        .first()
+    )
+
+
+def generate_renditions(image_id):
+    """
+    ProductImage 하나의 리사이즈본을 만들어 저장하고, 같은 원본 파일을 가리키는 모든 행에 manifest를 기록합니다.
+    원본 크기와 미리보기도 함께 기록하며, 같은 원본의 리사이즈본이 이미 있으면 다시 만들지 않고 그 결과를 씁니다.
+    처리 중 원본이 바뀌었으면 바뀐 원본의 작업이 따로 실행되므로 남은 파일만 정리합니다.
+    """
+    product_image = ProductImage.objects.filter(pk=image_id).only("id", "image").first()
+    if product_image is None or not product_image.image:
+        return None
+
+    storage = product_image.image.storage
+    source_name = product_image.image.name
+    rendered = rendered_fields(source_name)
+    if rendered is None:
+        with storage.open(source_name, "rb") as source:
+            results, metadata = render(source.read())
+
+        sizes = {}
+        for size_name, (width, height, encoded) in results.items():
+            sizes[size_name] = {"width": width, "height": height}
+            for extension, data in encoded.items():
+                name = rendition_name(source_name, size_name, extension)
+                if storage.exists(name):
+                    storage.delete(name)
+                sizes[size_name][extension] = storage.save(name, ContentFile(data))
+        rendered = {"renditions": {"source": source_name, "sizes": sizes}, **metadata}
+
+    images = ProductImage.objects.filter(image=source_name)
+    product_ids = list(images.values_list("product_id", flat=True).distinct())
+    if not images.update(**rendered) and not product_ids:
+        release_file(source_name, storage)
+        return None
+
+    Product.objects.filter(pk__in=product_ids).refresh_primary_image()
+    for product_id in product_ids:
+        invalidate_product_detail(product_id)
+    return rendered["renditions"]
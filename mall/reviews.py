@@ -0,0 +1,75 @@
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .cache import invalidate_product_detail
+from .models import Comment, Product
+
+
+RATINGS = range(1, 6)
+
+
+def rating_field(rating):
+    return f"rating_{rating}_count"
+
+
+def apply_review_change(product_id, added=None, removed=None):
+    """
+    리뷰 1건의 추가(added)/삭제(removed) 별점을 상품 리뷰 집계에 반영합니다.
+    리뷰 전체를 다시 세지 않고 UPDATE 한 번으로 리뷰 수, 별점 합계, 평균, 별점별 리뷰 수를 함께 갱신합니다.
+    UPDATE 식의 우변은 모두 갱신 전 값을 참조하므로 동시에 들어온 리뷰끼리도 값이 어긋나지 않습니다.
+    """
+    if added == removed:
+        return
+
+    count_delta = int(added is not None) - int(removed is not None)
+    count = F("review_count") + count_delta
+    total = F("rating_total") + (added or 0) - (removed or 0)
+    updates = {
+        "review_count": count,
+        "rating_total": total,
+        "review_score": Coalesce(
+            Cast(total, FloatField()) / NullIf(count, 0), 0.0, output_field=FloatField()
+        ),
+    }
+    if added is not None:
+        updates[rating_field(added)] = F(rating_field(added)) + 1
+    if removed is not None:
+        updates[rating_field(removed)] = F(rating_field(removed)) - 1
+    Product.objects.filter(pk=product_id).update(**updates)
+    invalidate_product_detail(product_id)
+
+
+def rebuild_review_aggregates(product_ids):
+    """주어진 상품들의 리뷰 집계를 리뷰 테이블 기준으로 다시 계산합니다. (백필/보정용)"""
+    rows = (
+        Comment.objects.filter(product_id__in=product_ids)
+        .order_by()
+        .values("product_id")
+        .annotate(
+            count=Count("id"),
+            total=Sum("rating"),
+            **{
+                rating_field(rating): Count("id", filter=Q(rating=rating))
+                for rating in RATINGS
+            },
+        )
+    )
+    aggregates = {row.pop("product_id"): row for row in rows}
+
+    products = list(Product.objects.filter(pk__in=product_ids).only("id"))
+    for product in products:
+        row = aggregates.get(product.pk, {})
+        product.review_count = row.get("count", 0)
+        product.rating_total = row.get("total") or 0
+        product.review_score = (
+            product.rating_total / product.review_count if product.review_count else 0
+        )
+        for rating in RATINGS:
+            setattr(product, rating_field(rating), row.get(rating_field(rating), 0))
+
+    Product.objects.bulk_update(
+        products,
+        ["review_count", "rating_total", "review_score"]
+        + [rating_field(rating) for rating in RATINGS],
+    )
+    return len(products)
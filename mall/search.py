@@ -0,0 +1,26 @@
+from django.contrib.postgres.search import SearchVector
+from django.db.models import F, Func, TextField, Value
+from django.db.models.functions import Cast
+
+
+# 한국어/영어를 함께 다루기 위해 형태소 분석 없이 공백 단위로 토큰화하는 simple 설정을 사용합니다.
+SEARCH_CONFIG = "simple"
+
+# 검색 벡터에 반영되는 상품 필드. 이 필드가 바뀔 때만 벡터를 다시 계산합니다.
+SEARCH_SOURCE_FIELDS = frozenset({"name", "description", "keywords"})
+
+
+def product_search_vector():
+    """
+    상품명(A), 키워드(B), HTML 태그를 제거한 설명(C) 순으로 가중치를 준 tsvector 표현식.
+    DB 안에서 계산되므로 단건 저장과 대량 갱신(update) 모두에 그대로 사용할 수 있습니다.
+    """
+    plain_description = Func(
+        F("description"), Value("<[^>]+>"), Value(" "), Value("g"),
+        function="regexp_replace", output_field=TextField(),
+    )
+    return (
+        SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(Cast("keywords", TextField()), weight="B", config=SEARCH_CONFIG)
+        + SearchVector(plain_description, weight="C", config=SEARCH_CONFIG)
+    )
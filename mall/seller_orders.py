@@ -0,0 +1,67 @@
+"""
+판매자별 주문 상품 목록 (SellerOrderLine).
+
+판매자 주문 목록은 주문 -> 주문 상품 -> 상품을 조인해 DISTINCT 하는 대신 이 사본 테이블 하나를 읽습니다.
+
+- 생성: 주문 상품을 저장할 때 판매자가 있는 상품의 줄만 함께 만듭니다. (create_from_cart, 선착순 주문)
+- 갱신: 주문/주문 상품 상태가 바뀌면 시그널(mall.signals)이 해당 행의 상태만 바꿉니다.
+- 상품에 판매자를 나중에 지정했거나 사본이 어긋났으면 rebuild_seller_order_lines 명령으로 다시 만듭니다.
+"""
+from django.db import transaction
+
+from .models import OrderedProduct, SellerOrderLine
+
+
+def build_line(order, ordered_product, buyer_email):
+    return SellerOrderLine(
+        seller_id=ordered_product.product.seller_id,
+        order=order,
+        ordered_product=ordered_product,
+        buyer_id=order.user_id,
+        buyer_email=buyer_email or "",
+        product_id=ordered_product.product_id,
+        product_name=ordered_product.name,
+        option_name=ordered_product.option.name if ordered_product.option else "",
+        order_status=order.status,
+        status=ordered_product.status,
+        price=ordered_product.price,
+        quantity=ordered_product.quantity,
+        amount=ordered_product.price * ordered_product.quantity,
+        created_at=order.created_at,
+    )
+
+
+def record_lines(order, ordered_products, buyer_email):
+    """저장된 주문 상품 중 판매자가 있는 상품의 줄을 만듭니다. (상품/옵션이 채워진 인스턴스)"""
+    return SellerOrderLine.objects.bulk_create([
+        build_line(order, ordered_product, buyer_email)
+        for ordered_product in ordered_products
+        if ordered_product.product.seller_id
+    ])
+
+
+def sync_order_status(order):
+    SellerOrderLine.objects.filter(order_id=order.pk).exclude(order_status=order.status).update(
+        order_status=order.status
+    )
+
+
+def sync_line_status(ordered_product):
+    SellerOrderLine.objects.filter(ordered_product_id=ordered_product.pk).exclude(
+        status=ordered_product.status
+    ).update(status=ordered_product.status)
+
+
+def rebuild_lines(order_ids):
+    """주문들의 판매자 주문 상품 행을 주문 상품 기준으로 다시 만듭니다. 만든 행 수를 반환합니다."""
+    ordered_products = (
+        OrderedProduct.objects.filter(order_id__in=order_ids, product__seller__isnull=False)
+        .select_related("order__user", "product", "option")
+        .order_by("pk")
+    )
+    with transaction.atomic():
+        SellerOrderLine.objects.filter(order_id__in=order_ids).delete()
+        return len(SellerOrderLine.objects.bulk_create([
+            build_line(ordered_product.order, ordered_product, ordered_product.order.user.email)
+            for ordered_product in ordered_products
+        ]))
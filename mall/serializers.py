@@ -1,5 +1,16 @@
 # serializers.py
 from rest_framework import serializers
+
+from JunJunbariStudio.serializers import SparseFieldsetMixin
+from mall.cart_store import (
+    BULK_MAX_OPERATIONS as CART_BULK_MAX_OPERATIONS,
+    MAX_QUANTITY as CART_MAX_QUANTITY,
+    OPERATIONS as CART_OPERATIONS,
+    PRODUCT_FIELDS as CART_PRODUCT_FIELDS,
+    line_key,
+)
+from mall.renditions import RENDITION_FORMATS
+from mall.uploads import ALLOWED_EXTENSIONS, MAX_SIZE, received_chunks
 from mall.models import (
     Category,
     Product,
@@ -10,54 +21,100 @@ from mall.models import (
     OrderedProduct,
     Comment,
     OrderPayment, SubDetailCategory, SubCategory,
+    ImageUpload,
+    CatalogImport,
+    FlashSale,
+    SellerOrderLine,
 )
 
 
-class SubDetailCategorySerializer(serializers.ModelSerializer):
+class SubDetailCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SubDetailCategory
         fields = ['id', 'name']
 
 
-class SubCategorySerializer(serializers.ModelSerializer):
+class SubCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SubCategory
         fields = ['id', 'name']
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
 
-class ProductImageSerializer(serializers.ModelSerializer):
+def file_url(image, context):
+    """ImageField와 같이 요청이 있으면 절대 URL. 파일이 없으면 None"""
+    if not image:
+        return None
+    request = context.get("request")
+    url = image.url
+    return request.build_absolute_uri(url) if request else url
+
+
+def rendition_urls(image, manifest, context):
+    """
+    크기별 리사이즈본 URL. {"card": {"width", "height", "webp", "jpeg"}, ...}
+    아직 생성 전이거나 원본이 바뀐 뒤 다시 만드는 중이면 빈 dict
+    """
+    manifest = manifest or {}
+    if not image or manifest.get("source") != image.name:
+        return {}
+    storage = image.storage
+    request = context.get("request")
+
+    def url(name):
+        value = storage.url(name)
+        return request.build_absolute_uri(value) if request else value
+
+    return {
+        size_name: {
+            key: url(value) if key in RENDITION_FORMATS else value
+            for key, value in size.items()
+        }
+        for size_name, size in manifest["sizes"].items()
+    }
+
+
+class ProductImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
         fields = "__all__"
 
+    def get_renditions(self, obj):
+        return rendition_urls(obj.image, obj.renditions, self.context)
 
-class ProductOptionSerializer(serializers.ModelSerializer):
+
+class ProductOptionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ProductOption
         fields = "__all__"
 
 
-class ProductBannerSerializer(serializers.ModelSerializer):
+class ProductBannerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
 
     class Meta:
         model = Product
         fields = ['id', 'name', 'price', 'keywords', 'description', 'images']
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
 
     class Meta:
         model = Product
         fields = ['id', 'name', 'price', 'images', 'review_count', 'review_score']
+        # ?expand=options 요청 시에만 옵션 목록 포함
+        expandable_fields = {
+            'options': (ProductOptionSerializer, {'many': True, 'read_only': True}),
+        }
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
     options = ProductOptionSerializer(many=True, read_only=True)
     main_image_url = serializers.ReadOnlyField()
@@ -69,61 +126,133 @@ class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = "__all__"
+        exclude = ['search_vector']  # 검색 전용 컬럼 (상세 조회에서 읽지 않음, ProductQuerySet.for_detail)
+        read_only_fields = ['seller']  # 등록한 사용자로 지정 (ProductViewSet.perform_create)
+        # ?expand=category 등 요청 시 카테고리 id 대신 {id, name, ...} 객체로 응답
+        expandable_fields = {
+            'category': (CategorySerializer, {'read_only': True}),
+            'subcategory': (SubCategorySerializer, {'read_only': True}),
+            'sub_detail_category': (SubDetailCategorySerializer, {'read_only': True}),
+        }
 
 
-class CartProductSerializer(serializers.ModelSerializer):
+class CartProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # 장바구니 항목 식별자 "상품 id:옵션 id" (옵션이 없으면 0). 항목은 Redis에 있어 DB id가 없을 수 있음
+    key = serializers.SerializerMethodField()
     option = serializers.PrimaryKeyRelatedField(
         queryset=ProductOption.objects.all(), required=False, allow_null=True
     )
     total_amount = serializers.SerializerMethodField()
     main_image = serializers.SerializerMethodField()
+    main_image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = CartProduct
-        fields = ['id', 'user', 'product', 'option', 'quantity', 'total_amount', 'main_image']
+        fields = ['key', 'user', 'product', 'option', 'quantity', 'total_amount', 'main_image', 'main_image_renditions']
+
+    def get_key(self, obj):
+        return line_key(obj.product_id, obj.option_id)
 
     def get_total_amount(self, obj):
         # CartProduct 모델의 total_price 속성을 활용해 총 금액을 계산합니다.
         return obj.total_price
 
     def get_main_image(self, obj):
-        # 상품의 첫 번째 이미지를 반환
-        first_image = obj.product.images.first()
-        if first_image:
-            return first_image.image.url
-        return None
+        # 상품의 대표 이미지 (Product에 저장된 값이라 추가 쿼리 없음)
+        return file_url(obj.product.primary_image, self.context)
+
+    def get_main_image_renditions(self, obj):
+        return rendition_urls(obj.product.primary_image, obj.product.primary_image_renditions, self.context)
 
 # 구매자용 주문 목록 조회 시 사용
-class OrderedProductSerializer(serializers.ModelSerializer):
+class CartItemSerializer(serializers.Serializer):
+    """장바구니 담기/수량 변경 요청"""
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.only(*CART_PRODUCT_FIELDS))
+    option = serializers.PrimaryKeyRelatedField(
+        queryset=ProductOption.objects.all(), required=False, allow_null=True
+    )
+    # 음수면 그만큼 뺌
+    quantity = serializers.IntegerField(default=1, min_value=-CART_MAX_QUANTITY, max_value=CART_MAX_QUANTITY)
+
+    def validate(self, attrs):
+        option = attrs.get("option")
+        if option and option.product_id != attrs["product"].pk:
+            raise serializers.ValidationError({"option": "해당 상품의 옵션이 아닙니다."})
+        return attrs
+
+
+class CartOperationSerializer(serializers.Serializer):
+    """장바구니 일괄 변경 항목 하나. add: 수량만큼 더함, set: 수량으로 바꿈, remove: 삭제 (0 이하가 되면 삭제)"""
+    op = serializers.ChoiceField(choices=CART_OPERATIONS, default="add")
+    product = serializers.IntegerField(min_value=1)
+    option = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    quantity = serializers.IntegerField(default=1, min_value=-CART_MAX_QUANTITY, max_value=CART_MAX_QUANTITY)
+
+
+class CartQuantitySerializer(serializers.Serializer):
+    """장바구니 항목 수량 변경 요청 (0 이하면 삭제)"""
+    quantity = serializers.IntegerField(max_value=CART_MAX_QUANTITY)
+
+
+class CartBulkSerializer(serializers.Serializer):
+    """장바구니 일괄 변경 요청. 상품/옵션 확인은 요청 전체에 대해 두 번의 쿼리로 처리"""
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=CART_BULK_MAX_OPERATIONS)
+
+    def validate_operations(self, operations):
+        product_ids = {operation["product"] for operation in operations}
+        option_ids = {operation["option"] for operation in operations if operation.get("option")}
+        products = set(Product.objects.filter(pk__in=product_ids).values_list("id", flat=True))
+        options = dict(ProductOption.objects.filter(pk__in=option_ids).values_list("id", "product_id"))
+
+        errors = {}
+        for index, operation in enumerate(operations):
+            if operation["product"] not in products:
+                errors[index] = {"product": "존재하지 않는 상품입니다."}
+            elif operation.get("option") and options.get(operation["option"]) != operation["product"]:
+                errors[index] = {"option": "해당 상품의 옵션이 아닙니다."}
+        if errors:
+            raise serializers.ValidationError(errors)
+        return operations
+
+
+class OrderedProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    product_name = serializers.CharField(source="name", read_only=True)
     option_name = serializers.CharField(source="option.name", allow_null=True)
     total_price = serializers.SerializerMethodField()
     product_image = serializers.SerializerMethodField()
+    product_image_renditions = serializers.SerializerMethodField()
     class Meta:
         model = OrderedProduct
-        fields = ['id', 'product_name', 'option_name', 'quantity', 'price', 'total_price', 'product_image']
+        fields = ['id', 'product_name', 'option_name', 'quantity', 'price', 'total_price', 'product_image',
+                  'product_image_renditions']
     def get_total_price(self, obj):
         return obj.price * obj.quantity
     def get_product_image(self, obj):
-        first_image = obj.product.images.first()
-        return first_image.image.url if first_image else None
+        return file_url(obj.product.primary_image, self.context)
+    def get_product_image_renditions(self, obj):
+        return rendition_urls(obj.product.primary_image, obj.product.primary_image_renditions, self.context)
 # 판매자용 주문 목록 조회 시 사용
-class OrderedProductForSellerSerializer(serializers.ModelSerializer):
+class OrderedProductForSellerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    product_name = serializers.CharField(source="name", read_only=True)
     option_name = serializers.CharField(source="option.name", allow_null=True)
     total_price = serializers.SerializerMethodField()
     product_image = serializers.SerializerMethodField()
+    product_image_renditions = serializers.SerializerMethodField()
     buyer = serializers.SerializerMethodField()
 
     class Meta:
         model = OrderedProduct
-        fields = ['id', 'product_name', 'option_name', 'quantity', 'price', 'total_price', 'product_image', 'buyer']
+        fields = ['id', 'product_name', 'option_name', 'quantity', 'price', 'total_price', 'product_image',
+                  'product_image_renditions', 'buyer']
 
     def get_total_price(self, obj):
         return obj.price * obj.quantity
 
     def get_product_image(self, obj):
-        first_image = obj.product.images.first()
-        return first_image.image.url if first_image else None
+        return file_url(obj.product.primary_image, self.context)
+
+    def get_product_image_renditions(self, obj):
+        return rendition_urls(obj.product.primary_image, obj.product.primary_image_renditions, self.context)
 
     def get_buyer(self, obj):
         return {
@@ -134,41 +263,31 @@ class OrderedProductForSellerSerializer(serializers.ModelSerializer):
 
 
 # 주문 목록을 보여줄 때 사용
-class OrderCompactSerializer(serializers.ModelSerializer):
-    ordered_products_count = serializers.SerializerMethodField()
+class OrderCompactSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    ordered_products_count = serializers.IntegerField(source="item_count", read_only=True)
     first_product_image = serializers.SerializerMethodField()
-    first_product_name = serializers.SerializerMethodField()
+    first_product_image_renditions = serializers.SerializerMethodField()
+    first_product_name = serializers.CharField(source="name", read_only=True)
     class Meta:
         model = Order
-        fields = ['id', 'total_amount', 'status', 'created_at', 'first_product_image', 'first_product_name', 'ordered_products_count']
-    def get_ordered_products_count(self, obj):
-        return obj.ordered_products.count()
-
+        fields = ['id', 'total_amount', 'status', 'created_at', 'first_product_image', 'first_product_image_renditions',
+                  'first_product_name', 'ordered_products_count']
+    # 주문에 저장된 요약 컬럼만 사용 (주문별 추가 쿼리 없음)
     def get_first_product_image(self, obj):
-        # 첫 번째 상품의 이미지를 반환
-        first_product = obj.ordered_products.first()
-        if first_product:
-            first_image = first_product.product.images.first()
-            return first_image.image.url if first_image else None
-        return None
-    def get_first_product_name(self, obj):
-        first_product = obj.ordered_products.first()
-        if not first_product:
-            return None
-        count = obj.ordered_products.count()
-        if count > 1:
-            return f"{first_product.product.name} 외 {count - 1}건"
-        return first_product.product.name
+        return file_url(obj.first_product_image, self.context)
+
+    def get_first_product_image_renditions(self, obj):
+        return rendition_urls(obj.first_product_image, obj.first_product_image_renditions, self.context)
 
 # 주문 상세 정보 조회 시 사용
-class OrderDetailSerializer(serializers.ModelSerializer):
+class OrderDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     ordered_products = OrderedProductSerializer(many=True)
     class Meta:
         model = Order
         fields = ['id', 'total_amount', 'status', 'created_at', 'ordered_products']
 
 #TODO: 판매자가 자신의 상품이 포함된 주문 내역을 조회할 때 사용 이거 수정 필요함. 주문 내역 전체를 보는거면 안됨.
-class SellerOrderSerializer(serializers.ModelSerializer):
+class SellerOrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     ordered_products = serializers.SerializerMethodField()
     class Meta:
         model = Order
@@ -176,16 +295,117 @@ class SellerOrderSerializer(serializers.ModelSerializer):
     def get_ordered_products(self, obj):
         # 판매자가 판매한 상품만 반환
         user = self.context['request'].user
-        ordered_products = obj.ordered_products.filter(product__seller=user)
-        return OrderedProductForSellerSerializer(ordered_products, many=True).data
+        ordered_products = obj.ordered_products.filter(product__seller=user).select_related(
+            'product', 'option', 'order__user'
+        )
+        return OrderedProductForSellerSerializer(ordered_products, many=True, context=self.context).data
+
+# 판매자 주문 목록/구매자 검색 (판매자 주문 상품 사본 테이블 한 번 조회)
+class SellerOrderLineSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    buyer = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SellerOrderLine
+        fields = ['id', 'order', 'order_status', 'ordered_product', 'status', 'product', 'product_name',
+                  'option_name', 'price', 'quantity', 'amount', 'buyer', 'created_at']
+
+    def get_buyer(self, obj):
+        return {
+            'id': obj.buyer_id,
+            'username': obj.buyer.username,
+            'email': obj.buyer_email,
+        }
+
+class ImageUploadSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
 
-class CommentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImageUpload
+        fields = [
+            'id', 'product', 'filename', 'total_size', 'chunk_size', 'total_chunks', 'received_chunks',
+            'status', 'error', 'image', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['chunk_size', 'status', 'error', 'image']
+
+    def get_received_chunks(self, obj):
+        # 이어서 올릴 때 빠진 조각만 보내도록 받은 조각 번호 목록을 알려줌
+        if obj.status != ImageUpload.Status.UPLOADING:
+            return []
+        return received_chunks(obj)
+
+    def validate_product(self, value):
+        # 본인 상품에만 이미지를 올릴 수 있음 (관리자는 전체)
+        user = self.context['request'].user
+        if not user.is_staff and value.seller_id != user.pk:
+            raise serializers.ValidationError("본인 상품에만 이미지를 올릴 수 있습니다.")
+        return value
+
+    def validate_filename(self, value):
+        extension = value.rsplit('.', 1)[-1].lower() if '.' in value else ''
+        if extension not in ALLOWED_EXTENSIONS:
+            raise serializers.ValidationError(f"지원하지 않는 파일 형식입니다. ({', '.join(ALLOWED_EXTENSIONS)})")
+        return value
+
+    def validate_total_size(self, value):
+        if not 0 < value <= MAX_SIZE:
+            raise serializers.ValidationError(f"파일 크기는 1 ~ {MAX_SIZE}바이트여야 합니다.")
+        return value
+
+
+class CatalogImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CatalogImport
+        fields = ['id', 'format', 'status', 'result', 'error', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = "__all__"
 
 
-class OrderPaymentSerializer(serializers.ModelSerializer):
+class OrderPaymentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderPayment
         fields = "__all__"
+
+
+class FlashSaleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    product_name = serializers.CharField(source="product.name", read_only=True)
+    option_name = serializers.CharField(source="option.name", read_only=True, allow_null=True)
+    remaining = serializers.SerializerMethodField()
+    is_open = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FlashSale
+        fields = [
+            'id', 'product', 'product_name', 'option', 'option_name', 'quantity', 'remaining', 'max_per_user',
+            'starts_at', 'ends_at', 'is_open',
+        ]
+
+    def get_remaining(self, obj):
+        # 남은 수량은 뷰가 Redis에서 한 번에 읽어 context로 넘김 (mall.flash_sale.remaining)
+        return self.context.get("remaining", {}).get(obj.pk)
+
+    def get_is_open(self, obj):
+        return obj.is_open()
+
+
+class FlashSaleEntrySerializer(serializers.Serializer):
+    """선착순 구매 입장 요청"""
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class FlashSaleTicketSerializer(serializers.Serializer):
+    """
+    선착순 구매 티켓 상태. status: queued(주문 대기) -> created(주문 생성됨, order) / failed(error)
+    created -> expired: 결제 없이 재고 예약이 만료되어 수량을 돌려줌 (다시 입장 가능)
+    """
+    ticket = serializers.CharField()
+    status = serializers.CharField()
+    sale = serializers.IntegerField()
+    quantity = serializers.IntegerField()
+    order = serializers.IntegerField(allow_null=True)
+    error = serializers.CharField(allow_blank=True)
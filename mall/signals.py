@@ -1,14 +1,176 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from PIL import Image
-from .models import ProductImage
+from . import tasks
+from .cache import PRODUCT_VERSION_KEY, bump_version, invalidate_product_detail
+from .category_tree import invalidate_category_tree, move_product_counts
+from .flash_sale import invalidate_sale
+from .leaderboard import remove_product
+from .models import (
+    Category,
+    Comment,
+    FlashSale,
+    Order,
+    OrderedProduct,
+    Product,
+    ProductImage,
+    ProductOption,
+    SubCategory,
+    SubDetailCategory,
+)
+from .reviews import apply_review_change
+from .search import SEARCH_SOURCE_FIELDS
+from .seller_orders import sync_line_status, sync_order_status
 
 
 @receiver(post_save, sender=ProductImage)
-def resize_image(sender, instance, **kwargs):
-    image_path = instance.image.path
-    with Image.open(image_path) as img:
-        if img.height > 300 or img.width > 300:
-            output_size = (300, 300)
-            img.thumbnail(output_size)
-            img.save(image_path)
+def generate_image_renditions(sender, instance, created, **kwargs):
+    # 리사이즈는 요청 스레드가 아닌 Celery 작업에서 실행. 원본 파일이 새로 저장되었을 때만 예약
+    if not instance.image:
+        return
+    old_name = getattr(instance, "_loaded_image_name", None)
+    if not created and old_name == instance.image.name:
+        return
+    instance._loaded_image_name = instance.image.name
+    transaction.on_commit(lambda: tasks.generate_image_renditions.delay(instance.pk))
+    if old_name:
+        # 교체된 이전 파일은 다른 상품 이미지가 가리키지 않을 때만 지움
+        transaction.on_commit(lambda: tasks.release_image_file.delay(old_name))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def refresh_primary_image(sender, instance, **kwargs):
+    # 이미지가 추가/교체/삭제되거나 순서가 바뀌면 상품의 대표 이미지를 다시 채움
+    Product.objects.filter(pk=instance.product_id).refresh_primary_image()
+
+
+@receiver(post_delete, sender=ProductImage)
+def release_image_file(sender, instance, **kwargs):
+    # 같은 파일을 가리키는 다른 상품 이미지가 없을 때만 원본과 리사이즈본을 지움 (참조 수 = 행 수)
+    name = instance.image.name
+    if name:
+        transaction.on_commit(lambda: tasks.release_image_file.delay(name))
+
+
+@receiver(post_save, sender=Product)
+def update_search_vector(sender, instance, update_fields=None, **kwargs):
+    # 검색 대상 필드가 바뀌지 않은 부분 저장(update_fields)은 건너뜀
+    if update_fields is not None and not SEARCH_SOURCE_FIELDS.intersection(update_fields):
+        return
+    Product.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def bump_product_version(sender, instance, **kwargs):
+    # 커밋 후 상품 버전 키를 올려 패싯 등 상품 집계 캐시를 무효화
+    transaction.on_commit(lambda: bump_version(PRODUCT_VERSION_KEY))
+
+
+@receiver(post_save, sender=Product)
+def update_category_counts(sender, instance, created, **kwargs):
+    new_path = instance.category_path
+    if created:
+        old_path = (None, None, None)
+    else:
+        old_path = getattr(instance, "_loaded_category_path", None)
+        if old_path is None:
+            return
+        # 로드되지 않았던(defer) 단계는 변경 여부를 알 수 없으므로 건너뜀
+        new_path = tuple(
+            new if old is not None else None for old, new in zip(old_path, new_path)
+        )
+
+    if move_product_counts(old_path, new_path):
+        invalidate_category_tree()
+    instance._loaded_category_path = instance.category_path
+
+
+@receiver(post_delete, sender=Product)
+def decrease_category_counts(sender, instance, **kwargs):
+    if move_product_counts(instance.category_path, (None, None, None)):
+        invalidate_category_tree()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_save, sender=SubDetailCategory)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=SubCategory)
+@receiver(post_delete, sender=SubDetailCategory)
+def refresh_category_tree(sender, instance, **kwargs):
+    # 분류 행이 바뀌면 분류 트리 문서를 다시 만들도록 무효화
+    invalidate_category_tree()
+
+
+@receiver(post_delete, sender=Product)
+def remove_from_leaderboard(sender, instance, **kwargs):
+    product_id, category_id = instance.pk, instance.category_id
+    transaction.on_commit(lambda: remove_product(product_id, category_id))
+
+
+@receiver(post_save, sender=Comment)
+def update_review_aggregates(sender, instance, created, **kwargs):
+    # Comment.save()가 트랜잭션을 열어 두므로 리뷰 저장과 같은 트랜잭션에서 실행됨
+    if created:
+        apply_review_change(instance.product_id, added=instance.rating)
+    else:
+        old_product_id, old_rating = getattr(instance, "_loaded_review", (None, None))
+        if old_rating is None:
+            return
+        if old_product_id != instance.product_id:
+            apply_review_change(old_product_id, removed=old_rating)
+            apply_review_change(instance.product_id, added=instance.rating)
+        else:
+            apply_review_change(instance.product_id, added=instance.rating, removed=old_rating)
+    instance._loaded_review = (instance.product_id, instance.rating)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_review_aggregates(sender, instance, **kwargs):
+    # 삭제는 Collector가 연 트랜잭션 안에서 시그널이 실행됨
+    apply_review_change(instance.product_id, removed=instance.rating)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    invalidate_product_detail(instance.pk)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductOption)
+@receiver(post_delete, sender=ProductOption)
+def invalidate_product_cache_by_related(sender, instance, **kwargs):
+    # 이미지/옵션이 바뀌면 해당 상품 상세 캐시를 무효화
+    invalidate_product_detail(instance.product_id)
+
+
+@receiver(post_save, sender=FlashSale)
+@receiver(post_delete, sender=FlashSale)
+def invalidate_flash_sale(sender, instance, **kwargs):
+    # 입장 요청이 읽는 판매 정보 캐시 (mall.flash_sale.get_sale)
+    invalidate_sale(instance.pk)
+
+
+@receiver(post_save, sender=Order)
+def sync_seller_order_status(sender, instance, created, **kwargs):
+    # 판매자 주문 상품 목록의 주문 상태 (새 주문은 주문 상품을 저장할 때 함께 만듦)
+    if not created:
+        sync_order_status(instance)
+
+
+@receiver(post_delete, sender=Order)
+def release_order_image_file(sender, instance, **kwargs):
+    # 주문 목록 썸네일도 상품 이미지 파일의 참조이므로, 다른 행이 가리키지 않으면 지움
+    name = instance.first_product_image.name
+    if name:
+        transaction.on_commit(lambda: tasks.release_image_file.delay(name))
+
+
+@receiver(post_save, sender=OrderedProduct)
+def sync_seller_line_status(sender, instance, created, **kwargs):
+    if not created:
+        sync_line_status(instance)
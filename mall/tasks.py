@@ -10,3 +10,94 @@ def cancel_payment(payment_id, reason):
         return {"status": "success", "message": "Payment cancelled successfully."}
     except Exception as e:
         return {"status": "failed", "message": str(e)}
+
+
+@shared_task
+def generate_image_renditions(image_id):
+    """상품 이미지 크기별 WebP/JPEG 리사이즈본 생성"""
+    from mall.renditions import generate_renditions
+
+    manifest = generate_renditions(image_id)
+    return {"image_id": image_id, "sizes": sorted(manifest["sizes"]) if manifest else []}
+
+
+@shared_task
+def release_image_file(name):
+    """더 이상 참조되지 않는 상품 이미지 원본/리사이즈본 파일 정리"""
+    from mall.image_store import release_file
+
+    return {"name": name, "deleted": release_file(name)}
+
+
+@shared_task
+def release_deferred_image_files():
+    """방금 저장된 파일이라 미뤘던 상품 이미지 파일 정리 (주기 작업)"""
+    from mall.image_store import release_deferred
+
+    return {"deleted": release_deferred()}
+
+
+@shared_task
+def assemble_image_upload(upload_id):
+    """분할 업로드된 조각을 합쳐 상품 이미지로 등록"""
+    from mall.uploads import assemble
+
+    product_image = assemble(upload_id)
+    return {"upload_id": upload_id, "image_id": product_image.pk if product_image else None}
+
+
+@shared_task
+def cleanup_image_uploads():
+    """오래 멈춘/실패한 분할 업로드 정리 (주기 작업)"""
+    from mall.uploads import cleanup_stale_uploads
+
+    return {"deleted": cleanup_stale_uploads()}
+
+
+@shared_task
+def import_catalog(import_id):
+    """업로드된 CSV/JSONL 파일로 상품 일괄 등록/수정"""
+    from mall.catalog_io import run_import
+
+    job = run_import(import_id)
+    return {"import_id": import_id, "status": job.status if job else None}
+
+
+@shared_task
+def sync_sales_counts():
+    """Redis 판매량 순위표를 Product.sales_count에 반영 (주기 작업)"""
+    from mall.leaderboard import sync_sales_counts as sync
+
+    return {"updated": sync()}
+
+
+@shared_task
+def release_expired_stock_reservations():
+    """결제 없이 만료된 재고 예약의 재고를 돌려줌 (주기 작업)"""
+    from mall.inventory import release_expired
+
+    return {"released": release_expired()}
+
+
+@shared_task
+def drain_flash_sale_queue():
+    """선착순 판매 대기열에서 주문 생성 (주기 작업, 주기마다 FLASH_SALE_DRAIN_BATCH개씩)"""
+    from mall.flash_sale import drain_queue
+
+    return {"processed": drain_queue()}
+
+
+@shared_task
+def flush_carts():
+    """Redis 장바구니 변경분을 CartProduct에 반영 (주기 작업)"""
+    from mall.cart_store import flush_dirty_carts
+
+    return {"flushed": flush_dirty_carts()}
+
+
+@shared_task
+def flush_view_counts():
+    """Redis에 쌓인 상품 조회수를 Product.view_count에 반영 (주기 작업)"""
+    from mall.view_counts import flush_view_counts as flush
+
+    return {"flushed": flush()}
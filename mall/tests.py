@@ -1,3 +1,159 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from mall.cache import product_detail_key
+from mall.cart_store import DIRTY_KEY, cart_key
+from mall.cart_store import apply as apply_cart
+from mall.inventory import OutOfStock
+from mall.models import (
+    Category, Order, Product, ProductImage, ProductOption, Stock, StockReservation, SubCategory, SubDetailCategory,
+)
+from mall.redis_client import get_redis
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class ProductQueryCountTests(TestCase):
+    """
+    상품 목록/상세/검색의 SQL 실행 횟수가 상품 수, 이미지/옵션 수와 관계없이 같은지 확인합니다.
+    QUERY_BUDGET_STRICT를 켜 두어 액션별 상한(ProductViewSet.query_budgets)을 넘으면 요청이 실패합니다.
+    """
+
+    size = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="의류")
+        subcategory = SubCategory.objects.create(name="상의", category=category)
+        sub_detail_category = SubDetailCategory.objects.create(name="셔츠", subcategory=subcategory)
+        categories = {
+            "category": category, "subcategory": subcategory, "sub_detail_category": sub_detail_category,
+        }
+        # 이미지/옵션이 1개인 상품과 size개인 상품들
+        cls.single = Product.objects.create(name="면 바지", description="면 바지", price=20000, **categories)
+        cls.products = [
+            Product.objects.create(name=f"린넨 셔츠 {index}", description="린넨 셔츠", price=30000, **categories)
+            for index in range(cls.size)
+        ]
+        ProductImage.objects.bulk_create(
+            [ProductImage(product=cls.single, image="mall/product/images/single.jpg")]
+            + [
+                ProductImage(product=product, image=f"mall/product/images/{product.pk}-{index}.jpg", position=index)
+                for product in cls.products
+                for index in range(cls.size)
+            ]
+        )
+        ProductOption.objects.bulk_create(
+            [ProductOption(product=cls.single, name="M")]
+            + [
+                ProductOption(product=product, name=f"옵션 {index}")
+                for product in cls.products
+                for index in range(cls.size)
+            ]
+        )
+        cls.user = get_user_model().objects.create_user(username="query-count", password="password")
+
+    def count_queries(self, path, params=None, user=None):
+        client = APIClient()
+        if user is not None:
+            # 토큰 인증을 거쳐 사용자 조회 쿼리까지 센다
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(path, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(queries), response.data
+
+    def test_list(self):
+        for user in (None, self.user):
+            with self.subTest(user=user):
+                one, data = self.count_queries("/mall/products/", {"limit": 1}, user)
+                self.assertEqual(len(data["results"]), 1)
+                many, data = self.count_queries("/mall/products/", {"limit": self.size + 1}, user)
+                self.assertEqual(len(data["results"]), self.size + 1)
+                self.assertEqual(one, many)
+
+    def test_retrieve(self):
+        for user in (None, self.user):
+            with self.subTest(user=user):
+                counts = []
+                for product in (self.single, self.products[0]):
+                    # 캐시된 응답은 쿼리를 실행하지 않으므로 DB에서 다시 만들도록 비움
+                    cache.delete(product_detail_key(product.pk))
+                    count, data = self.count_queries(f"/mall/products/{product.pk}/", user=user)
+                    self.assertNotIn("search_vector", data)
+                    counts.append(count)
+                self.assertEqual(counts[0], counts[1])
+
+    def test_search(self):
+        for user in (None, self.user):
+            with self.subTest(user=user):
+                one, data = self.count_queries("/mall/products/search/", {"q": "바지"}, user)
+                self.assertEqual(len(data["results"]), 1)
+                many, data = self.count_queries("/mall/products/search/", {"q": "린넨"}, user)
+                self.assertEqual(len(data["results"]), self.size)
+                self.assertEqual(one, many)
+
+
+class StockConcurrencyTests(TransactionTestCase):
+    """
+    여러 구매자가 동시에 주문해도 재고보다 많이 팔리지 않는지 확인합니다.
+    스레드마다 별도 DB 연결로 커밋된 재고를 읽어야 하므로 TransactionTestCase를 사용합니다.
+    """
+
+    workers = 8
+
+    def setUp(self):
+        self.users = []
+
+    def tearDown(self):
+        # 테스트 DB의 id는 실행마다 다시 쓰이므로 Redis에 남은 장바구니를 지움
+        user_ids = [user.pk for user in self.users]
+        if user_ids:
+            client = get_redis()
+            client.delete(*[cart_key(user_id) for user_id in user_ids])
+            client.srem(DIRTY_KEY, *user_ids)
+
+    def place_orders(self, stock_count, buyer_count):
+        """재고가 stock_count개인 상품을 buyer_count명이 동시에 1개씩 주문합니다. (상품 재고, 성공한 주문 수)"""
+        product = Product.objects.create(name="재고 동시성 확인", description="", price=1000)
+        stock = Stock.objects.create(product=product, available=stock_count)
+        User = get_user_model()
+        self.users = User.objects.bulk_create([
+            User(username=f"stock-check-{index}") for index in range(buyer_count)
+        ])
+
+        def place_order(user):
+            try:
+                apply_cart(user.pk, [("set", product.pk, None, 1)])
+                return Order.create_from_cart(user, [(product.pk, None)]) is not None
+            except OutOfStock:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            succeeded = sum(executor.map(place_order, self.users))
+        stock.refresh_from_db()
+        return stock, succeeded
+
+    def check(self, stock_count, buyer_count):
+        stock, succeeded = self.place_orders(stock_count, buyer_count)
+        held = sum(
+            StockReservation.objects.filter(stock=stock, status=StockReservation.Status.HELD)
+            .values_list("quantity", flat=True)
+        )
+        self.assertEqual(succeeded, min(stock_count, buyer_count))
+        self.assertEqual(stock.available, stock_count - succeeded)
+        self.assertEqual(held, succeeded)
+
+    def test_buyers_exceed_stock(self):
+        self.check(stock_count=5, buyer_count=20)
+
+    def test_stock_exceeds_buyers(self):
+        self.check(stock_count=20, buyer_count=10)
@@ -0,0 +1,188 @@
+"""
+상품 이미지 분할(chunk) 업로드.
+
+1. 업로드 생성: 파일 이름/크기를 받아 ImageUpload 행을 만들고 조각 크기를 알려줍니다.
+2. 조각 전송: 조각마다 한 요청으로 받아 저장소(parts_dir)에 바로 저장합니다.
+   웹 워커는 조각 하나를 받는 동안만 점유되며, 끊긴 업로드는 받은 조각 목록을 조회해 빠진 조각부터 이어서 보냅니다.
+3. 완료: 조각이 모두 있으면 Celery 작업이 조각을 순서대로 이어 붙여 내용 주소 이름으로 저장하고,
+   이미지로 열리는지 확인한 뒤 ProductImage로 등록합니다. (리사이즈본/대표 이미지는 기존 시그널이 처리)
+"""
+import io
+import logging
+import posixpath
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from .image_store import blob_name, content_hash, release_file, store_blob
+from .models import ImageUpload, ProductImage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = settings.IMAGE_UPLOAD_CHUNK_SIZE
+MAX_SIZE = settings.IMAGE_UPLOAD_MAX_SIZE
+ALLOWED_EXTENSIONS = ("jpg", "jpeg", "png", "webp", "gif")
+ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP", "GIF")
+
+
+class UploadError(ValueError):
+    pass
+
+
+def received_chunks(upload, storage=default_storage):
+    """저장소에 온전히(예상 크기만큼) 저장된 조각 번호 목록"""
+    try:
+        _, files = storage.listdir(upload.parts_dir)
+    except FileNotFoundError:
+        return []
+    received = []
+    for filename in files:
+        stem, extension = posixpath.splitext(filename)
+        if extension != ".part" or not stem.isdigit():
+            continue
+        index = int(stem)
+        if index < upload.total_chunks and storage.size(upload.part_name(index)) == upload.expected_chunk_size(index):
+            received.append(index)
+    return sorted(received)
+
+
+def save_chunk(upload, index, data, storage=default_storage):
+    """조각 하나를 저장합니다. 같은 조각을 다시 보내면 덮어씁니다. (재전송 허용)"""
+    if upload.status != ImageUpload.Status.UPLOADING:
+        raise UploadError("업로드 중인 상태가 아닙니다.")
+    if not 0 <= index < upload.total_chunks:
+        raise UploadError(f"조각 번호는 0 ~ {upload.total_chunks - 1} 사이여야 합니다.")
+    expected = upload.expected_chunk_size(index)
+    if len(data) != expected:
+        raise UploadError(f"{index}번 조각의 크기는 {expected}바이트여야 합니다. (받은 크기: {len(data)})")
+
+    name = upload.part_name(index)
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, File(io.BytesIO(data), name=name))
+    # 마지막 활동 시각 갱신 (오래 멈춘 업로드 정리 기준)
+    ImageUpload.objects.filter(pk=upload.pk).update(updated_at=timezone.now())
+
+
+def request_assembly(upload, storage=default_storage):
+    """모든 조각이 있으면 합치기 상태로 바꾸고 합치기 작업을 예약합니다."""
+    missing = sorted(set(range(upload.total_chunks)) - set(received_chunks(upload, storage)))
+    if missing:
+        raise UploadError(f"받지 못한 조각이 있습니다: {missing[:20]}")
+    # 완료 요청이 동시에 여러 번 와도 한 번만 합치도록 상태를 조건부로 변경
+    updated = ImageUpload.objects.filter(pk=upload.pk, status=ImageUpload.Status.UPLOADING).update(
+        status=ImageUpload.Status.ASSEMBLING, updated_at=timezone.now()
+    )
+    if not updated:
+        raise UploadError("이미 완료 처리된 업로드입니다.")
+
+    from .tasks import assemble_image_upload
+
+    transaction.on_commit(lambda: assemble_image_upload.delay(str(upload.pk)))
+
+
+class PartsReader(io.RawIOBase):
+    """저장소의 조각 파일들을 하나의 파일처럼 순서대로 읽습니다. (한 번에 조각 하나만 열어 둠)"""
+
+    def __init__(self, storage, names):
+        self.storage = storage
+        self.names = list(names)
+        self.current = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                if not self.names:
+                    return 0
+                self.current = self.storage.open(self.names.pop(0), "rb")
+            data = self.current.read(len(buffer))
+            if data:
+                buffer[: len(data)] = data
+                return len(data)
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+        super().close()
+
+
+def validate_image(storage, name):
+    with storage.open(name, "rb") as stream, Image.open(stream) as image:
+        if image.format not in ALLOWED_FORMATS:
+            raise UploadError(f"지원하지 않는 이미지 형식입니다: {image.format}")
+        image.verify()
+
+
+def assemble(upload_id, storage=default_storage):
+    """
+    조각을 이어 붙여 내용 주소 이름으로 저장하고 ProductImage로 등록합니다.
+    이미지가 아니거나 손상된 파일이면 실패로 기록하고, 다른 상품 이미지가 가리키지 않는 파일이면 지웁니다.
+    """
+    upload = ImageUpload.objects.filter(pk=upload_id, status=ImageUpload.Status.ASSEMBLING).first()
+    if upload is None:
+        return None
+
+    names = [upload.part_name(index) for index in range(upload.total_chunks)]
+    final_name = None
+    try:
+        # 조각을 한 번 읽어 내용 주소(해시)를 구하고, 같은 파일이 없을 때만 한 번 더 읽어 저장
+        with io.BufferedReader(PartsReader(storage, names), buffer_size=CHUNK_SIZE) as reader:
+            final_name = blob_name(content_hash(reader), upload.filename)
+        if not storage.exists(final_name):
+            with io.BufferedReader(PartsReader(storage, names), buffer_size=CHUNK_SIZE) as reader:
+                content = File(reader, name=upload.filename)
+                content.size = upload.total_size
+                store_blob(final_name, content, storage)
+        validate_image(storage, final_name)
+
+        with transaction.atomic():
+            product_image = ProductImage.objects.create(product_id=upload.product_id, image=final_name)
+            ImageUpload.objects.filter(pk=upload.pk).update(
+                status=ImageUpload.Status.COMPLETED, image=product_image, updated_at=timezone.now()
+            )
+    except Exception as e:
+        logger.warning(f"이미지 업로드 합치기 실패 ({upload.pk}): {e}")
+        if final_name:
+            release_file(final_name, storage)
+        ImageUpload.objects.filter(pk=upload.pk).update(
+            status=ImageUpload.Status.FAILED, error=str(e), updated_at=timezone.now()
+        )
+        product_image = None
+
+    delete_parts(upload, storage)
+    return product_image
+
+
+def delete_parts(upload, storage=default_storage):
+    try:
+        _, files = storage.listdir(upload.parts_dir)
+    except FileNotFoundError:
+        return
+    for filename in files:
+        storage.delete(f"{upload.parts_dir}/{filename}")
+
+
+def cleanup_stale_uploads(storage=default_storage):
+    """
+    IMAGE_UPLOAD_EXPIRY 동안 조각이 오지 않은 업로드와 실패한 업로드의 조각 파일과 행을 지웁니다.
+    완료된 업로드 행은 결과 조회를 위해 같은 기간이 지난 뒤 지웁니다.
+    """
+    expired = ImageUpload.objects.filter(
+        updated_at__lt=timezone.now() - timedelta(seconds=settings.IMAGE_UPLOAD_EXPIRY)
+    ).exclude(status=ImageUpload.Status.ASSEMBLING)
+    count = 0
+    for upload in expired.iterator():
+        delete_parts(upload, storage)
+        upload.delete()
+        count += 1
+    return count
@@ -11,6 +11,9 @@ from .views import (
     OrderedProductViewSet,
     CommentViewSet,
     OrderPaymentViewSet, SubCategoryViewSet, SubDetailCategoryViewSet, SellerOrderViewSet,
+    CategoryTreeView,
+    ImageUploadViewSet,
+    FlashSaleViewSet,
 )
 
 router = DefaultRouter()
@@ -20,7 +23,9 @@ router.register(r'sub-detail-categories', SubDetailCategoryViewSet)
 router.register(r"products", ProductViewSet)
 router.register(r"product-images", ProductImageViewSet)
 router.register(r"product-options", ProductOptionViewSet)
+router.register(r"image-uploads", ImageUploadViewSet)
 router.register(r"cart-products", CartProductViewSet)
+router.register(r"flash-sales", FlashSaleViewSet)
 router.register(r"orders", OrderViewSet, basename='user-order')
 router.register(r'seller-orders', SellerOrderViewSet, basename='seller-order')
 router.register(r"ordered-products", OrderedProductViewSet)
@@ -29,6 +34,7 @@ router.register(r"order-payments", OrderPaymentViewSet)
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("category-tree/", CategoryTreeView.as_view(), name="category-tree"),
     # Webhook endpoint
     path(
         "order-payments/webhook/",
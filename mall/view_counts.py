@@ -0,0 +1,80 @@
+import logging
+
+from django.db import connection, transaction
+from redis import RedisError
+
+from .models import Product
+from .redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# 아직 DB에 반영되지 않은 조회수 (hash, field=상품 id, value=증가분)
+PENDING_KEY = "mall:view-counts"
+# 반영 중인 조회수. 반영이 끝나기 전에 작업이 죽으면 다음 반영 때 이어서 처리
+FLUSHING_KEY = "mall:view-counts:flushing"
+FLUSH_LOCK_KEY = "mall:view-counts:lock"
+BATCH_SIZE = 1000
+
+
+def record_view(product_id):
+    """상품 조회 1회를 기록합니다. 행 잠금 없이 Redis HINCRBY 한 번으로 끝납니다."""
+    try:
+        get_redis().hincrby(PENDING_KEY, product_id, 1)
+    except RedisError as e:
+        logger.warning(f"상품 {product_id} 조회수 기록 실패: {e}")
+
+
+def pending_view_counts():
+    """DB에 아직 반영되지 않은 조회수 현황 (모니터링용)"""
+    client = get_redis()
+    pending = client.hvals(PENDING_KEY)
+    flushing = client.hvals(FLUSHING_KEY)
+    return {
+        "pending_products": len(pending),
+        "pending_views": sum(int(value) for value in pending),
+        "flushing_products": len(flushing),
+        "flushing_views": sum(int(value) for value in flushing),
+    }
+
+
+def flush_view_counts(lock_timeout=300):
+    """
+    쌓인 조회수를 UPDATE ... FROM (VALUES ...) 로 한 번에 Product.view_count에 더합니다.
+    반영할 키를 DB 커밋 직전에 지우므로 중복 반영은 없고, 작업이 죽어도 잃는 건 최대 한 주기 분량입니다.
+    """
+    client = get_redis()
+    if not client.set(FLUSH_LOCK_KEY, 1, nx=True, ex=lock_timeout):
+        return 0  # 다른 작업이 반영 중
+
+    try:
+        # 이전 반영이 중간에 실패해 남은 분량이 없을 때만 새로 쌓인 분량을 가져옴
+        if not client.exists(FLUSHING_KEY):
+            try:
+                client.rename(PENDING_KEY, FLUSHING_KEY)
+            except RedisError:
+                return 0  # 쌓인 조회수 없음
+
+        counts = [
+            (int(product_id), int(delta))
+            for product_id, delta in client.hgetall(FLUSHING_KEY).items()
+        ]
+        with transaction.atomic():
+            for start in range(0, len(counts), BATCH_SIZE):
+                _add_view_counts(counts[start:start + BATCH_SIZE])
+            client.delete(FLUSHING_KEY)
+        return len(counts)
+    finally:
+        client.delete(FLUSH_LOCK_KEY)
+
+
+def _add_view_counts(counts):
+    table = Product._meta.db_table
+    values = ", ".join(["(%s, %s)"] * len(counts))
+    params = [value for row in counts for value in row]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS p SET view_count = p.view_count + v.delta "
+            f"FROM (VALUES {values}) AS v(id, delta) WHERE p.id = v.id",
+            params,
+        )
@@ -1,9 +1,16 @@
 # views.py
-from django.db import models
-from rest_framework import viewsets, permissions, status
+import logging
+
+from django.db import models, transaction
+from rest_framework import mixins, viewsets, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from JunJunbariStudio.serializers import EXPAND_QUERY_PARAM, FIELDS_QUERY_PARAM, sparse_fieldset
 from mall.models import (
     Category,
     Product,
@@ -14,24 +21,68 @@ from mall.models import (
     OrderedProduct,
     Comment,
     OrderPayment, SubCategory, SubDetailCategory,
+    ImageUpload,
+    CatalogImport,
+    FlashSale,
+    SellerOrderLine,
+)
+from .cache import (
+    PRODUCT_VERSION_KEY,
+    invalidate_product_detail,
+    product_detail_etag,
+    product_detail_key,
+    versioned_key,
+)
+from .cart_store import apply as apply_cart, build_lines, get_cart, parse_line_key, sync as sync_cart
+from .catalog_io import FORMATS as CATALOG_FORMATS, export_rows, iter_lines
+from .category_tree import get_category_tree
+from .facets import product_facets
+from .flash_sale import (
+    FlashSaleError,
+    SoldOut,
+    enter as enter_flash_sale,
+    get_sale as get_flash_sale,
+    get_ticket as get_flash_sale_ticket,
+    remaining as flash_sale_remaining,
 )
-from .permissions import IsAdminOrReadOnly, IsSellerOrAdmin, IsOwnerOrAdmin
+from .inventory import OutOfStock, release as release_stock
+from .leaderboard import top_product_ids
+from .uploads import CHUNK_SIZE as UPLOAD_CHUNK_SIZE, UploadError, delete_parts, request_assembly, save_chunk
+from .view_counts import pending_view_counts, record_view
+from .mixins import QueryBudgetMixin
+from .pagination import ProductPagination, OrderPagination, CommentPagination, SellerOrderLinePagination
+from .permissions import IsAdminOrReadOnly, IsSeller, IsSellerOrAdmin
 from .serializers import (
     CategorySerializer,
     ProductSerializer,
     ProductImageSerializer,
     ProductOptionSerializer,
+    CartBulkSerializer,
+    CartItemSerializer,
+    CartQuantitySerializer,
     CartProductSerializer,
     OrderedProductSerializer,
     CommentSerializer,
     OrderPaymentSerializer, SubCategorySerializer, SubDetailCategorySerializer,
     ProductBannerSerializer, ProductListSerializer, SellerOrderSerializer, OrderCompactSerializer,
     OrderDetailSerializer,
+    ImageUploadSerializer,
+    CatalogImportSerializer,
+    FlashSaleSerializer,
+    FlashSaleEntrySerializer,
+    FlashSaleTicketSerializer,
+    SellerOrderLineSerializer,
 )
 from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
-from mall.tasks import cancel_payment
-from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.http import parse_etags
+from mall.tasks import cancel_payment, import_catalog
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from redis import RedisError
+
+logger = logging.getLogger(__name__)
 
 class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
@@ -63,9 +114,57 @@ class SubDetailCategoryViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(subcategory_id=subcategory_id)
         return queryset
 
-class ProductViewSet(viewsets.ModelViewSet):
+class CategoryTreeView(APIView):
+    """
+    분류 > 서브분류 > 세부분류 전체 트리와 분류별 상품 수를 한 번에 반환합니다.
+    미리 만들어 둔 문서를 그대로 내려주며, If-None-Match가 ETag와 같으면 304를 반환합니다.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        document = get_category_tree()
+        etag = document["etag"]
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(document["tree"], headers={"ETag": etag})
+
+def parse_spec_filters(values):
+    """["material:cotton", "color:white"] -> {"material": "cotton", "color": "white"}"""
+    specifications = {}
+    for value in values:
+        key, sep, spec_value = value.partition(':')
+        if not sep or not key:
+            raise ValidationError({'spec': f"'키:값' 형식이어야 합니다: {value}"})
+        specifications[key] = spec_value
+    return specifications
+
+
+def parse_price_param(query_params, name):
+    value = query_params.get(name)
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ValidationError({name: "0 이상의 정수여야 합니다."})
+    return int(value)
+
+
+class ProductViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     permission_classes = [IsSellerOrAdmin]
+    pagination_class = ProductPagination
+    # 페이지 크기와 무관하게 유지되어야 하는 액션별 SQL 실행 횟수 상한 (인증 사용자 조회 1회 포함)
+    query_budgets = {
+        'list': 4,
+        'retrieve': 4,
+        'popular_products': 3,
+        'search': 4,
+        'facets': 2,
+    }
+    facets_cache_timeout = 60 * 10
+    detail_cache_timeout = 60 * 60
+    # 판매 중 상품만 기본으로 보여주는 매장 목록 액션 (?status=all 이면 전체)
+    storefront_actions = ('list', 'search', 'popular_products', 'facets')
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -85,7 +184,41 @@ class ProductViewSet(viewsets.ModelViewSet):
         if sub_detail_category_id:
             queryset = queryset.filter(sub_detail_category_id=sub_detail_category_id)
 
-        return queryset
+        # 상태 필터: 매장 목록은 판매 중 상품이 기본 (판매 중 부분 인덱스 사용)
+        product_status = self.request.query_params.get('status')
+        if product_status is None and self.action in self.storefront_actions:
+            product_status = Product.Status.ACTIVE
+        if product_status and product_status != 'all':
+            if product_status not in Product.Status.values:
+                raise ValidationError({'status': f"올바르지 않은 상태입니다: {product_status}"})
+            queryset = queryset.filter(status=product_status)
+
+        # 가격 범위 필터: ?min_price=10000&max_price=50000
+        queryset = queryset.price_between(
+            parse_price_param(self.request.query_params, 'min_price'),
+            parse_price_param(self.request.query_params, 'max_price'),
+        )
+
+        # 사양 필터: ?spec=material:cotton&spec=color:white (모든 조건을 만족하는 상품)
+        specifications = parse_spec_filters(self.request.query_params.getlist('spec'))
+        if specifications:
+            queryset = queryset.with_specifications(specifications)
+
+        # 키워드 필터: ?keyword=여름&keyword=린넨 (모든 키워드를 가진 상품)
+        keywords = [keyword for keyword in self.request.query_params.getlist('keyword') if keyword]
+        if keywords:
+            queryset = queryset.with_keywords(keywords)
+
+        # 액션에 맞는 컬럼만 읽고 연관 이미지/옵션은 prefetch로 한 번에 가져옴
+        if self.action in ('facets', 'export_products'):
+            return queryset
+        if self.action in ('list', 'search'):
+            queryset = queryset.for_list()
+        elif self.action == 'popular_products':
+            queryset = queryset.for_banner()
+        else:
+            queryset = queryset.for_detail()
+        return queryset.for_fields(*sparse_fieldset(self.request))
 
     def paginate_queryset(self, queryset):
         # 동적으로 limit 값 설정 가능
@@ -95,27 +228,250 @@ class ProductViewSet(viewsets.ModelViewSet):
         return super().paginate_queryset(queryset)
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ('list', 'search'):
             return ProductListSerializer  # 목록 조회 시 상세 정보 제공
         else:
             return ProductSerializer  # 그 외 상황에서는 전체 정보 제공
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        상품 상세. 직렬화된 응답과 ETag를 캐시해 두고,
+        If-None-Match가 ETag와 같으면 본문 없이 304를 반환합니다.
+        """
+        if request.query_params.get(FIELDS_QUERY_PARAM) or request.query_params.get(EXPAND_QUERY_PARAM):
+            # 필드를 골라 요청하면 캐시된 전체 응답과 모양이 달라지므로 바로 직렬화
+            instance = self.get_object()
+            record_view(instance.pk)
+            return Response(self.get_serializer(instance).data)
+
+        pk = str(self.kwargs['pk'])
+        cache_key = product_detail_key(pk) if pk.isdigit() else None
+        document = cache.get(cache_key) if cache_key else None
+        if document is None:
+            instance = self.get_object()
+            document = {
+                "etag": product_detail_etag(instance),
+                "data": dict(self.get_serializer(instance).data),
+            }
+            if cache_key:
+                # 읽기 전에 만든 키에 저장. 그사이 상품이 바뀌어 버전이 올라갔으면 옛 버전 키에 남아 다시 읽히지 않음
+                cache.set(cache_key, document, self.detail_cache_timeout)
+
+        # 조회수는 Redis에 쌓아 두고 주기 작업에서 한 번에 반영 (상품 행 잠금 방지)
+        record_view(document["data"]["id"])
+
+        etag = document["etag"]
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(document["data"], headers={"ETag": etag})
+
     def perform_create(self, serializer):
         # 상품 생성 시 판매자를 현재 요청한 유저로 지정
         serializer.save(seller=self.request.user)
 
     @action(detail=False, methods=['get'])
     def popular_products(self, request):
-        queryset = self.get_queryset().order_by('-sales_count')[:4]
-        serializer = ProductBannerSerializer(queryset, many=True)
+        """
+        판매량 상위 4개 상품. Redis 판매량 순위표에서 읽고,
+        순위표를 사용할 수 없거나 비어 있으면 DB의 sales_count 정렬로 대체합니다.
+        """
+        limit = 4
+        try:
+            # 순위표에는 판매 중지/품절 상품도 있으므로 여유 있게 읽고 판매 중 상품만 남김
+            product_ids = top_product_ids(limit * 2, request.query_params.get('category'))
+        except RedisError as e:
+            logger.warning(f"판매량 순위표 조회 실패: {e}")
+            product_ids = []
+
+        if product_ids:
+            products = self.get_queryset().in_bulk(product_ids)
+            queryset = [products[pk] for pk in product_ids if pk in products][:limit]
+        else:
+            queryset = self.get_queryset().order_by('-sales_count')[:limit]
+        serializer = ProductBannerSerializer(queryset, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        상품명, 키워드, 설명을 대상으로 한 전문 검색 + 상품명 오타 허용(trigram) 검색.
+        검색 순위가 높은 순으로 페이지네이션된 결과를 반환합니다.
+        """
+        keyword = request.query_params.get('q', '').strip()
+        if not keyword:
+            return Response({"error": "검색어(q)가 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 검색 결과는 순위 순서를 유지해야 하므로 커서 대신 페이지 번호 방식으로 나눔
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(self.get_queryset().search(keyword), request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        permission_classes=[IsSeller],
+        parser_classes=[MultiPartParser],
+    )
+    def import_products(self, request):
+        """
+        CSV/JSONL 파일(file)로 상품을 일괄 등록/수정합니다.
+        파일을 저장해 두고 Celery 작업이 배치 단위로 가져오며, 작업 id를 바로 반환합니다. (202)
+        진행 상황과 결과(오류 행 목록)는 GET /products/import/{id}/ 로 확인합니다.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "파일(file)이 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if fmt not in CATALOG_FORMATS:
+            return Response({"error": f"지원하지 않는 형식입니다: {fmt}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = CatalogImport.objects.create(user=request.user, format=fmt, file=upload)
+        transaction.on_commit(lambda: import_catalog.delay(str(job.pk)))
+        return Response(CatalogImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=r'import/(?P<import_id>[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12})',
+        permission_classes=[IsSeller],
+    )
+    def import_status(self, request, import_id=None):
+        """상품 일괄 가져오기 작업의 상태와 결과. 본인이 올린 작업만 (관리자는 전체)"""
+        jobs = CatalogImport.objects.all()
+        if not request.user.is_staff:
+            jobs = jobs.filter(user=request.user)
+        return Response(CatalogImportSerializer(get_object_or_404(jobs, pk=import_id)).data)
+
+    @action(detail=True, methods=['post'])
+    def reorder_images(self, request, pk=None):
+        """
+        상품 이미지 순서 변경. {"image_ids": [3, 1, 2]} 순서대로 정렬 순서를 다시 매기고,
+        첫 이미지를 대표 이미지로 지정합니다.
+        """
+        product = self.get_object()
+        image_ids = request.data.get('image_ids')
+        images = {image.pk: image for image in product.images.all()}
+        if not isinstance(image_ids, list) or sorted(image_ids) != sorted(images):
+            return Response(
+                {"error": "image_ids에는 이 상품의 모든 이미지 id가 한 번씩 있어야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        for position, image_id in enumerate(image_ids):
+            images[image_id].position = position
+        with transaction.atomic():
+            ProductImage.objects.bulk_update(images.values(), ['position'])
+            Product.objects.filter(pk=product.pk).refresh_primary_image()
+            invalidate_product_detail(product.pk)
+        return Response(ProductImageSerializer(
+            sorted(images.values(), key=lambda image: image.position), many=True, context=self.get_serializer_context()
+        ).data)
+
+    @action(detail=False, methods=['get'], url_path='export', permission_classes=[IsSeller])
+    def export_products(self, request):
+        """현재 필터 조건의 본인 상품(관리자는 전체)을 CSV/JSONL(?export_format=)로 스트리밍합니다."""
+        fmt = request.query_params.get('export_format', 'csv')
+        if fmt not in CATALOG_FORMATS:
+            return Response({"error": f"지원하지 않는 형식입니다: {fmt}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        if not request.user.is_staff:
+            queryset = queryset.filter(seller=request.user)
+
+        content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(
+            iter_lines(export_rows(queryset), fmt), content_type=f'{content_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{fmt}"'
+        return response
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def pending_view_counts(self, request):
+        """아직 DB에 반영되지 않은 조회수 현황 (관리자 모니터링용)"""
+        try:
+            return Response(pending_view_counts())
+        except RedisError as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        현재 필터 조건에서 카테고리/서브카테고리/세부 카테고리/상태/가격대별 상품 수를 반환합니다.
+        결과는 상품 버전 키 기준으로 캐시되며, 상품이 변경되면 버전이 올라가 새로 계산됩니다.
+        """
+        filters = {
+            key: request.query_params.get(key)
+            for key in ('category', 'subcategory', 'sub_detail_category', 'status', 'min_price', 'max_price')
+        }
+        filters['spec'] = sorted(request.query_params.getlist('spec'))
+        filters['keyword'] = sorted(request.query_params.getlist('keyword'))
+        cache_key = versioned_key("mall:facets", PRODUCT_VERSION_KEY, filters)
+        data = cache.get(cache_key)
+        if data is None:
+            data = product_facets(self.get_queryset())
+            cache.set(cache_key, data, self.facets_cache_timeout)
+        return Response(data)
+
 
 class ProductImageViewSet(viewsets.ModelViewSet):
     queryset = ProductImage.objects.all()
     serializer_class = ProductImageSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+class ImageUploadViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    상품 이미지 분할 업로드.
+    POST /image-uploads/ {product, filename, total_size} -> 업로드 생성 (chunk_size, total_chunks 반환)
+    PUT /image-uploads/{id}/chunks/{n}/ (본문: 조각 바이트) -> 조각 저장
+    GET /image-uploads/{id}/ -> 상태와 받은 조각 목록 (끊긴 업로드 이어 올리기)
+    POST /image-uploads/{id}/complete/ -> 조각 합치기 예약, 완료되면 status=completed, image=상품 이미지 id
+    """
+    queryset = ImageUpload.objects.all()
+    serializer_class = ImageUploadSerializer
+    permission_classes = [IsSeller]
+
+    def get_queryset(self):
+        # 본인이 시작한 업로드만 (관리자는 전체)
+        if self.request.user.is_staff:
+            return self.queryset
+        return self.queryset.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user, chunk_size=UPLOAD_CHUNK_SIZE)
+
+    def perform_destroy(self, instance):
+        delete_parts(instance)
+        instance.delete()
+
+    @action(detail=True, methods=['put'], url_path=r'chunks/(?P<index>\d+)')
+    def chunk(self, request, pk=None, index=None):
+        upload = self.get_object()
+        # 파서를 거치지 않고 본문을 그대로 읽음 (조각 크기는 IMAGE_UPLOAD_CHUNK_SIZE 이하)
+        data = request.body
+        try:
+            save_chunk(upload, int(index), data)
+        except UploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"index": int(index), "size": len(data)})
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            request_assembly(upload)
+        except UploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+        upload.refresh_from_db()
+        return Response(self.get_serializer(upload).data, status=status.HTTP_202_ACCEPTED)
+
+
 class ProductOptionViewSet(viewsets.ModelViewSet):
     queryset = ProductOption.objects.all()
     serializer_class = ProductOptionSerializer
@@ -131,52 +487,205 @@ class ProductOptionViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(product_id=product_id)
         return queryset
 
-class CartProductViewSet(viewsets.ModelViewSet):
+class CartProductViewSet(viewsets.GenericViewSet):
+    """
+    장바구니. 항목은 Redis에 있으며(mall.cart_store) "상품 id:옵션 id" 키로 다룹니다. (옵션이 없으면 0)
+    CartProduct 테이블에는 주기 작업이 모아서 반영합니다.
+    """
     queryset = CartProduct.objects.all()
     serializer_class = CartProductSerializer
-    permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = "key"
+    lookup_value_regex = r"\d+:\d+"
 
     def get_queryset(self):
-        # 관리자는 모든 장바구니 조회 가능, 일반 사용자는 본인 것만 조회 가능
-        if self.request.user.is_staff:
-            return self.queryset
-        return self.queryset.filter(user=self.request.user)
+        # 상품/옵션을 조인한 한 번의 쿼리로 줄별 금액과 장바구니 합계까지 계산 (DB 사본 기준)
+        queryset = self.queryset.with_totals()
+        if self.request.user.is_staff and self.request.query_params.get("user") == "all":
+            return queryset
+        sync_cart(self.request.user.pk)  # 아직 반영되지 않은 Redis 변경분을 먼저 반영
+        return queryset.filter(user=self.request.user)
+
+    def cart_lines(self):
+        return build_lines(self.request.user.pk, get_cart(self.request.user.pk))
+
+    def get_object(self):
+        line = parse_line_key(self.kwargs[self.lookup_field])
+        for cart_product in self.cart_lines():
+            if (cart_product.product_id, cart_product.option_id) == line:
+                return cart_product
+        raise Http404
+
+    def list(self, request, *args, **kwargs):
+        # 관리자는 ?user=all로 모든 사용자의 장바구니 조회 (다른 사용자 것은 반영 주기만큼 늦을 수 있음)
+        page = self.paginate_queryset(self.get_queryset())
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(self.get_queryset(), many=True).data)
+
+    def summary_response(self):
+        sync_cart(self.request.user.pk)
+        lines = list(self.queryset.with_totals().filter(user=self.request.user))
+        first = lines[0] if lines else None
+        return Response({
+            "items": self.get_serializer(lines, many=True).data,
+            "item_count": first.cart_item_count if first else 0,
+            "total_quantity": first.cart_quantity if first else 0,
+            "total_amount": first.cart_total if first else 0,
+        })
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request):
+        """
+        내 장바구니 전체 항목과 합계(금액, 수량, 항목 수)를 한 번의 쿼리로 반환합니다.
+        금액은 같은 장바구니로 주문(create_from_cart)했을 때 결제할 금액과 같습니다.
+        """
+        return self.summary_response()
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        여러 항목의 담기/수량 변경/삭제를 한 요청으로 처리하고 변경된 장바구니(summary와 같은 형식)를 반환합니다.
+        {"operations": [{"op": "add", "product": 1, "option": null, "quantity": 2}, ...]}
+        모든 연산이 한 번에 적용되며(Redis 스크립트 1회), 하나라도 잘못되면 아무것도 적용하지 않습니다.
+        """
+        serializer = CartBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        apply_cart(request.user.pk, [
+            (operation["op"], operation["product"], operation.get("option"), operation["quantity"])
+            for operation in serializer.validated_data["operations"]
+        ])
+        return self.summary_response()
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(self.get_object()).data)
 
     def create(self, request, *args, **kwargs):
-        user = request.user
-        product = request.data.get("product")
-        option = request.data.get("option")
-
-        # 동일한 user, product, option 조합의 cart 제품이 있는지 확인
-        existing_cart_product = CartProduct.objects.filter(
-            user=user, product=product, option=option
-        ).first()
-
-        if existing_cart_product:
-            # 이미 존재하면 수량 업데이트
-            existing_cart_product.quantity += int(request.data.get("quantity", 1))
-            if existing_cart_product.quantity <= 0:
-                existing_cart_product.delete()
-            else:
-                existing_cart_product.save()
-            serializer = self.get_serializer(existing_cart_product)
-            return Response(serializer.data)
-        else:
-            # 없으면 새로 생성
-            return super().create(request, *args, **kwargs)
+        # 같은 상품/옵션이 이미 있으면 수량을 더함 (음수면 뺌, 0 이하가 되면 삭제)
+        item = CartItemSerializer(data=request.data)
+        item.is_valid(raise_exception=True)
+        product = item.validated_data["product"]
+        option = item.validated_data.get("option")
+        quantity = item.validated_data["quantity"]
+        cart = apply_cart(request.user.pk, [("add", product.pk, option.pk if option else None, quantity)])
+
+        line = (product.pk, option.pk if option else None)
+        if line not in cart:
+            return Response({"message": "장바구니에서 상품이 삭제되었습니다."})
+        cart_product = CartProduct(user=request.user, product=product, option=option, quantity=cart[line])
+        return Response(self.get_serializer(cart_product).data, status=status.HTTP_201_CREATED)
+
+    def update(self, request, *args, **kwargs):
+        # 수량 변경 ({"quantity": n}, 0 이하면 삭제)
+        cart_product = self.get_object()
+        item = CartQuantitySerializer(data=request.data)
+        item.is_valid(raise_exception=True)
+        cart = apply_cart(
+            request.user.pk,
+            [("set", cart_product.product_id, cart_product.option_id, item.validated_data["quantity"])],
+        )
+        line = (cart_product.product_id, cart_product.option_id)
+        if line not in cart:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        cart_product.quantity = cart[line]
+        return Response(self.get_serializer(cart_product).data)
+
+    def partial_update(self, request, *args, **kwargs):
+        return self.update(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        self.perform_destroy(instance)
+        product_id, option_id = parse_line_key(self.kwargs[self.lookup_field])
+        apply_cart(request.user.pk, [("remove", product_id, option_id, 0)])
         return Response({"message": "장바구니에서 상품이 삭제되었습니다."}, status=status.HTTP_204_NO_CONTENT)
 
-class OrderViewSet(viewsets.ModelViewSet):
+class FlashSaleViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    선착순 판매. 입장과 티켓 조회는 Redis만 사용하며 주문은 주기 작업이 대기열에서 만듭니다. (mall.flash_sale)
+    POST /flash-sales/{id}/enter/ {quantity} -> 202 티켓 (이미 입장했으면 같은 티켓), 수량 소진 시 409
+    GET /flash-sales/tickets/{ticket}/ -> 티켓 상태 (queued -> created/failed), created면 order에 주문 id
+    """
+    queryset = FlashSale.objects.select_related("product", "option")
+    serializer_class = FlashSaleSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get_queryset(self):
+        if self.action == "list":
+            # 진행 중이거나 예정된 판매만
+            return self.queryset.filter(ends_at__gt=timezone.now()).order_by("starts_at")
+        return self.queryset
+
+    def get_permissions(self):
+        if self.action in ("enter", "ticket"):
+            return [IsAuthenticated()]
+        return super().get_permissions()
+
+    def sales_response(self, sales, many=False):
+        try:
+            remaining = flash_sale_remaining(sales)
+        except RedisError:
+            remaining = {}
+        context = {**self.get_serializer_context(), "remaining": remaining}
+        serializer = self.get_serializer_class()(sales if many else sales[0], many=many, context=context)
+        return Response(serializer.data)
+
+    def list(self, request, *args, **kwargs):
+        return self.sales_response(list(self.filter_queryset(self.get_queryset())), many=True)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.sales_response([self.get_object()])
+
+    @action(detail=True, methods=["post"])
+    def enter(self, request, pk=None):
+        # 판매 정보는 캐시에서 읽고 입장은 Redis 스크립트 한 번으로 처리 (DB 쓰기 없음)
+        sale = get_flash_sale(pk)
+        if sale is None:
+            raise Http404
+        serializer = FlashSaleEntrySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            ticket_id = enter_flash_sale(sale, request.user.pk, serializer.validated_data["quantity"])
+        except SoldOut as e:
+            return Response({"error": str(e), "sold_out": True}, status=status.HTTP_409_CONFLICT)
+        except FlashSaleError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except RedisError as e:
+            logger.error(f"선착순 판매 {sale.pk} 입장 처리 실패: {e}")
+            return Response(
+                {"error": "잠시 후 다시 시도해 주세요."}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        ticket = get_flash_sale_ticket(ticket_id)
+        return Response(FlashSaleTicketSerializer(ticket).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=["get"], url_path=r"tickets/(?P<ticket_id>[0-9a-f-]{36})")
+    def ticket(self, request, ticket_id=None):
+        ticket = get_flash_sale_ticket(ticket_id)
+        if ticket is None or ticket["user"] != request.user.pk:
+            raise Http404
+        return Response(FlashSaleTicketSerializer(ticket).data)
+
+
+class OrderViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderPagination
+    # 목록: 주문 조회 1회 (+ 페이지 번호 방식이면 COUNT 1회, 세션/토큰 인증 사용자 조회 1회)
+    query_budgets = {
+        'list': 3,
+    }
 
     def get_queryset(self):
         # 로그인한 사용자만 자신의 주문을 볼 수 있음
-        return Order.objects.filter(user=self.request.user).distinct()
+        queryset = Order.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            # 목록은 주문의 요약 컬럼만 사용하므로 페이지당 쿼리 한 번
+            return queryset
+        # 주문 상품은 상품/옵션과 함께 한 번에 가져와 주문 수와 관계없이 쿼리 수를 일정하게 유지
+        return queryset.prefetch_related(
+            models.Prefetch(
+                'ordered_products',
+                queryset=OrderedProduct.objects.select_related('product', 'option').order_by('pk'),
+            )
+        )
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -185,17 +694,22 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def create(self, request, *args, **kwargs):
         user = request.user  # 로그인한 유저 정보 가져오기
-        cart_product_ids = request.data.get("cart_products", [])
-        cart_products = CartProduct.objects.filter(id__in=cart_product_ids, user=user)
+        # 장바구니 항목 키("상품 id:옵션 id") 목록
+        try:
+            lines = [parse_line_key(str(key)) for key in request.data.get("cart_products", [])]
+        except ValueError:
+            raise ValidationError({"cart_products": "장바구니 항목 키 형식이 올바르지 않습니다."})
 
-        if not cart_products.exists():
+        # 모델의 create_from_cart 메서드 호출
+        try:
+            order = Order.create_from_cart(user, lines) if lines else None
+        except OutOfStock as e:
+            return Response({"error": str(e), "shortages": e.shortages}, status=status.HTTP_409_CONFLICT)
+        if order is None:
             return Response(
                 {"error": "장바구니에 선택된 상품이 없습니다."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        # 모델의 create_from_cart 메서드 호출
-        order = Order.create_from_cart(user, cart_products)
         serializer = self.get_serializer(order)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -236,16 +750,48 @@ class OrderViewSet(viewsets.ModelViewSet):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response({"message": "반품 요청이 완료되었습니다.", "status": order.status})
 
-class SellerOrderViewSet(viewsets.ModelViewSet):
+class SellerOrderViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
+    """
+    판매자 주문. 목록과 구매자 검색은 주문 대신 판매자 주문 상품(SellerOrderLine)을 반환합니다.
+    GET /seller-orders/?status=PAID&line_status=ORDERED -> 주문 상태/주문 상품 상태 필터
+    GET /seller-orders/search/?buyer_id= 또는 ?buyer_email= -> 구매자별
+    """
     queryset = Order.objects.all()
     serializer_class = SellerOrderSerializer # 판매자 전용 시리얼라이저
-    permission_classes = [IsAuthenticated, IsSellerOrAdmin]
+    # 주문 소유 확인은 get_queryset(판매자 주문 상품이 있는 주문만)이 대신함
+    permission_classes = [IsAuthenticated, IsSeller]
+    # 목록/검색: 판매자 주문 상품 조회 1회 (+ 페이지 번호 방식이면 COUNT 1회, 세션/토큰 인증 사용자 조회 1회)
+    query_budgets = {
+        'list': 3,
+        'search_buyer_orders': 3,
+    }
 
     def get_queryset(self):
-        # 판매자는 자신이 판매한 상품이 포함된 주문만 조회 가능
+        # 판매자는 자신이 판매한 상품이 포함된 주문만 조회 가능 (조인 + DISTINCT 대신 EXISTS)
         return Order.objects.filter(
-            ordered_products__product__seller=self.request.user
-        ).distinct()
+            models.Exists(SellerOrderLine.objects.filter(order=models.OuterRef('pk'), seller=self.request.user))
+        )
+
+    def get_seller_lines(self):
+        lines = SellerOrderLine.objects.filter(seller=self.request.user).select_related('buyer')
+        order_status = self.request.query_params.get('status')
+        if order_status:
+            lines = lines.filter(order_status=order_status)
+        line_status = self.request.query_params.get('line_status')
+        if line_status:
+            lines = lines.filter(status=line_status)
+        return lines
+
+    def paginate_seller_lines(self, lines):
+        self.seller_line_paginator = SellerOrderLinePagination()
+        return self.seller_line_paginator.paginate_queryset(lines, self.request, view=self)
+
+    def seller_lines_response(self, page):
+        serializer = SellerOrderLineSerializer(page, many=True, context=self.get_serializer_context())
+        return self.seller_line_paginator.get_paginated_response(serializer.data)
+
+    def list(self, request, *args, **kwargs):
+        return self.seller_lines_response(self.paginate_seller_lines(self.get_seller_lines()))
 
     @action(detail=True, methods=["post"], url_path='cancel_product')
     def cancel_product(self, request, pk=None):
@@ -264,6 +810,7 @@ class SellerOrderViewSet(viewsets.ModelViewSet):
 
         order.status = Order.Status.CANCELLED
         order.save()
+        release_stock(order_id=order.pk)
 
         return Response({
             "message": f"주문 {order.id}가 취소되었습니다.",
@@ -281,19 +828,20 @@ class SellerOrderViewSet(viewsets.ModelViewSet):
         if not buyer_id and not buyer_email:
             return Response({"error": "buyer_id 또는 buyer_email이 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 구매자 ID 또는 이메일로 주문 필터링
-        queryset = self.get_queryset()
+        # 구매자 ID 또는 이메일로 판매자 주문 상품 필터링 (seller_line_buyer_idx, seller_line_buyer_email_idx)
+        lines = self.get_seller_lines()
 
         if buyer_id:
-            queryset = queryset.filter(user__id=buyer_id)
+            if not str(buyer_id).isdigit():
+                return Response({"error": "buyer_id는 숫자여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+            lines = lines.filter(buyer_id=buyer_id)
         elif buyer_email:
-            queryset = queryset.filter(user__email=buyer_email)
+            lines = lines.filter(buyer_email=buyer_email)
 
-        if not queryset.exists():
+        page = self.paginate_seller_lines(lines)
+        if not page and 'cursor' not in request.query_params:
             return Response({"message": "해당 조건에 맞는 주문이 없습니다."}, status=status.HTTP_404_NOT_FOUND)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.seller_lines_response(page)
 
     @action(detail=True, methods=["post"])
     def mark_as_prepared(self, request, pk=None):
@@ -344,6 +892,8 @@ class SellerOrderViewSet(viewsets.ModelViewSet):
 
         ordered_product.status = OrderedProduct.Status.CANCELLED
         ordered_product.save()
+        release_stock(ordered_product_ids=[ordered_product.pk])
+        Order.objects.filter(pk=order.pk).refresh_summary()
 
         return Response(
             {"message": f"{ordered_product.product.name} 상품 취소가 완료되었습니다.", "status": ordered_product.status})
@@ -413,6 +963,7 @@ class CommentViewSet(viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CommentPagination
 
     def get_queryset(self):
         """
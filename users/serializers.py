@@ -3,16 +3,17 @@ from django.db import transaction, IntegrityError
 
 from .models import CustomUser
 from rest_framework import serializers
+from JunJunbariStudio.serializers import SparseFieldsetMixin
 from .models import UserProfile, SubscriptionPlan
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         fields = ["subscription_plan"]
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     userprofile = UserProfileSerializer(required=False)
 
     class Meta:
@@ -13,6 +13,7 @@ from rest_framework.permissions import IsAuthenticated, BasePermission, AllowAny
 from rest_framework.decorators import action
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from JunJunbariStudio.pagination import KeysetPagination
 from .models import LoginHistory
 from .permissions import DebugAuthentication
 from .serializers import UserSerializer
@@ -218,6 +219,7 @@ class UserListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination  # ?cursor= 요청 시 pk 역순 커서 페이지네이션
 
 
 # 유저 상세 조회, 수정, 삭제